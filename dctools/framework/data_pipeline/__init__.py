@@ -1,2 +1,9 @@
-from .data_process_pipeline import DataProcessNode, DataProcessPipeline
+from .data_process_pipeline import DataProcessNode, DataProcessRouter, DataProcessPipeline, ProcessResult
+from .data_process_executor import MultiProcessExecutor, PartitionExecutor, StageExecutor
+from .data_process_metrics import DataProcessMetrics
+from .data_process_checkpoint import DataProcessCheckpoint
+from .data_process_errors import ProcessError, ErrorAggregator
+from .data_process_trace import DataProcessTracer, DataProcessTimeline
+from .data_process_result_store import DataProcessResultStore
+from .data_process_incremental import DataProcessIncremental
 from .data_process_node_comps import *
\ No newline at end of file
@@ -0,0 +1,190 @@
+# Name: data process checkpoint
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理管道的断点续跑日志
+"""
+# 场景描述
+在处理千万级的数据源时，如果数据处理管道在接近结束时异常退出，只能从头开始重新处理，
+昂贵的数据处理节点(HTTP 请求，数据库查询等)需要重复执行，下游也会收到重复的处理结果。
+
+# 设计思想
+1. 通过一个追加写入的日志文件(journal)记录输入进度与已输出的处理结果，
+   每处理 interval 条数据(或者距离上次提交超过 max_delay 秒)提交一次日志帧，并调用 fsync 落盘。
+2. 输入进度有两种记录方式:
+    * 偏移量(默认): 记录已输出的数据条数，续跑时跳过数据源的前 offset 条数据，要求数据源每次的迭代顺序一致。
+    * 数据ID(key): 记录已输出数据的ID，续跑时跳过ID已记录的数据，适用于迭代顺序不固定的数据源。
+3. 处理结果在被消费(下游取走下一条结果)之后才计入日志，因此异常退出时未提交的结果会在续跑时重新处理，
+   即“至少一次”语义，重复输出的数据不超过一个提交间隔。
+4. 日志帧通过 pickle 序列化后顺序追加，异常退出时文件末尾可能存在不完整的帧，加载时将其截断。
+"""
+
+
+import os
+import time
+import pickle
+import itertools
+from collections import deque
+
+
+# 断点续跑日志
+class DataProcessCheckpoint(object):
+    """
+    @class: DataProcessCheckpoint | 断点续跑日志
+    @desc:
+        记录数据处理管道的输入进度与已输出的处理结果，异常退出后重新运行时从最近一次提交的位置继续处理。
+        通过数据处理管道的 process_iter(checkpoint=...) 或 process(checkpoint=...) 使用。
+        资源开销:
+            * 默认只记录输入进度，save_results=True(replay=True 时默认开启)时日志保存所有已输出的处理结果(包括原始数据副本 source)，
+              日志大小与输出结果集相当。
+            * 续跑时需要反序列化日志中的所有帧(replay=False 时同样如此)，加载耗时与日志大小成正比。
+            * 按数据ID(key)记录进度时，已提交的数据ID集合常驻内存并随处理的数据条数持续增长。
+    @property:
+        * offset(int): 已提交的数据条数
+        * resumed(bool): 是否从已有的日志中恢复
+    @method:
+        * skip: 跳过数据源中已处理的数据
+        * track: 记录处理结果并定期提交日志
+        * commit: 提交日志帧
+        * clear: 清空日志
+    @exp:
+        checkpoint = DataProcessCheckpoint("./news.ckpt", interval=1000, key=lambda data: data["id"])
+        for result in pipeline.process_iter(open("news.jsonl"), checkpoint=checkpoint):
+            ...
+    """
+
+    def __init__(self, filepath, interval=1000, key=None, max_delay=None, save_results=None, replay=False, fsync=True):
+        """
+        @func: 构建器
+        @params:
+            * filepath(str): 日志文件路径
+            * interval(int): 提交间隔(数据条数)
+            * key(callable): 数据ID提取函数 key(data) -> id，默认(None)按偏移量记录输入进度
+            * max_delay(float): 提交间隔(秒)，默认(None)只按数据条数提交
+            * save_results(bool): 是否在日志中保存已输出的处理结果，默认(None)与 replay 一致
+            * replay(bool): 续跑时是否先输出日志中保存的处理结果(用于 process 汇总完整的结果集)
+            * fsync(bool): 提交时是否调用 fsync 确保日志落盘
+        """
+        if interval < 1:
+            raise ValueError("interval must be greater than 0")
+        save_results = replay if save_results is None else save_results
+        if replay and not save_results:
+            raise ValueError("replay requires save_results")
+        self.filepath = filepath
+        self.interval = int(interval)
+        self.key = key
+        self.max_delay = max_delay
+        self.save_results = save_results
+        self.replay = replay
+        self.fsync = fsync
+        self.offset = 0
+        self.resumed = False
+        # 已提交的数据ID
+        self.__keys = set()
+        # 日志中保存的处理结果(replay)
+        self.__results = []
+        # 待提交的数据ID/处理结果
+        self.__pending_keys = []
+        self.__pending_results = []
+        self.__pending = 0
+        # 已读取但未输出结果的数据ID(按输入顺序)
+        self.__inflight = deque()
+        self.__committed_at = time.monotonic()
+        self.__load()
+
+    # 加载日志
+    def __load(self):
+        if not os.path.exists(self.filepath):
+            return
+        with open(self.filepath, "rb+") as f:
+            position = 0
+            while True:
+                try:
+                    frame = pickle.load(f)
+                except Exception:
+                    # 截断末尾不完整的日志帧(文件末尾正常结束时 position 即文件大小，不会截断数据)
+                    # 不完整的帧也可能引发 EOFError，未截断时后续提交的帧会追加在不完整的帧之后，导致日志无法加载
+                    f.truncate(position)
+                    break
+                position = f.tell()
+                self.offset = frame["offset"]
+                self.__keys.update(frame["keys"])
+                self.replay and self.__results.extend(frame["results"])
+                self.resumed = True
+
+    # 跳过已处理的数据
+    def skip(self, datas):
+        """
+        @func: 跳过数据源中已提交的数据
+        @params:
+            * datas(iterable): 数据源
+        @return(iterator): 待处理的数据
+        """
+        if self.key is None:
+            return itertools.islice(datas, self.offset, None)
+        return self.__skip_keys(datas)
+
+    def __skip_keys(self, datas):
+        key, keys, inflight = self.key, self.__keys, self.__inflight
+        for data in datas:
+            data_id = key(data)
+            if data_id in keys:
+                continue
+            inflight.append(data_id)
+            yield data
+
+    # 记录处理结果
+    def track(self, results):
+        """
+        @func: 记录处理结果并定期提交日志
+        @desc: 结果按照输入顺序输出(ordered)，并在被消费之后才计入日志
+        @params:
+            * results(iterable): 数据处理结果
+        @return(generator): 数据处理结果(续跑且 replay=True 时，先输出日志中保存的处理结果)
+        """
+        if self.replay:
+            yield from (dict(result, state=state) for state, result in self.__results)
+            self.__results = []
+        try:
+            for result in results:
+                # 处理状态在输出之前记录(消费者可能修改处理结果，比如 process 会移除 state 字段)
+                state = result["state"]
+                yield result
+                self.__record(state, result)
+        finally:
+            self.commit()
+
+    def __record(self, state, result):
+        self.__pending += 1
+        if self.key is not None:
+            self.__pending_keys.append(self.__inflight.popleft())
+        self.save_results and self.__pending_results.append((state, result))
+        if self.__pending >= self.interval or (self.max_delay is not None and time.monotonic() - self.__committed_at >= self.max_delay):
+            self.commit()
+
+    # 提交日志帧
+    def commit(self):
+        """
+        @func: 提交日志帧(追加写入并落盘)
+        """
+        self.__committed_at = time.monotonic()
+        if not self.__pending:
+            return
+        self.offset += self.__pending
+        frame = {"offset": self.offset, "keys": self.__pending_keys, "results": self.__pending_results}
+        with open(self.filepath, "ab") as f:
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            self.fsync and os.fsync(f.fileno())
+        self.__keys.update(self.__pending_keys)
+        self.__pending, self.__pending_keys, self.__pending_results = 0, [], []
+
+    # 清空日志
+    def clear(self):
+        """
+        @func: 清空日志(数据处理完成后调用，下次运行时从头开始处理)
+        """
+        os.path.exists(self.filepath) and os.remove(self.filepath)
+        self.offset, self.resumed = 0, False
+        self.__keys, self.__results = set(), []
+        self.__pending, self.__pending_keys, self.__pending_results = 0, [], []
+        self.__inflight.clear()
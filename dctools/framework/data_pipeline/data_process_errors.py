@@ -0,0 +1,175 @@
+# Name: data process errors
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理节点的异常捕获与聚合
+"""
+# 场景描述
+数据处理节点异常(ERROR)时，数据处理管道会对每条异常数据调用 traceback.format_exc() 格式化异常信息，
+当上游变更导致某个节点大面积异常时，几十万条数据都需要格式化异常堆栈，并在结果中保留数 KB 的异常信息，
+占用大量的 CPU 与内存，而这些异常往往是同一个原因导致的。
+
+# 设计思想
+1. 延迟格式化: 异常信息以 ProcessError 对象的形式记录，保留异常对象，只有在需要时(str/traceback)才格式化，
+   格式化结果会被缓存。ProcessError 在 pickle 序列化时(多进程并行模式回传结果)转换成格式化后的文本。
+2. 异常聚合: 按照 (节点ID, 异常类型, 异常位置) 签名对异常进行聚合，记录异常次数与少量的样本数据，
+   通过聚合报告快速定位大面积异常的原因，而不需要遍历所有的异常结果。
+3. ProcessError 构建时将异常堆栈转换成不引用帧对象的堆栈摘要(traceback.TracebackException，不读取源码行)，
+   并移除异常对象的 __traceback__，避免保留的异常对象持有所有帧的局部变量(包括数据)，
+   以及 处理结果 -> 异常 -> 堆栈 -> 帧 -> 处理结果 的循环引用，格式化时基于堆栈摘要生成异常堆栈。
+"""
+
+
+import traceback
+
+
+# 异常位置(异常抛出处的 文件:行号)
+def _location(summary):
+    if not summary.stack:
+        return None
+    frame = summary.stack[-1]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+# 格式化异常信息
+def format_error(exception):
+    return "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+
+
+# 节点异常信息
+class ProcessError(object):
+    """
+    @class: ProcessError | 节点异常信息
+    @desc: 保留异常对象与堆栈摘要并延迟格式化异常信息，str(error) 返回格式化后的异常堆栈
+    @property:
+        * pid(str): 异常节点ID
+        * exception(Exception): 异常对象(__traceback__ 已移除，反序列化后为 None)
+        * type(str): 异常类型
+        * location(str): 异常位置
+        * traceback(str): 格式化后的异常堆栈
+    """
+
+    __slots__ = ("pid", "exception", "_summary", "_type", "_location", "_traceback")
+
+    def __init__(self, pid, exception):
+        self.pid = pid
+        self.exception = exception
+        self._type = self._location = self._traceback = None
+        # 堆栈摘要(不引用帧对象)，并释放异常对象的堆栈
+        self._summary = exception is not None and traceback.TracebackException(
+            type(exception), exception, exception.__traceback__, lookup_lines=False
+        )
+        exception is not None and exception.with_traceback(None)
+
+    @property
+    def type(self):
+        if self._type is None:
+            self._type = type(self.exception).__name__
+        return self._type
+
+    @property
+    def location(self):
+        if self._location is None and self._summary:
+            self._location = _location(self._summary)
+        return self._location
+
+    @property
+    def traceback(self):
+        if self._traceback is None:
+            self._traceback = "".join(self._summary.format())
+        return self._traceback
+
+    def __str__(self):
+        return self.traceback
+
+    def __repr__(self):
+        return f"<ProcessError node={self.pid} type={self.type} location={self.location}>"
+
+    def to_dict(self):
+        return {"node": self.pid, "type": self.type, "location": self.location, "error": self.traceback}
+
+    # 序列化协议(异常堆栈无法被 pickle 序列化，序列化时格式化)
+    def __reduce__(self):
+        return (_restore_process_error, (self.pid, self.type, self.location, self.traceback))
+
+
+def _restore_process_error(pid, type, location, traceback):
+    error = ProcessError(pid, None)
+    error._type, error._location, error._traceback = type, location, traceback
+    return error
+
+
+# 异常聚合器
+class ErrorAggregator(object):
+    """
+    @class: ErrorAggregator | 异常聚合器
+    @desc: 按照 (节点ID, 异常类型, 异常位置) 签名聚合节点异常，记录异常次数与前 max_samples 条样本数据
+    @method:
+        * record: 记录异常
+        * merge: 合并其他异常聚合器(用于汇总并行模式下各工作进程的异常)
+        * report: 导出聚合报告
+        * reset: 重置
+    """
+
+    def __init__(self, max_samples=3):
+        """
+        @func: 构建器
+        @params:
+            * max_samples(int): 每个异常签名保留的样本数量
+        """
+        self.max_samples = max_samples
+        # 异常签名 -> {(节点ID, 异常类型, 异常位置): {"count": 异常次数, "samples": [(数据, ProcessError), ...]}}
+        self.signatures = {}
+
+    def __len__(self):
+        return sum(entry["count"] for entry in self.signatures.values())
+
+    # 记录异常
+    def record(self, pid, exception, data=None, n=1):
+        """
+        @func: 记录异常
+        @params:
+            * pid(str): 异常节点ID
+            * exception(Exception|ProcessError): 异常对象
+            * data(any): 样本数据
+            * n(int): 异常次数(批量模式下整个分块异常时为分块的数据条数)
+        @return(ProcessError): 节点异常信息
+        """
+        error = exception if isinstance(exception, ProcessError) else ProcessError(pid, exception)
+        signature = (pid, error.type, error.location)
+        entry = self.signatures.get(signature)
+        if entry is None:
+            entry = self.signatures[signature] = {"count": 0, "samples": []}
+        entry["count"] += n
+        len(entry["samples"]) < self.max_samples and entry["samples"].append((data, error))
+        return error
+
+    def merge(self, other):
+        for signature, other_entry in other.signatures.items():
+            entry = self.signatures.setdefault(signature, {"count": 0, "samples": []})
+            entry["count"] += other_entry["count"]
+            entry["samples"].extend(other_entry["samples"][:self.max_samples - len(entry["samples"])])
+        return self
+
+    def reset(self):
+        self.signatures = {}
+
+    # 聚合报告
+    def report(self):
+        """
+        @func: 导出聚合报告(按异常次数降序)
+        @return(list):
+        [
+            {
+                "node": 节点ID, "type": 异常类型, "location": 异常位置, "count": 异常次数,
+                "samples": [{"data": 样本数据, "error": 格式化后的异常堆栈}, ...]
+            },
+            ...
+        ]
+        """
+        return [
+            {
+                "node": pid, "type": type, "location": location, "count": entry["count"],
+                "samples": [{"data": data, "error": error.traceback} for data, error in entry["samples"]],
+            }
+            for (pid, type, location), entry in sorted(self.signatures.items(), key=lambda item: item[1]["count"], reverse=True)
+        ]
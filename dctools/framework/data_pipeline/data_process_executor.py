@@ -0,0 +1,623 @@
+# Name: data process executor
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理管道的并行执行器
+"""
+# 多进程执行器(MultiProcessExecutor)
+## 场景描述
+DataProcessPipeline.process 在单个进程中串行处理所有数据，当数据处理节点是 CPU 密集型时，
+整个数据处理管道的吞吐量受限于单核性能。因此考虑将待处理的数据拆分成多个数据分块(chunk)，
+分发到多个工作进程中并行处理。
+
+## 设计思想
+1. 每个工作进程持有数据处理管道的独立副本，并在工作进程内部调用 init()/exit()，
+   因此数据处理节点中的资源(数据库连接，文件描述符等)不会在进程之间共享。
+2. 主进程通过任务队列分发数据分块，并限制“在途”分块的数量，避免一次性将全部数据推送到队列中。
+3. 结果按分块回收，有序模式下通过分块索引重排，保证结果与输入顺序一致，
+   重排缓冲区中等待输出的分块同样计入在途分块数，慢速分块阻塞输出时内存占用有上限。
+
+## 注意事项
+在 spawn 启动模式下，数据处理管道(包括数据处理节点)需要能够被 pickle 序列化。
+
+# 分区执行器(PartitionExecutor)
+## 场景描述
+部分数据处理节点需要维护单个实体的状态(比如按站点累计的聚合值，序列号校验)，
+多进程执行器将数据分块轮流分发到工作进程，相同实体的数据会分散到不同的工作进程中，导致状态错误。
+
+## 设计思想
+1. 通过分区键将数据哈希到固定的工作进程(分区)，每个工作进程拥有独立的任务队列，
+   相同键的数据总是由同一个工作进程按照输入顺序处理，不同的键之间仍然可以并行处理。
+2. 分区哈希默认使用 crc32 稳定哈希，相同的键在多次运行中映射到相同的分区。
+3. 统计每个分区的数据量占比与热点键(Misra-Gries 频繁项算法)，用于发现数据倾斜。
+
+# 流水线执行器(StageExecutor)
+## 场景描述
+在混合负载的数据处理管道中，每条数据需要流过完整的节点流之后才会处理下一条数据，
+因此一个慢速的 IO 节点会阻塞其后所有的快速节点。
+
+## 设计思想
+类似“流水线”的架构: 将节点流划分成多个阶段(一个或多个连续的数据处理节点)，每个阶段由独立的工作线程处理，
+阶段之间通过有界队列连接，当下游阶段处理速度不足时，上游阶段阻塞在队列写入上(背压)。
+通过统计每个阶段的队列深度和工作线程利用率来定位瓶颈阶段，并为其分配更多的工作线程。
+
+## 注意事项
+1. 同一阶段的多个工作线程共享数据处理节点对象，因此节点需要是线程安全的。
+2. 由于 GIL 的存在，流水线模式适用于 IO 密集型节点，CPU 密集型节点应该使用多进程执行器。
+3. 每个工作线程将节点指标与异常记录到独立的指标对象与异常聚合器中(无需加锁)，在执行结束时汇总到数据处理管道。
+4. 有序模式下，已读取但未输出的数据条数(包括重排缓冲区)不超过 queue_size * (阶段数 + 1) + 工作线程总数。
+"""
+
+
+import zlib
+import time
+import queue
+import itertools
+import threading
+import traceback
+import multiprocessing
+from queue import Empty, Full
+
+
+# 工作进程入口
+def _worker(pipeline, task_queue, result_queue, batch_size=None):
+    """
+    @func: 工作进程入口
+    @desc: 构建数据处理管道副本并初始化，循环处理任务队列中的数据分块，直到接收到结束标记(None)
+    @params:
+        * pipeline(DataProcessPipeline): 数据处理管道
+        * task_queue(Queue): 任务队列 -> (index, chunk)
+        * result_queue(Queue): 结果队列 -> (index, results) | (None, 异常信息) | ("metrics", 节点运行指标) | ("errors", 异常聚合器) | ("trace", 数据流追踪器) | ("timeline", 时间线追踪器)
+        * batch_size(int): 批量模式下的数据分块大小
+    """
+    try:
+        pipeline = pipeline._replicate().init()
+    except Exception:
+        result_queue.put((None, traceback.format_exc()))
+        return
+    try:
+        for index, chunk in iter(task_queue.get, None):
+            result_queue.put((index, pipeline._process_chunk(chunk, batch_size)))
+        # 回传节点运行指标与异常聚合
+        pipeline.metrics and result_queue.put(("metrics", pipeline.metrics))
+        pipeline.errors.signatures and result_queue.put(("errors", pipeline.errors))
+        pipeline.tracer is not None and pipeline.tracer.traced and result_queue.put(("trace", pipeline.tracer))
+        pipeline.timeline is not None and pipeline.timeline.records and result_queue.put(("timeline", pipeline.timeline))
+    finally:
+        pipeline.exit()
+
+
+# 多进程执行器
+class MultiProcessExecutor(object):
+    """
+    @class: MultiProcessExecutor | 多进程执行器
+    @desc:
+        将待处理数据按 chunksize 拆分成数据分块，分发到 workers 个工作进程中并行处理，
+        并以生成器的形式按分块回收单条数据的处理结果。
+    @method:
+        * execute: 并行处理数据(生成器)
+    @exp:
+        executor = MultiProcessExecutor(pipeline, workers=4, chunksize=100)
+        for result in executor.execute(datas):
+            ...
+    """
+
+    def __init__(self, pipeline, workers, chunksize=100, ordered=True, batch_size=None):
+        """
+        @func: 构建器
+        @params:
+            * pipeline(DataProcessPipeline): 数据处理管道
+            * workers(int): 工作进程数
+            * chunksize(int): 数据分块大小
+            * ordered(bool): 是否按照输入顺序输出结果
+            * batch_size(int): 批量模式下的数据分块大小，默认(None)逐条处理
+        """
+        if workers < 1:
+            raise ValueError("workers must be greater than 0")
+        if chunksize < 1:
+            raise ValueError("chunksize must be greater than 0")
+        self.pipeline = pipeline
+        self.workers = int(workers)
+        self.chunksize = int(chunksize)
+        self.ordered = ordered
+        self.batch_size = batch_size
+
+    # 数据分块
+    @staticmethod
+    def chunks(datas, chunksize):
+        datas = iter(datas)
+        while True:
+            chunk = list(itertools.islice(datas, chunksize))
+            if not chunk:
+                return
+            yield chunk
+
+    # 并行处理数据
+    def execute(self, datas):
+        """
+        @func: 并行处理数据(生成器)
+        @params:
+            * datas(iterable): 待处理的数据
+        @return(generator): 单条数据的处理结果(包含 state 字段)
+        """
+        ctx = multiprocessing.get_context()
+        task_queue, result_queue = ctx.Queue(), ctx.Queue()
+        # 启动工作进程
+        workers = [
+            ctx.Process(target=_worker, args=(self.pipeline, task_queue, result_queue, self.batch_size), daemon=True)
+            for _ in range(self.workers)
+        ]
+        [worker.start() for worker in workers]
+        # 数据分块(带索引)
+        chunks = enumerate(self.chunks(datas, self.chunksize))
+        # 在途分块数
+        pending, limit = 0, self.workers * 2
+        # 有序模式下的重排缓冲区
+        buffer, next_index = {}, 0
+
+        # 投递分块(在途分块与重排缓冲区中的分块总数不超过 limit)
+        def submit():
+            nonlocal pending
+            for task in itertools.islice(chunks, max(0, limit - pending - len(buffer))):
+                task_queue.put(task)
+                pending += 1
+
+        try:
+            submit()
+            while pending:
+                index, results = self._get(result_queue, workers)
+                pending -= 1
+                if not self.ordered:
+                    submit()
+                    yield from results
+                    continue
+                buffer[index] = results
+                ready = []
+                while next_index in buffer:
+                    ready.append(buffer.pop(next_index))
+                    next_index += 1
+                # 在输出之前补充投递，避免工作进程空闲
+                submit()
+                for results in ready:
+                    yield from results
+        finally:
+            self._shutdown(workers, [task_queue] * len(workers), result_queue)
+
+    # 回收结果
+    def _get(self, result_queue, workers):
+        while True:
+            try:
+                index, results = result_queue.get(timeout=1)
+            except Empty:
+                # 检测工作进程异常退出
+                dead = [worker for worker in workers if worker.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"worker(pid={dead[0].pid}) exited with code {dead[0].exitcode}")
+                continue
+            # 工作进程初始化异常
+            if index is None:
+                raise RuntimeError(f"worker init failed\n{results}")
+            return index, results
+
+    # 汇总工作进程回传的节点运行指标与异常聚合
+    def _collect(self, item):
+        if item[0] == "metrics" and self.pipeline.metrics is not None:
+            self.pipeline.metrics.merge(item[1])
+        elif item[0] == "errors":
+            self.pipeline.errors.merge(item[1])
+        elif item[0] == "trace" and self.pipeline.tracer is not None:
+            self.pipeline.tracer.merge(item[1])
+        elif item[0] == "timeline" and self.pipeline.timeline is not None:
+            self.pipeline.timeline.merge(item[1])
+
+    # 关闭工作进程
+    def _shutdown(self, workers, task_queues, result_queue):
+        """
+        @func: 关闭工作进程
+        @params:
+            * workers(list): 工作进程
+            * task_queues(list): 与工作进程一一对应的任务队列(共享任务队列时为同一个队列)
+            * result_queue(Queue): 结果队列
+        """
+        # 清空未处理的分块(提前终止的场景)
+        for task_queue in set(task_queues):
+            try:
+                while True:
+                    task_queue.get_nowait()
+            except Empty:
+                pass
+        [task_queue.put(None) for task_queue in task_queues]
+        # 等待工作进程退出(同时清空结果队列，避免工作进程阻塞在队列写入上)
+        while any(worker.is_alive() for worker in workers):
+            try:
+                self._collect(result_queue.get(timeout=0.1))
+            except Empty:
+                pass
+        [worker.join() for worker in workers]
+        try:
+            while True:
+                self._collect(result_queue.get_nowait())
+        except Empty:
+            pass
+        [task_queue.close() for task_queue in set(task_queues)]
+        result_queue.close()
+
+
+# 默认分区哈希(稳定哈希，不受 PYTHONHASHSEED 影响，相同的键在多次运行中映射到相同的分区)
+def _partition_hash(key):
+    return zlib.crc32(key if isinstance(key, bytes) else str(key).encode("utf-8"))
+
+
+# 热点键统计(Misra-Gries 频繁项算法)
+class _HotKeys(object):
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.counter = {}
+
+    def add(self, key):
+        counter = self.counter
+        if key in counter:
+            counter[key] += 1
+        elif len(counter) < self.capacity:
+            counter[key] = 1
+        else:
+            # 所有计数减一并移除计数归零的键(计数为下界估计值)
+            for k in list(counter):
+                counter[k] -= 1
+                if not counter[k]:
+                    del counter[k]
+
+    def top(self, n):
+        return sorted(self.counter.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+# 分区执行器
+class PartitionExecutor(MultiProcessExecutor):
+    """
+    @class: PartitionExecutor | 分区执行器
+    @desc:
+        按照分区键将数据哈希到固定的工作进程，每个工作进程拥有独立的任务队列，
+        因此相同键的数据总是由同一个工作进程按照输入顺序处理，适用于维护单个实体状态(按站点聚合，序列号校验等)的数据处理节点。
+        通过 stats 查看每个工作进程的数据量占比(倾斜度)与热点键。
+    @method:
+        * execute: 分区并行处理数据(生成器)
+        * stats: 分区运行状态，可以在处理过程中调用
+    @exp:
+        executor = PartitionExecutor(pipeline, workers=4, key=lambda data: data["site"])
+        for result in executor.execute(datas):
+            ...
+        print(executor.stats())
+    """
+
+    def __init__(self, pipeline, workers, key, chunksize=100, ordered=True, batch_size=None, partitioner=None, hot_keys=10):
+        """
+        @func: 构建器
+        @params:
+            * pipeline(DataProcessPipeline): 数据处理管道
+            * workers(int): 工作进程数(分区数)
+            * key(str|callable): 分区键，字段名或者可调用对象 key(data) -> 键
+            * chunksize(int): 数据分块大小(每个分区的数据累积到 chunksize 条时投递)
+            * ordered(bool): 是否按照输入顺序输出结果，为 False 时仅保证相同键的数据按照输入顺序输出
+            * batch_size(int): 批量模式下的数据分块大小，默认(None)逐条处理
+            * partitioner(callable): 分区哈希函数 partitioner(键) -> int，默认为 crc32 稳定哈希
+            * hot_keys(int): 统计的热点键数量
+        """
+        super().__init__(pipeline, workers, chunksize, ordered, batch_size)
+        self.key = key if callable(key) else (lambda data: data[key])
+        self.partitioner = partitioner or _partition_hash
+        self.hot_keys = hot_keys
+        self.__stats = None
+
+    # 分区运行状态
+    def stats(self):
+        """
+        @func: 分区运行状态
+        @return(dict):
+        {
+            "records": 数据总数,
+            "skew": 倾斜度(最大分区数据量 / 平均分区数据量，1.0 表示完全均衡),
+            "workers": [{"worker": 分区索引, "records": 数据量, "share": 数据量占比, "pending": 在途数据量}, ...],
+            "hot_keys": [(键, 数据量下界估计值), ...]
+        }
+        """
+        if self.__stats is None:
+            return {}
+        records = self.__stats["records"]
+        total = sum(records)
+        mean = total / len(records)
+        return {
+            "records": total,
+            "skew": max(records) / mean if total else 0.0,
+            "workers": [
+                {"worker": i, "records": n, "share": n / total if total else 0.0, "pending": pending}
+                for i, (n, pending) in enumerate(zip(records, self.__stats["pending"]))
+            ],
+            "hot_keys": self.__stats["hot_keys"].top(self.hot_keys),
+        }
+
+    # 分区并行处理数据
+    def execute(self, datas):
+        """
+        @func: 分区并行处理数据(生成器)
+        @desc:
+            数据按分区缓冲，当分区缓冲区达到 chunksize 条时投递到该分区的任务队列，
+            在途数据量(包括有序模式下重排缓冲区中等待输出的数据)达到上限(workers * chunksize * 2)时投递所有分区中未满的缓冲区并回收结果。
+        @params:
+            * datas(iterable): 待处理的数据
+        @return(generator): 单条数据的处理结果(包含 state 字段)
+        """
+        ctx = multiprocessing.get_context()
+        task_queues, result_queue = [ctx.Queue() for _ in range(self.workers)], ctx.Queue()
+        # 启动工作进程(每个工作进程消费独立的任务队列)
+        workers = [
+            ctx.Process(target=_worker, args=(self.pipeline, task_queue, result_queue, self.batch_size), daemon=True)
+            for task_queue in task_queues
+        ]
+        [worker.start() for worker in workers]
+        key, partitioner, chunksize, n = self.key, self.partitioner, self.chunksize, self.workers
+        hot_keys = _HotKeys(max(self.hot_keys * 16, 128))
+        self.__stats = stats = {"records": [0] * n, "pending": [0] * n, "hot_keys": hot_keys}
+        records, pending = stats["records"], stats["pending"]
+        # 分区缓冲区 -> [[(序号, 数据), ...], ...]
+        buffers = [[] for _ in range(n)]
+        # 在途分块 -> {分块索引: (分区索引, [序号, ...])}
+        inflight, chunk_index = {}, itertools.count()
+        # 有序模式下的重排缓冲区
+        reorder, next_seq = {}, 0
+        limit = n * chunksize * 2
+
+        # 投递分区缓冲区
+        def flush(i):
+            buffer = buffers[i]
+            index = next(chunk_index)
+            inflight[index] = (i, [seq for seq, _ in buffer])
+            task_queues[i].put((index, [data for _, data in buffer]))
+            buffers[i] = []
+
+        # 回收一个分块的结果
+        def receive():
+            index, results = self._get(result_queue, workers)
+            i, seqs = inflight.pop(index)
+            pending[i] -= len(seqs)
+            return seqs, results
+
+        def drain():
+            nonlocal next_seq
+            seqs, results = receive()
+            if not self.ordered:
+                yield from results
+                return
+            reorder.update(zip(seqs, results))
+            while next_seq in reorder:
+                yield reorder.pop(next_seq)
+                next_seq += 1
+
+        try:
+            for seq, data in enumerate(datas):
+                data_key = key(data)
+                hot_keys.add(data_key)
+                i = partitioner(data_key) % n
+                buffers[i].append((seq, data))
+                records[i] += 1
+                pending[i] += 1
+                len(buffers[i]) >= chunksize and flush(i)
+                # 限制在途数据量(包括重排缓冲区)
+                while sum(pending) + len(reorder) >= limit:
+                    [flush(j) for j in range(n) if buffers[j]]
+                    yield from drain()
+            [flush(j) for j in range(n) if buffers[j]]
+            while inflight:
+                yield from drain()
+        finally:
+            self._shutdown(workers, task_queues, result_queue)
+
+
+# 流水线执行器终止信号
+class _Stop(Exception):
+    pass
+
+
+# 流水线执行器
+class StageExecutor(object):
+    """
+    @class: StageExecutor | 流水线执行器
+    @desc:
+        将节点流划分成多个阶段，每个阶段由独立的工作线程处理，阶段之间通过有界队列连接。
+        数据在某个阶段被过滤(FILTER)或处理异常(ERROR)时直接输出，不再进入后续阶段。
+    @method:
+        * execute: 流水线处理数据(生成器)
+        * stats: 阶段运行状态(队列深度，工作线程利用率)，可以在处理过程中从其他线程调用
+    @exp:
+        executor = StageExecutor(pipeline.init(), stages=[(["DataIdFilter"], 1), (["Geocoder"], 8), (["Writer"], 1)])
+        for result in executor.execute(datas):
+            ...
+        print(executor.stats())
+    """
+
+    def __init__(self, pipeline, stages=None, queue_size=100, ordered=True):
+        """
+        @func: 构建器
+        @params:
+            * pipeline(DataProcessPipeline): (已初始化的)数据处理管道
+            * stages(list): 
+                阶段划分 -> [(节点ID | [节点ID, ...], 工作线程数), ...]，默认(None)每个节点一个阶段(单线程)
+                所有阶段的节点按顺序拼接后需要与数据处理管道的节点流一致
+            * queue_size(int): 阶段之间的队列容量
+            * ordered(bool): 是否按照输入顺序输出结果
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be greater than 0")
+        self.pipeline = pipeline
+        self.queue_size = int(queue_size)
+        self.ordered = ordered
+        pids = [node.pid for node in pipeline.nodes]
+        stages = stages or [([pid], 1) for pid in pids]
+        # 阶段 -> [{"nodes": [节点ID], "start": 起始节点索引, "stop": 结束节点索引, "workers": 工作线程数}, ...]
+        self.stages, start = [], 0
+        for stage_pids, workers in stages:
+            stage_pids = [stage_pids] if isinstance(stage_pids, str) else list(stage_pids)
+            if pids[start:start+len(stage_pids)] != stage_pids:
+                raise ValueError(f"stage({stage_pids}) does not match node flow {pids[start:start+len(stage_pids)]}")
+            if workers < 1:
+                raise ValueError("stage workers must be greater than 0")
+            self.stages.append({"nodes": stage_pids, "start": start, "stop": start + len(stage_pids), "workers": int(workers)})
+            start += len(stage_pids)
+        if start != len(pids):
+            raise ValueError(f"stages do not cover node flow, missing {pids[start:]}")
+        self.__stats = None
+
+    # 阶段运行状态
+    def stats(self):
+        """
+        @func: 阶段运行状态
+        @return(list):
+        [
+            {
+                "nodes": 阶段节点ID列表, "workers": 工作线程数, "processed": 处理数据条数,
+                "queue_depth": 当前输入队列深度, "queue_max": 最大输入队列深度, "queue_avg": 平均输入队列深度(每次取数据时采样),
+                "busy": 工作线程累计处理耗时(秒), "utilisation": 工作线程利用率(busy / (运行时长 * 工作线程数))
+            },
+            ...
+        ]
+        """
+        if self.__stats is None:
+            return []
+        elapsed = (self.__stats["end"] or time.perf_counter()) - self.__stats["start"]
+        stats = []
+        for stage, stage_stats, stage_queue in zip(self.stages, self.__stats["stages"], self.__stats["queues"]):
+            stats.append({
+                "nodes": stage["nodes"],
+                "workers": stage["workers"],
+                "processed": stage_stats["processed"],
+                "queue_depth": stage_queue.qsize(),
+                "queue_max": stage_stats["queue_max"],
+                "queue_avg": stage_stats["queue_sum"] / stage_stats["processed"] if stage_stats["processed"] else 0.0,
+                "busy": stage_stats["busy"],
+                "utilisation": stage_stats["busy"] / (elapsed * stage["workers"]) if elapsed else 0.0,
+            })
+        return stats
+
+    # 流水线处理数据
+    def execute(self, datas):
+        """
+        @func: 流水线处理数据(生成器)
+        @params:
+            * datas(iterable): 待处理的数据
+        @return(generator): 单条数据的处理结果(包含 state 字段)
+        """
+        pipeline = self.pipeline
+        # 空节点流: 直接输出
+        if not self.stages:
+            for data in datas:
+                yield pipeline._close(pipeline._open(data), data)
+            return
+        stop = threading.Event()
+        # 有序模式下限制已读取但未输出的数据条数(慢速数据阻塞输出时，重排缓冲区的内存占用有上限)
+        permits = self.ordered and threading.Semaphore(self.queue_size * (len(self.stages) + 1) + sum(stage["workers"] for stage in self.stages))
+        # 阶段输入队列 + 结果队列
+        queues = [queue.Queue(self.queue_size) for _ in self.stages] + [queue.Queue(self.queue_size)]
+        self.__stats = {
+            "start": time.perf_counter(), "end": None, "queues": queues[:-1],
+            "stages": [{"processed": 0, "queue_max": 0, "queue_sum": 0, "busy": 0.0, "alive": stage["workers"], "lock": threading.Lock()} for stage in self.stages],
+        }
+
+        # 可中断的队列读写
+        def put(q, item):
+            while True:
+                try:
+                    return q.put(item, timeout=0.1)
+                except Full:
+                    if stop.is_set():
+                        raise _Stop()
+
+        def get(q):
+            while True:
+                try:
+                    return q.get(timeout=0.1)
+                except Empty:
+                    if stop.is_set():
+                        raise _Stop()
+
+        # 数据输入线程
+        def feeder():
+            try:
+                for index, data in enumerate(datas):
+                    while permits and not permits.acquire(timeout=0.1):
+                        if stop.is_set():
+                            raise _Stop()
+                    put(queues[0], (index, pipeline._open(data), data))
+                [put(queues[0], None) for _ in range(self.stages[0]["workers"])]
+            except _Stop:
+                pass
+            except Exception:
+                stop.is_set() or put(queues[-1], ("error", traceback.format_exc()))
+
+        # 阶段工作线程
+        def worker(i, run):
+            in_queue, next_queue, out_queue = queues[i], queues[i+1], queues[-1]
+            stage_stats = self.__stats["stages"][i]
+            is_last = i == len(self.stages) - 1
+            try:
+                while True:
+                    depth = in_queue.qsize()
+                    item = get(in_queue)
+                    if item is None:
+                        break
+                    index, processed_result, data = item
+                    start = time.perf_counter()
+                    data = run(processed_result, data)
+                    busy = time.perf_counter() - start
+                    with stage_stats["lock"]:
+                        stage_stats["processed"] += 1
+                        stage_stats["busy"] += busy
+                        stage_stats["queue_sum"] += depth
+                        stage_stats["queue_max"] = max(stage_stats["queue_max"], depth)
+                    if is_last or processed_result["state"] != "SUCCES":
+                        put(out_queue, ("result", index, pipeline._close(processed_result, data)))
+                    else:
+                        put(next_queue, (index, processed_result, data))
+                # 阶段的最后一个工作线程退出时通知下一阶段
+                with stage_stats["lock"]:
+                    stage_stats["alive"] -= 1
+                    last_worker = not stage_stats["alive"]
+                if last_worker:
+                    if is_last:
+                        put(out_queue, ("done", ))
+                    else:
+                        [put(next_queue, None) for _ in range(self.stages[i+1]["workers"])]
+            except _Stop:
+                pass
+            except Exception:
+                stop.is_set() or put(out_queue, ("error", traceback.format_exc()))
+
+        threads, merges = [threading.Thread(target=feeder, daemon=True)], []
+        for i, stage in enumerate(self.stages):
+            for _ in range(stage["workers"]):
+                # 每个工作线程独立的节点指标与异常聚合器
+                run, merge = pipeline._segment(stage["start"], stage["stop"], local=True)
+                merges.append(merge)
+                threads.append(threading.Thread(target=worker, args=(i, run), daemon=True))
+        [thread.start() for thread in threads]
+        # 回收结果
+        buffer, next_index = {}, 0
+        try:
+            while True:
+                item = queues[-1].get()
+                if item[0] == "done":
+                    break
+                if item[0] == "error":
+                    raise RuntimeError(f"stage worker failed\n{item[1]}")
+                _, index, result = item
+                if not self.ordered:
+                    yield result
+                    continue
+                buffer[index] = result
+                while next_index in buffer:
+                    permits.release()
+                    yield buffer.pop(next_index)
+                    next_index += 1
+        finally:
+            stop.set()
+            [thread.join() for thread in threads]
+            [merge() for merge in merges]
+            self.__stats["end"] = time.perf_counter()
@@ -0,0 +1,256 @@
+# Name: data process incremental
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 基于内容哈希索引的增量处理
+"""
+# 场景描述
+每日的重复采集会将大部分内容未变化的数据再次送入数据处理管道，
+这些数据需要重新经过完整的节点流处理，而处理结果与上一次完全相同。
+
+# 设计思想
+1. 通过持久化的内容哈希索引(SQLite)记录每条数据的 数据ID -> (内容哈希, 管道版本, 处理状态, 处理结果)，
+   数据ID 由 key(data) 提取，内容哈希为原始数据(或者指定字段)规范化 JSON 的 blake2b 摘要。
+2. 数据在进入数据处理管道之前查询索引，数据ID已记录，且内容哈希与管道版本均未变化时命中:
+    * skip: 跳过该数据，不输出处理结果
+    * replay: 输出索引中保存的上一次处理结果(result["cached"] = True，source 为 None)
+   未命中(新增/内容变化/管道版本变化)的数据经过完整的节点流处理，处理结果写回索引。
+3. 管道版本默认由节点流结构(节点类型与节点ID)生成，节点逻辑变化时可以通过 version 参数显式指定版本，使索引整体失效。
+4. 处理异常(ERROR)的数据从索引中移除，下次运行时重新处理。
+5. 命中的数据通过按输入顺序排列的队列与处理结果合并，输出顺序与输入顺序一致(要求 ordered=True)。
+6. 索引查询与处理结果回放按 lookup_size 条数据分批执行(WHERE id IN (...))，减少 SQLite 的单次查询开销。
+7. 流水线模式下索引查询(skip)在读取线程中执行，索引连接允许跨线程使用，并通过锁串行化访问。
+8. replay 模式下命中的数据在回放前保留在队列中，回放时索引记录已不存在(例如被其他进程清理)的数据重新处理(计入 missing)，
+   不会因为缺失的记录中断处理。
+"""
+
+
+import os
+import json
+import pickle
+import sqlite3
+import hashlib
+import threading
+import itertools
+from collections import deque
+
+
+# 规范化 JSON 的内容哈希
+def content_hash(data, fields=None):
+    """
+    @func: 计算数据的内容哈希
+    @params:
+        * data(any): 数据
+        * fields(list): 参与哈希计算的字段(data 为 dict 时有效)，默认(None)为全部字段
+    @return(bytes): 128 位摘要
+    """
+    if fields is not None:
+        data = {field: data.get(field) for field in fields}
+    text = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# 增量处理索引
+class DataProcessIncremental(object):
+    """
+    @class: DataProcessIncremental | 增量处理索引
+    @desc:
+        记录数据的内容哈希与处理结果，重复运行时跳过(或回放)内容与管道版本均未变化的数据，
+        通过 process_iter(incremental=...) 或 process(incremental=...) 使用。
+    @method:
+        * skip: 查询索引，过滤出需要处理的数据
+        * track: 合并命中的数据与处理结果，并将处理结果写回索引
+        * commit: 提交索引更新
+        * stats: 命中率与索引大小
+        * clear: 清空索引
+        * close: 关闭索引
+    @exp:
+        incremental = DataProcessIncremental("./news.index", key=lambda data: data["url"], mode="replay")
+        result = pipeline.process(crawled, incremental=incremental)
+        print(incremental.stats())
+    """
+
+    MODES = ("skip", "replay")
+
+    def __init__(self, filepath, key, version=None, mode="skip", fields=None, interval=1000, lookup_size=500):
+        """
+        @func: 构建器
+        @params:
+            * filepath(str): 索引文件路径(SQLite 数据库)
+            * key(callable): 数据ID提取函数 key(data) -> id
+            * version(str): 管道版本，默认(None)由数据处理管道根据节点流结构生成
+            * mode(str): 命中处理方式 -> "skip"(跳过) | "replay"(输出上一次的处理结果)
+            * fields(list): 参与内容哈希计算的字段，默认(None)为全部字段
+            * interval(int): 索引更新的提交间隔(数据条数)
+            * lookup_size(int): 索引查询与回放的批量大小
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode({mode}) must be one of {list(self.MODES)}")
+        if interval < 1:
+            raise ValueError("interval must be greater than 0")
+        self.filepath = filepath
+        self.key = key
+        self.version = version
+        self.mode = mode
+        self.fields = fields
+        self.interval = int(interval)
+        self.lookup_size = max(1, min(int(lookup_size), 900))
+        # 流水线模式下 skip 在读取线程中执行(跨线程使用，通过锁串行化)
+        self.__conn = sqlite3.connect(filepath, check_same_thread=False)
+        self.__lock = threading.Lock()
+        self.__conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "id TEXT PRIMARY KEY, hash BLOB, version TEXT, state TEXT, node TEXT, output BLOB)"
+        )
+        self.__conn.commit()
+        # 当前运行的管道版本
+        self.__version = version
+        # 按输入顺序排列的队列 -> [(命中, 数据ID, 内容哈希, 数据(replay 模式下命中的数据，用于索引记录缺失时重新处理)), ...]
+        self.__inflight = deque()
+        # 待提交的索引更新/删除
+        self.__upserts, self.__deletes = [], []
+        self.__stats = {"lookups": 0, "hits": 0, "new": 0, "changed": 0, "missing": 0, "errors": 0}
+
+    # 查询索引
+    def skip(self, datas, version=None):
+        """
+        @func: 查询索引，过滤出需要处理的数据(新增/内容变化/管道版本变化)
+        @params:
+            * datas(iterable): 数据源
+            * version(str): 数据处理管道生成的默认版本(未指定 version 参数时使用)
+        @return(generator): 需要处理的数据
+        """
+        self.__version = self.version or version
+        key, fields, inflight, stats = self.key, self.fields, self.__inflight, self.__stats
+        replay = self.mode == "replay"
+        datas = iter(datas)
+        while True:
+            chunk = list(itertools.islice(datas, self.lookup_size))
+            if not chunk:
+                break
+            ids = [str(key(data)) for data in chunk]
+            rows = self.__select("id, hash, version", ids)
+            stats["lookups"] += len(chunk)
+            for data, data_id in zip(chunk, ids):
+                digest = content_hash(data, fields)
+                row = rows.get(data_id)
+                if row is not None and row[1] == digest and row[2] == self.__version:
+                    stats["hits"] += 1
+                    inflight.append((True, data_id, digest, data if replay else None))
+                    continue
+                stats["new" if row is None else "changed"] += 1
+                inflight.append((False, data_id, digest, None))
+                yield data
+
+    # 批量查询索引 -> {数据ID: 记录}
+    def __select(self, columns, ids):
+        sql = f"SELECT {columns} FROM records WHERE id IN ({','.join('?' * len(ids))})"
+        with self.__lock:
+            return {row[0]: row for row in self.__conn.execute(sql, ids)}
+
+    # 合并命中的数据与处理结果
+    def track(self, results, process=None):
+        """
+        @func: 按输入顺序合并命中的数据(回放)与处理结果，并将处理结果写回索引
+        @params:
+            * results(iterable): 数据处理结果(按输入顺序)
+            * process(callable): 单条数据的处理函数 process(data) -> 处理结果(iterable)，
+              用于重新处理回放时索引记录已不存在的数据，默认(None)跳过这些数据
+        @return(generator): 数据处理结果
+        """
+        inflight = self.__inflight
+        try:
+            for result in results:
+                # 输出排在当前处理结果之前的命中数据
+                if inflight[0][0]:
+                    yield from self.__replay(process)
+                _, data_id, digest, _ = inflight.popleft()
+                self.__record(data_id, digest, result["state"], result)
+                yield result
+            while inflight:
+                yield from self.__replay(process)
+        finally:
+            inflight.clear()
+            self.commit()
+
+    # 回放队列头部连续的命中数据(分批查询)
+    def __replay(self, process=None):
+        inflight, stats = self.__inflight, self.__stats
+        while inflight and inflight[0][0]:
+            entries = []
+            while inflight and inflight[0][0] and len(entries) < self.lookup_size:
+                entries.append(inflight.popleft())
+            if self.mode == "skip":
+                continue
+            rows = self.__select("id, state, node, output", [entry[1] for entry in entries])
+            for _, data_id, digest, data in entries:
+                row = rows.get(data_id)
+                # 索引记录已不存在: 重新处理
+                if row is None:
+                    stats["hits"] -= 1
+                    stats["missing"] += 1
+                    for result in (process(data) if process is not None else ()):
+                        self.__record(data_id, digest, result["state"], result)
+                        yield result
+                    continue
+                _, state, node, output = row
+                result = {"state": state, "source": None, "data": pickle.loads(output), "cached": True}
+                node is not None and result.update(node=node)
+                yield result
+
+    def __record(self, data_id, digest, state, result):
+        if state == "ERROR":
+            self.__stats["errors"] += 1
+            self.__deletes.append((data_id, ))
+        else:
+            output = pickle.dumps(result["data"], protocol=pickle.HIGHEST_PROTOCOL) if self.mode == "replay" else None
+            self.__upserts.append((data_id, digest, self.__version, state, result.get("node"), output))
+        len(self.__upserts) + len(self.__deletes) >= self.interval and self.commit()
+
+    # 提交索引更新
+    def commit(self):
+        if not (self.__upserts or self.__deletes):
+            return
+        with self.__lock, self.__conn:
+            self.__conn.executemany(
+                "INSERT INTO records (id, hash, version, state, node, output) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET hash = excluded.hash, version = excluded.version, "
+                "state = excluded.state, node = excluded.node, output = excluded.output",
+                self.__upserts,
+            )
+            self.__conn.executemany("DELETE FROM records WHERE id = ?", self.__deletes)
+        self.__upserts, self.__deletes = [], []
+
+    # 命中率与索引大小
+    def stats(self):
+        """
+        @func: 命中率与索引大小
+        @return(dict):
+        {
+            "lookups": 查询次数, "hits": 命中次数, "new": 新增数据, "changed": 内容(或管道版本)变化的数据,
+            "missing": 回放时索引记录已不存在(重新处理)的数据, "errors": 处理异常(从索引中移除)的数据, "hit_rate": 命中率,
+            "index_size": 索引记录数, "index_bytes": 索引文件大小(字节)
+        }
+        """
+        stats = dict(self.__stats)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        with self.__lock:
+            stats["index_size"] = self.__conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        stats["index_bytes"] = os.path.getsize(self.filepath) if os.path.exists(self.filepath) else 0
+        return stats
+
+    # 清空索引
+    def clear(self):
+        with self.__lock, self.__conn:
+            self.__conn.execute("DELETE FROM records")
+        self.__upserts, self.__deletes = [], []
+        self.__stats = dict.fromkeys(self.__stats, 0)
+
+    def close(self):
+        self.commit()
+        self.__conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
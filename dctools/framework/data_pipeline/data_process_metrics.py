@@ -0,0 +1,248 @@
+# Name: data process metrics
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理节点的运行指标统计
+"""
+# 场景描述
+数据处理管道在运行时缺少可观测性，无法判断哪个数据处理节点是性能瓶颈，
+以及哪个节点过滤(FILTER)或异常(ERROR)的数据最多。
+
+# 设计思想
+1. 以数据处理节点ID(pid)为单位统计调用次数，FILTER/ERROR 次数，累计耗时以及耗时分布。
+2. 为了降低常驻开启时的性能损耗，计数与计时分开处理:
+    * 计数: 数据处理管道只记录处理的数据总数，以及终止数据处理的节点的 FILTER/ERROR 次数，
+      由于数据按节点流的顺序处理，节点的调用次数 = 数据总数 - 上游节点的 FILTER/ERROR 次数，
+      因此在导出时推导节点调用次数，不需要在每次节点调用时计数。
+    * 计时: 按 sample_interval 间隔对数据进行采样计时，平均耗时与分位数基于采样数据计算，
+      累计耗时 = 平均耗时 * 调用次数(估算值)。sample_interval=1 时对所有数据计时。
+3. 耗时分布通过固定的对数分桶直方图记录，分位数(p50/p90/p99)基于直方图近似计算(取所在分桶的上边界)，
+   直方图结构与 Prometheus 的 histogram 类型一致，可以直接导出为 Prometheus 文本格式。
+4. 路由节点(DataProcessRouter)的分支内部节点不在主节点流上，无法推导调用次数，
+   注册时指定 counted=True，由路由节点在每次调用时显式计数(不计时)。
+5. 节点ID默认为类名，同一个节点类的多个实例(未指定 pid)在主节点流中的节点ID相同，
+   注册主节点流节点时指定 unique=True，重复的节点ID追加序号(Mod, Mod#2, ...)，各节点独立统计。
+"""
+
+
+import json
+from bisect import bisect_left
+
+
+# 耗时分桶上边界(秒): 1us ~ 100s
+LATENCY_BUCKETS = tuple(
+    round(base * 10 ** exp, 9)
+    for exp in range(-6, 2)
+    for base in (1, 2.5, 5)
+) + (100.0, )
+
+
+# 节点指标
+class NodeMetrics(object):
+    """
+    @class: NodeMetrics | 节点指标
+    @desc: 单个数据处理节点的 FILTER/ERROR 计数器与(采样)耗时直方图
+    """
+
+    __slots__ = ("pid", "calls", "filter", "error", "samples", "time", "min", "max", "buckets")
+
+    def __init__(self, pid, counted=False):
+        self.pid = pid
+        # 调用次数(显式计数的节点，None 表示由数据处理管道推导)
+        self.calls = 0 if counted else None
+        # 过滤次数
+        self.filter = 0
+        # 异常次数
+        self.error = 0
+        # 采样次数(按数据条数计算)
+        self.samples = 0
+        # 采样累计耗时(秒)
+        self.time = 0.0
+        # 最小/最大耗时(秒)
+        self.min = float("inf")
+        self.max = 0.0
+        # 耗时直方图(最后一个分桶对应 +Inf)
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    # 记录耗时
+    def record(self, cost, n=1):
+        """
+        @func: 记录节点调用耗时
+        @params:
+            * cost(float): 耗时(秒)
+            * n(int): 数据条数(批量模式下按单条数据的平均耗时计入直方图)
+        """
+        self.samples += n
+        self.time += cost
+        if n != 1:
+            cost = cost / n
+        self.buckets[bisect_left(LATENCY_BUCKETS, cost)] += n
+        if cost < self.min:
+            self.min = cost
+        if cost > self.max:
+            self.max = cost
+
+    # 分位数
+    def percentile(self, q):
+        """
+        @func: 基于耗时直方图计算近似分位数(所在分桶的上边界)
+        @params:
+            * q(float): 分位点(0~1)
+        @return(float): 耗时(秒)
+        """
+        if not self.samples:
+            return None
+        rank, count = q * self.samples, 0
+        for i, n in enumerate(self.buckets):
+            count += n
+            if count >= rank and n:
+                return min(LATENCY_BUCKETS[i], self.max) if i < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    # 合并指标
+    def merge(self, other):
+        if other.calls is not None:
+            self.calls = (self.calls or 0) + other.calls
+        self.filter += other.filter
+        self.error += other.error
+        self.samples += other.samples
+        self.time += other.time
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def to_dict(self, calls):
+        time_avg = self.time / self.samples if self.samples else None
+        return {
+            "calls": calls,
+            "succes": calls - self.filter - self.error,
+            "filter": self.filter,
+            "error": self.error,
+            "samples": self.samples,
+            "time_total": time_avg * calls if self.samples else 0.0,
+            "time_avg": time_avg,
+            "time_min": self.min if self.samples else None,
+            "time_max": self.max if self.samples else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+        }
+
+
+# 数据处理管道指标
+class DataProcessMetrics(object):
+    """
+    @class: DataProcessMetrics | 数据处理管道指标
+    @desc: 按数据处理节点ID汇总节点指标，并支持导出为 JSON 与 Prometheus 文本格式
+    @property:
+        * records(int): 处理的数据总数
+        * sample_interval(int): 计时采样间隔
+    @method:
+        * register: 注册节点(注册顺序即节点流顺序，用于推导节点调用次数，counted=True 时显式计数，unique=True 时重复的节点ID追加序号)
+        * tick: 记录处理的数据条数，并返回当前数据是否需要采样计时
+        * merge: 合并其他指标对象(用于汇总并行模式下各工作进程的指标)
+        * reset: 重置指标
+        * stats: 导出指标(dict)
+        * to_json: 导出 JSON 格式
+        * to_prometheus: 导出 Prometheus 文本格式
+    """
+
+    def __init__(self, sample_interval=10):
+        """
+        @func: 构建器
+        @params:
+            * sample_interval(int): 计时采样间隔，每 sample_interval 条数据对一条数据的节点调用进行计时
+        """
+        if sample_interval < 1:
+            raise ValueError("sample_interval must be greater than 0")
+        self.sample_interval = int(sample_interval)
+        self.records = 0
+        # 节点指标 -> {pid: NodeMetrics}
+        self.nodes = {}
+
+    def register(self, pid, counted=False, unique=False):
+        # 节点ID已注册时追加序号(unique=True)
+        key, n = pid, 1
+        while unique and key in self.nodes:
+            n += 1
+            key = f"{pid}#{n}"
+        return self.nodes.setdefault(key, NodeMetrics(key, counted))
+
+    def tick(self, n=1):
+        self.records += n
+        return not self.records % self.sample_interval
+
+    def merge(self, other):
+        self.records += other.records
+        for pid, node in other.nodes.items():
+            self.register(pid).merge(node)
+        return self
+
+    def reset(self):
+        # 原地重置(执行计划中持有 NodeMetrics 对象的引用)
+        self.records = 0
+        [node.__init__(node.pid, node.calls is not None) for node in self.nodes.values()]
+
+    # 推导节点调用次数
+    def calls(self):
+        calls, reached = {}, self.records
+        for pid, node in self.nodes.items():
+            if node.calls is not None:
+                calls[pid] = node.calls
+                continue
+            calls[pid] = reached
+            reached -= node.filter + node.error
+        return calls
+
+    def stats(self):
+        """
+        @func: 导出指标
+        @return(dict):
+        {
+            "节点ID": {
+                "calls": 调用次数, "succes": 成功次数, "filter": 过滤次数, "error": 异常次数,
+                "samples": 采样计时次数, "time_total": 累计耗时(估算值), "time_avg": 平均耗时,
+                "time_min": 最小耗时, "time_max": 最大耗时,
+                "p50": 耗时中位数, "p90": 90分位耗时, "p99": 99分位耗时
+            },
+            ...
+        }
+        """
+        calls = self.calls()
+        return {pid: node.to_dict(calls[pid]) for pid, node in self.nodes.items()}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.stats(), ensure_ascii=False, **kwargs)
+
+    def to_prometheus(self, prefix="dctools_pipeline", labels=None):
+        """
+        @func: 导出 Prometheus 文本格式
+        @desc: 耗时直方图(latency_seconds)基于采样数据，其 _count 为采样次数
+        @params:
+            * prefix(str): 指标名前缀
+            * labels(dict): 附加标签，比如 {"pipeline": "news"}
+        @return(str): Prometheus 文本格式指标
+        """
+        def fmt_labels(pid, **extra):
+            items = {**(labels or {}), "node": pid, **extra}
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items.items()) + "}"
+        calls = self.calls()
+        lines = []
+        for name, value, desc in (
+            ("node_calls_total", lambda node: calls[node.pid], "number of records processed by node"),
+            ("node_filter_total", lambda node: node.filter, "number of records filtered by node"),
+            ("node_error_total", lambda node: node.error, "number of records failed in node"),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {desc}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.extend(f"{prefix}_{name}{fmt_labels(pid)} {value(node)}" for pid, node in self.nodes.items())
+        name = f"{prefix}_node_latency_seconds"
+        lines.append(f"# HELP {name} sampled per record latency of node")
+        lines.append(f"# TYPE {name} histogram")
+        for pid, node in self.nodes.items():
+            count = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf", ), node.buckets):
+                count += n
+                lines.append(f"{name}_bucket{fmt_labels(pid, le=bound)} {count}")
+            lines.append(f"{name}_sum{fmt_labels(pid)} {node.time}")
+            lines.append(f"{name}_count{fmt_labels(pid)} {node.samples}")
+        return "\n".join(lines) + "\n"
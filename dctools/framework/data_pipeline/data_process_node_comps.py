@@ -1,5 +1,594 @@
 # Name: 常用组件
 # Date: 2023-03-03
 # Author: Ais
-# Desc: None
+# Desc: 数据处理管道的常用数据处理节点
+"""
+# 批量输出节点(BulkSinkNode)
+## 场景描述
+数据处理管道的末端节点通常需要将数据持久化(写入文件或数据库)，逐条写入时每条数据都会产生一次IO操作，
+持久化的耗时往往会超过前面所有数据处理节点的耗时总和。
 
+## 设计思想
+基于分片队列(SliceQueue)的思想，将数据缓存在分片队列中，当缓存的数据达到一个分片(batch_size)，
+或者距离上次输出超过 flush_interval 秒时，将缓存的数据批量输出，在 exit() 时输出剩余的数据。
+设置 flush_interval 时，节点在处理第一条数据时启动输出定时器(守护线程)，数据流中断(没有新数据到达)时
+缓存的数据同样会在 flush_interval 秒内输出，定时器在 exit() 时停止。
+批量输出节点会原样返回输入的数据，因此可以放在节点流的任意位置。
+* JsonlSinkNode: JSONL 文件，支持按大小/时间滚动与 gzip 压缩
+* CsvSinkNode: CSV 文件，支持按大小/时间滚动与 gzip 压缩
+* SQLiteSinkNode: SQLite 数据库，在一个事务中通过 executemany 批量写入，支持 upsert
+
+## 注意事项
+1. 数据在缓存期间进程异常退出会导致缓存的数据丢失，分片大小需要根据场景选取。
+2. 批量输出失败时，该批数据会保留在节点中，在下一次输出时重试，同时触发输出的数据被标记为异常(ERROR)，
+   被标记为异常的数据从重试数据中移除(不会在重试成功时被输出)。
+   重试数据超过 retry_limit 条时丢弃最早的数据(持续输出失败时内存占用有上限)，丢弃的数据交给 on_error(datas, exception) 处理。
+3. 多进程并行模式下每个工作进程持有独立的节点副本，文件路径可以包含 {pid} 占位符以区分不同进程的输出文件。
+4. 定时器触发的批量输出失败时没有可以标记为异常的数据，只计入输出失败次数(errors)，该批数据保留在节点中等待重试。
+
+# 缓存节点(CachedNode)
+## 场景描述
+很多数据处理节点是少数输入字段的纯函数(比如分类名称的规范化，城市名称的解析)，
+采集的数据中这些字段的取值大量重复，但是每条数据都会重新计算一次。
+
+## 设计思想
+1. 包装一个数据处理节点，以声明的输入字段(fields)的取值作为缓存键，缓存节点写入的输出字段(outputs)，
+   命中缓存时直接将缓存的输出字段更新到数据中，不再调用被包装的节点。节点过滤(返回 None)的结果同样会被缓存。
+2. 通过 LRU 策略限制缓存大小，并支持设置缓存的有效期(ttl)，统计命中/未命中/淘汰/过期次数。
+3. 缓存值在写入与读取时都会进行深拷贝(不可变类型除外)，因此下游节点修改数据不会污染缓存。
+"""
+
+
+import os
+import csv
+import gzip
+import json
+import time
+import sqlite3
+import threading
+from copy import deepcopy
+from collections import OrderedDict
+
+from .data_process_pipeline import DataProcessNode
+from ...utils.slicequeue import SliceQueue
+
+
+__all__ = ["BulkSinkNode", "JsonlSinkNode", "CsvSinkNode", "SQLiteSinkNode", "CachedNode"]
+
+
+# 批量输出节点
+class BulkSinkNode(DataProcessNode):
+    """
+    @class: BulkSinkNode | 批量输出节点
+    @desc:
+        批量输出节点基类，将数据缓存在分片队列中并批量输出，子类需要重写 write 方法实现具体的输出逻辑。
+    @method:
+        * write: 批量输出逻辑(子类实现)
+        * flush: 输出缓存的所有数据
+        * stats: 输出统计(批量大小，输出耗时)
+    """
+
+    def __init__(self, batch_size=1000, flush_interval=None, pid=None, retry_limit=None, on_error=None):
+        """
+        @func: 构建器
+        @params:
+            * batch_size(int): 批量输出的数据条数(分片大小)
+            * flush_interval(float): 最大输出间隔(秒)，默认(None)只按数据条数输出，设置时由输出定时器保证缓存的数据在该间隔内输出
+            * pid(str): 数据节点ID
+            * retry_limit(int): 输出失败待重试的最大数据条数，默认(None)为 10 * batch_size
+            * on_error(callable): 丢弃数据的处理函数 on_error(datas, exception)，默认(None)直接丢弃(计入 dropped)
+        """
+        super().__init__(pid)
+        if flush_interval is not None and flush_interval <= 0:
+            raise ValueError("flush_interval must be greater than 0")
+        self.batch_size = int(batch_size)
+        self.flush_interval = flush_interval
+        self.retry_limit = int(retry_limit) if retry_limit is not None else 10 * self.batch_size
+        self.on_error = on_error
+        self._queue = SliceQueue(batch_size)
+        # 输出失败待重试的数据
+        self._retry = []
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        # 输出定时器(处理第一条数据时启动)
+        self._timer = self._timer_stop = None
+        self._stats = {"flushes": 0, "records": 0, "errors": 0, "dropped": 0, "batch_min": None, "batch_max": 0, "time_total": 0.0, "time_max": 0.0}
+
+    # 批量输出逻辑
+    def write(self, datas):
+        """
+        @func: 批量输出逻辑(子类实现)
+        @params:
+            * datas(list): 批量数据
+        """
+        raise NotImplementedError("method(write) must be implemented")
+
+    def process(self, data: dict) -> dict:
+        """
+        @func: 缓存数据，并在达到分片大小或者输出间隔时批量输出
+        @input: {...}
+        @output: {...}
+        """
+        with self._lock:
+            self.flush_interval and self._timer is None and self._start_timer()
+            self._queue.push(data)
+            datas = self._queue.pop()
+            if not datas and self.flush_interval and time.monotonic() - self._flushed_at >= self.flush_interval:
+                datas = self._queue.pop(True)
+            # 输出失败时当前数据被标记为异常(ERROR)，不保留在重试数据中
+            datas and self._write(datas, data)
+        return data
+
+    # 输出缓存的所有数据
+    def flush(self):
+        with self._lock:
+            datas = self._queue.pop(True)
+            (datas or self._retry) and self._write(datas)
+
+    # 启动输出定时器
+    def _start_timer(self):
+        self._timer_stop = threading.Event()
+        self._timer = threading.Thread(target=self._run_timer, args=(self._timer_stop, ), daemon=True)
+        self._timer.start()
+
+    # 输出定时器: 距离上次输出超过 flush_interval 秒时输出缓存的数据
+    def _run_timer(self, stop):
+        timeout = self.flush_interval
+        while not stop.wait(timeout):
+            with self._lock:
+                timeout = self._flushed_at + self.flush_interval - time.monotonic()
+                if timeout > 0:
+                    continue
+                timeout = self.flush_interval
+                datas = self._queue.pop(True)
+                try:
+                    (datas or self._retry) and self._write(datas)
+                except Exception:
+                    pass
+
+    def _stop_timer(self):
+        if self._timer is None:
+            return
+        self._timer_stop.set()
+        self._timer.join()
+        self._timer = self._timer_stop = None
+
+    def _write(self, datas, exclude=None):
+        datas, self._retry = self._retry + datas, []
+        start = time.perf_counter()
+        try:
+            self.write(datas)
+        except Exception as e:
+            retry = self._retry = datas if exclude is None else [data for data in datas if data is not exclude]
+            self._stats["errors"] += 1
+            # 重试数据超过上限时丢弃最早的数据
+            if len(retry) > self.retry_limit:
+                dropped, self._retry = retry[:len(retry) - self.retry_limit], retry[len(retry) - self.retry_limit:]
+                self._stats["dropped"] += len(dropped)
+                self.on_error and self.on_error(dropped, e)
+            raise
+        finally:
+            self._flushed_at = time.monotonic()
+        cost = time.perf_counter() - start
+        stats = self._stats
+        stats["flushes"] += 1
+        stats["records"] += len(datas)
+        stats["batch_min"] = len(datas) if stats["batch_min"] is None else min(stats["batch_min"], len(datas))
+        stats["batch_max"] = max(stats["batch_max"], len(datas))
+        stats["time_total"] += cost
+        stats["time_max"] = max(stats["time_max"], cost)
+
+    # 输出统计
+    def stats(self):
+        """
+        @func: 输出统计
+        @return(dict):
+        {
+            "flushes": 批量输出次数, "records": 输出数据条数, "errors": 输出失败次数, "dropped": 超过重试上限被丢弃的数据条数,
+            "pending": 缓存的数据条数(包括待重试的数据),
+            "batch_min": 最小批量, "batch_max": 最大批量, "batch_avg": 平均批量,
+            "time_total": 累计输出耗时(秒), "time_avg": 平均输出耗时(秒), "time_max": 最大输出耗时(秒)
+        }
+        """
+        stats = dict(self._stats)
+        flushes = stats["flushes"]
+        stats["pending"] = len(self._queue) + len(self._retry)
+        stats["batch_avg"] = stats["records"] / flushes if flushes else 0.0
+        stats["time_avg"] = stats["time_total"] / flushes if flushes else 0.0
+        return stats
+
+    def exit(self):
+        self._stop_timer()
+        self.flush()
+
+    # 序列化协议(多进程并行模式下节点需要被 pickle 序列化，锁对象与定时器在反序列化时重新构建)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_timer"] = state["_timer_stop"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+# 滚动文件输出节点
+class _RotatingFileSinkNode(BulkSinkNode):
+    """
+    @class: _RotatingFileSinkNode | 滚动文件输出节点
+    @desc:
+        未设置滚动条件时输出到 filepath(追加写入)，
+        设置滚动条件(rotate_size/rotate_interval)时输出到带序号的文件 -> {filepath 文件名}.{序号}{扩展名}，
+        当前文件的写入量超过 rotate_size 字节(压缩前)或者打开时长超过 rotate_interval 秒时切换到下一个文件。
+    """
+
+    def __init__(self, filepath, batch_size=1000, flush_interval=None, rotate_size=None, rotate_interval=None, compress=False, encoding="utf-8", pid=None, retry_limit=None, on_error=None):
+        """
+        @func: 构建器
+        @params:
+            * filepath(str): 输出文件路径，可以包含 {pid} 占位符(进程ID)
+            * batch_size(int): 批量输出的数据条数
+            * flush_interval(float): 最大输出间隔(秒)
+            * rotate_size(int): 按大小滚动(字节，压缩前)
+            * rotate_interval(float): 按时间滚动(秒)
+            * compress(bool): 是否使用 gzip 压缩(文件扩展名追加 .gz)
+            * encoding(str): 文件编码
+            * pid(str): 数据节点ID
+            * retry_limit(int): 输出失败待重试的最大数据条数，参考 BulkSinkNode
+            * on_error(callable): 丢弃数据的处理函数，参考 BulkSinkNode
+        """
+        super().__init__(batch_size, flush_interval, pid, retry_limit, on_error)
+        self.filepath = filepath
+        self.rotate_size = rotate_size
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.encoding = encoding
+        self.files = []
+        self._file = None
+
+    def init(self):
+        # 只替换 {pid} 占位符(路径中可能包含其他花括号)
+        self.filepath = self.filepath.replace("{pid}", str(os.getpid()))
+        os.makedirs(os.path.dirname(os.path.abspath(self.filepath)), exist_ok=True)
+
+    # 构建(下一个)输出文件路径
+    def _next_filepath(self):
+        suffix = ".gz" if self.compress else ""
+        if self.rotate_size is None and self.rotate_interval is None:
+            return self.filepath + suffix
+        root, ext = os.path.splitext(self.filepath)
+        index = len(self.files)
+        # 跳过已存在的文件(避免覆盖之前运行的输出)
+        while os.path.exists(f"{root}.{index:05d}{ext}{suffix}"):
+            index += 1
+        return f"{root}.{index:05d}{ext}{suffix}"
+
+    def _open(self):
+        filepath = self._next_filepath()
+        self.files.append(filepath)
+        if self.compress:
+            self._file = gzip.open(filepath, "at", encoding=self.encoding, newline="")
+        else:
+            self._file = open(filepath, "a", encoding=self.encoding, newline="")
+        self._opened_at, self._size = time.monotonic(), 0
+        return self._file
+
+    def _close(self):
+        self._file and self._file.close()
+        self._file = None
+
+    # 文件滚动检测
+    def _rotate(self):
+        if self._file is None:
+            return True
+        if (self.rotate_size and self._size >= self.rotate_size) or (self.rotate_interval and time.monotonic() - self._opened_at >= self.rotate_interval):
+            self._close()
+            return True
+        return False
+
+    # 序列化批量数据(子类实现)
+    def encode(self, datas, header):
+        """
+        @func: 将批量数据序列化成文本
+        @params:
+            * datas(list): 批量数据
+            * header(bool): 是否是新文件的第一次写入
+        @return(str): 文本
+        """
+        raise NotImplementedError("method(encode) must be implemented")
+
+    def write(self, datas):
+        header = self._rotate()
+        header and self._open()
+        text = self.encode(datas, header)
+        self._file.write(text)
+        self._file.flush()
+        self._size += len(text.encode(self.encoding))
+
+    def exit(self):
+        try:
+            super().exit()
+        finally:
+            self._close()
+
+
+# JSONL 文件输出节点
+class JsonlSinkNode(_RotatingFileSinkNode):
+    """
+    @class: JsonlSinkNode | JSONL 文件输出节点
+    @desc: 将数据以 JSONL(每行一个 JSON 对象)格式批量写入文件，支持按大小/时间滚动与 gzip 压缩
+    @exp:
+        JsonlSinkNode("./output/news.jsonl", batch_size=1000, rotate_size=256*1024*1024, compress=True)
+    """
+
+    def encode(self, datas, header):
+        return "".join(json.dumps(data, ensure_ascii=False) + "\n" for data in datas)
+
+
+# CSV 文件输出节点
+class CsvSinkNode(_RotatingFileSinkNode):
+    """
+    @class: CsvSinkNode | CSV 文件输出节点
+    @desc:
+        将数据(dict)以 CSV 格式批量写入文件，每个新文件写入表头，支持按大小/时间滚动与 gzip 压缩。
+        未指定 fieldnames 时以第一条数据的字段作为表头，表头之外的字段被忽略。
+    @exp:
+        CsvSinkNode("./output/news.csv", fieldnames=["id", "title", "date"], rotate_interval=3600)
+    """
+
+    def __init__(self, filepath, fieldnames=None, dialect="excel", **kwargs):
+        """
+        @func: 构建器
+        @params:
+            * filepath(str): 输出文件路径
+            * fieldnames(list): 表头字段
+            * dialect(str): CSV 格式
+            * kwargs: 参考 _RotatingFileSinkNode
+        """
+        super().__init__(filepath, **kwargs)
+        self.fieldnames = fieldnames
+        self.dialect = dialect
+
+    def encode(self, datas, header):
+        self.fieldnames = self.fieldnames or list(datas[0])
+        buffer = _TextBuffer()
+        writer = csv.DictWriter(buffer, self.fieldnames, extrasaction="ignore", dialect=self.dialect)
+        header and not self._appending() and writer.writeheader()
+        writer.writerows(datas)
+        return buffer.getvalue()
+
+    # 追加写入已存在的非空文件时不重复写入表头
+    def _appending(self):
+        return self.rotate_size is None and self.rotate_interval is None and os.path.getsize(self.files[-1]) > 0
+
+
+# 文本缓冲区(csv.writer 的写入目标)
+class _TextBuffer(list):
+
+    write = list.append
+
+    def getvalue(self):
+        return "".join(self)
+
+
+# SQLite 输出节点
+class SQLiteSinkNode(BulkSinkNode):
+    """
+    @class: SQLiteSinkNode | SQLite 输出节点
+    @desc:
+        将数据(dict)批量写入 SQLite 数据表，每批数据在一个事务中通过 executemany 写入。
+        设置 upsert_keys 时，与已有数据的键冲突时更新其余字段(INSERT ... ON CONFLICT DO UPDATE)。
+        dict/list 类型的字段值序列化成 JSON 文本写入。
+    @exp:
+        SQLiteSinkNode("./news.db", "news", fields=["id", "title", "date"], upsert_keys=["id"], batch_size=500)
+    """
+
+    def __init__(self, database, table, fields=None, upsert_keys=None, create=True, batch_size=1000, flush_interval=None, pid=None, retry_limit=None, on_error=None):
+        """
+        @func: 构建器
+        @params:
+            * database(str): 数据库文件路径，可以包含 {pid} 占位符(进程ID)
+            * table(str): 数据表
+            * fields(list): 写入的字段，默认(None)以第一条数据的字段为准
+            * upsert_keys(list): upsert 冲突检测的键(需要是数据表的主键或者唯一索引)
+            * create(bool): 数据表不存在时是否自动创建(upsert_keys 作为主键)
+            * batch_size(int): 批量输出的数据条数
+            * flush_interval(float): 最大输出间隔(秒)
+            * pid(str): 数据节点ID
+            * retry_limit(int): 输出失败待重试的最大数据条数，参考 BulkSinkNode
+            * on_error(callable): 丢弃数据的处理函数，参考 BulkSinkNode
+        """
+        super().__init__(batch_size, flush_interval, pid, retry_limit, on_error)
+        self.database = database
+        self.table = table
+        self.fields = fields
+        self.upsert_keys = upsert_keys
+        self.create = create
+        self._conn = None
+        self._sql = None
+
+    def init(self):
+        self.database = self.database.replace("{pid}", str(os.getpid()))
+        # 连接可能在流水线模式的工作线程中使用(通过锁保证串行访问)
+        self._conn = sqlite3.connect(self.database, check_same_thread=False)
+
+    # 构建写入语句
+    def _build(self, fields):
+        quote = lambda name: '"' + name.replace('"', '""') + '"'
+        table, columns = quote(self.table), ", ".join(quote(field) for field in fields)
+        if self.create:
+            primary_key = f', PRIMARY KEY ({", ".join(quote(key) for key in self.upsert_keys)})' if self.upsert_keys else ""
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns}{primary_key})")
+        sql = f'INSERT INTO {table} ({columns}) VALUES ({", ".join("?" for _ in fields)})'
+        if self.upsert_keys:
+            updates = [field for field in fields if field not in self.upsert_keys]
+            conflict = ", ".join(quote(key) for key in self.upsert_keys)
+            sql += f" ON CONFLICT ({conflict}) " + (
+                "DO UPDATE SET " + ", ".join(f"{quote(field)} = excluded.{quote(field)}" for field in updates) if updates else "DO NOTHING"
+            )
+        return sql
+
+    @staticmethod
+    def _value(value):
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+
+    def write(self, datas):
+        if self._sql is None:
+            self.fields = self.fields or list(datas[0])
+            self._sql = self._build(self.fields)
+        value = self._value
+        rows = [tuple(value(data.get(field)) for field in self.fields) for data in datas]
+        # 事务: 批量写入成功时提交，失败时回滚
+        with self._conn:
+            self._conn.executemany(self._sql, rows)
+
+    def exit(self):
+        try:
+            super().exit()
+        finally:
+            self._conn and self._conn.close()
+            self._conn = None
+
+
+# 不可变类型(缓存值无需拷贝)
+_IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+def _copy_value(value):
+    return value if isinstance(value, _IMMUTABLE_TYPES) else deepcopy(value)
+
+
+# 缓存节点
+class CachedNode(DataProcessNode):
+    """
+    @class: CachedNode | 缓存节点
+    @desc:
+        包装一个(纯函数)数据处理节点，以输入字段(fields)的取值作为缓存键缓存节点的输出:
+        * 设置 outputs 时只缓存节点写入的输出字段，命中时将其更新到当前数据中，其他字段保持不变
+        * 未设置 outputs 时缓存完整的输出数据，此时节点的输出需要完全由 fields 决定
+        缓存键不可哈希(比如字段值是 list)时直接调用被包装的节点。
+    @property:
+        * node(DataProcessNode): 被包装的数据处理节点
+    @method:
+        * stats: 缓存统计
+        * clear: 清空缓存
+    @exp:
+        CachedNode(CityResolver(), fields=["city"], outputs=["province", "city_code"], maxsize=10000, ttl=3600)
+    """
+
+    def __init__(self, node, fields, outputs=None, maxsize=10000, ttl=None, pid=None):
+        """
+        @func: 构建器
+        @params:
+            * node(DataProcessNode): 被包装的数据处理节点
+            * fields(list): 缓存键字段
+            * outputs(list): 缓存的输出字段，默认(None)缓存完整的输出数据
+            * maxsize(int): 缓存的最大条目数(LRU 淘汰)
+            * ttl(float): 缓存有效期(秒)，默认(None)不过期
+            * pid(str): 数据节点ID，默认与被包装的节点一致
+        """
+        super().__init__(pid or node.pid)
+        if maxsize < 1:
+            raise ValueError("maxsize must be greater than 0")
+        self.node = node
+        self.fields = tuple(fields)
+        self.outputs = outputs and tuple(outputs)
+        self.maxsize = int(maxsize)
+        self.ttl = ttl
+        # 缓存 -> {键: (过期时间, 缓存值)}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "uncacheable": 0}
+
+    def init(self):
+        self.node.init()
+
+    def exit(self):
+        self.node.exit()
+
+    # 读取缓存
+    def _get(self, key):
+        with self._lock:
+            item = self._cache.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            if item[0] is not None and item[0] <= time.monotonic():
+                del self._cache[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._cache.move_to_end(key)
+            self._stats["hits"] += 1
+            return item
+
+    # 写入缓存
+    def _set(self, key, value):
+        expire_at = self.ttl and time.monotonic() + self.ttl
+        with self._lock:
+            self._cache[key] = (expire_at, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def process(self, data: dict) -> dict:
+        """
+        @func: 命中缓存时返回缓存的输出，否则调用被包装的节点并缓存其输出
+        @input: {"city": "杭州", ...}
+        @output: {"city": "杭州", "province": "浙江", ...}
+        """
+        key = tuple(data.get(field) for field in self.fields)
+        try:
+            item = self._get(key)
+        except TypeError:
+            # 缓存键不可哈希
+            self._stats["uncacheable"] += 1
+            return self.node.process(data)
+        if item is not None:
+            value = item[1]
+            if value is None:
+                return None
+            if self.outputs is None:
+                return deepcopy(value)
+            data.update((field, _copy_value(field_value)) for field, field_value in value.items())
+            return data
+        _data = self.node.process(data)
+        if _data is None:
+            self._set(key, None)
+        elif self.outputs is None:
+            self._set(key, deepcopy(_data))
+        else:
+            self._set(key, {field: _copy_value(_data[field]) for field in self.outputs if field in _data})
+        return _data
+
+    # 缓存统计
+    def stats(self):
+        """
+        @func: 缓存统计
+        @return(dict):
+        {
+            "size": 缓存条目数, "hits": 命中次数, "misses": 未命中次数, "hit_rate": 命中率,
+            "evictions": LRU 淘汰次数, "expired": 过期次数, "uncacheable": 缓存键不可哈希的次数
+        }
+        """
+        stats = dict(self._stats, size=len(self._cache))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    # 清空缓存
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    # 序列化协议(锁对象在反序列化时重新构建)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,177 @@
+# Name: data process optimizer
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 基于节点耗时与过滤率的节点流重排序
+"""
+# 场景描述
+节点流中经常出现昂贵的转换节点(字段解析，格式转换等)位于廉价的过滤节点之前的情况，
+被过滤的数据在过滤之前已经完成了昂贵的转换，这部分处理开销是浪费的。
+
+# 设计思想
+1. 节点通过 reads/writes 声明读取与写入的数据字段，两个声明了字段的节点满足以下条件时视为相互独立(可以交换顺序):
+    * 前者写入的字段与后者读取/写入的字段不相交
+    * 后者写入的字段与前者读取的字段不相交
+   未声明字段的节点(reads/writes 为 None，包括路由节点)视为屏障，不参与重排序，
+   因此具有外部副作用的节点(输出节点，缓存节点等)不应该声明读写字段。
+   通过数据样本测量时只执行首个屏障之前的节点(屏障及其之后的节点不调用，测量结果为空)，
+   避免数据样本被写入输出节点或者填充缓存节点等副作用。
+2. 通过数据样本(或者生产运行的节点指标)测量每个节点的单次调用耗时(cost)与终止率(drop, FILTER + ERROR 比例)，
+   节点流的单条数据期望耗时为:
+       E = c1 + (1-d1)*c2 + (1-d1)*(1-d2)*c3 + ...
+   对于相互独立的节点，按 rank = cost / drop 升序排列时期望耗时最小(不终止数据的节点 rank 为无穷大)。
+3. 节点之间的依赖关系构成一个偏序(原节点流中存在字段冲突的节点对保持先后顺序)，
+   在满足依赖关系的前提下，每次从可调度的节点中选择 rank 最小的节点(rank 相同时保持原顺序)，得到重排序的节点流。
+
+# 注意事项
+1. 期望耗时的估算假设各节点的终止率相互独立。
+2. 重排序后，同时会被多个节点终止的数据，其终止节点(node)与状态(FILTER/ERROR)可能发生变化。
+"""
+
+
+import time
+from copy import deepcopy
+
+
+# 节点声明的读写字段(未声明时返回 None)
+def _fields(node):
+    reads, writes = getattr(node, "reads", None), getattr(node, "writes", None)
+    if reads is None or writes is None:
+        return None
+    return set(reads), set(writes)
+
+
+# 节点独立性(两个节点交换顺序后处理结果不变)
+def _independent(a, b):
+    fields_a, fields_b = _fields(a), _fields(b)
+    if fields_a is None or fields_b is None:
+        return False
+    (reads_a, writes_a), (reads_b, writes_b) = fields_a, fields_b
+    return not (writes_a & (reads_b | writes_b)) and not (writes_b & reads_a)
+
+
+# 通过数据样本测量节点耗时与终止率
+def profile_nodes(nodes, datas, copy=deepcopy):
+    """
+    @func: 按节点流顺序处理数据样本，测量每个节点的调用次数，终止次数与累计耗时
+    @desc: 只执行首个屏障节点(未声明读写字段)之前的节点，屏障及其之后的节点的测量结果为空(不参与重排序)
+    @params:
+        * nodes(list: DataProcessNode): 数据处理节点流(已初始化)
+        * datas(iterable): 数据样本(处理前复制，不修改样本数据)
+        * copy(callable): 数据副本函数
+    @return(dict): {节点ID: {"calls": 调用次数, "drops": 终止次数(FILTER + ERROR), "time": 累计耗时}}
+    """
+    profile = {node.pid: {"calls": 0, "drops": 0, "time": 0.0} for node in nodes}
+    # 可移动的节点前缀(首个屏障之前的节点)
+    movable = []
+    for node in nodes:
+        if _fields(node) is None:
+            break
+        movable.append(node)
+    nodes = movable
+    perf_counter = time.perf_counter
+    for data in datas:
+        data = copy(data)
+        for node in nodes:
+            entry = profile[node.pid]
+            entry["calls"] += 1
+            start = perf_counter()
+            try:
+                data = node.process(data)
+            except Exception:
+                data = None
+            entry["time"] += perf_counter() - start
+            if data is None:
+                entry["drops"] += 1
+                break
+    return profile
+
+
+# 基于节点运行指标构建测量结果
+def profile_metrics(stats):
+    """
+    @func: 基于数据处理管道的节点运行指标(DataProcessMetrics.stats)构建测量结果
+    @params:
+        * stats(dict): 节点运行指标
+    @return(dict): 结构参考 profile_nodes
+    """
+    return {
+        pid: {"calls": entry["calls"], "drops": entry["filter"] + entry["error"], "time": entry["time_total"]}
+        for pid, entry in stats.items()
+    }
+
+
+# 单条数据的期望耗时
+def expected_cost(order, nodes):
+    cost, reached = 0.0, 1.0
+    for pid in order:
+        cost += reached * nodes[pid]["cost"]
+        reached *= 1 - nodes[pid]["drop"]
+    return cost
+
+
+# 构建执行计划
+def plan(nodes, profile):
+    """
+    @func: 基于测量结果构建重排序的节点流
+    @params:
+        * nodes(list: DataProcessNode): 数据处理节点流
+        * profile(dict): 测量结果，结构参考 profile_nodes
+    @return(dict):
+    {
+        "original": [原节点流的节点ID, ...],
+        "order": [重排序后的节点ID, ...],
+        "nodes": {节点ID: {"cost": 单次调用耗时, "drop": 终止率, "rank": cost/drop, "movable": 是否声明了读写字段}},
+        "cost": 原节点流的单条数据期望耗时,
+        "optimized_cost": 重排序后的单条数据期望耗时,
+        "savings": 期望耗时的节省比例
+    }
+    """
+    pids = [node.pid for node in nodes]
+    if len(set(pids)) != len(pids):
+        raise ValueError("node pids must be unique to reorder the pipeline")
+    infos = {}
+    for node in nodes:
+        entry = profile.get(node.pid) or {"calls": 0, "drops": 0, "time": 0.0}
+        calls = entry["calls"]
+        cost = entry["time"] / calls if calls else 0.0
+        drop = entry["drops"] / calls if calls else 0.0
+        infos[node.pid] = {
+            "cost": cost, "drop": drop,
+            "rank": cost / drop if drop else float("inf"),
+            "movable": _fields(node) is not None,
+        }
+    # 依赖关系: 原节点流中存在冲突(非独立)的节点对保持先后顺序
+    depends = [{j for j in range(i) if not _independent(nodes[j], nodes[i])} for i in range(len(nodes))]
+    order, placed = [], set()
+    while len(order) < len(nodes):
+        ready = [i for i in range(len(nodes)) if i not in placed and depends[i] <= placed]
+        i = min(ready, key=lambda i: (infos[pids[i]]["rank"], i))
+        placed.add(i)
+        order.append(pids[i])
+    cost, optimized_cost = expected_cost(pids, infos), expected_cost(order, infos)
+    return {
+        "original": pids,
+        "order": order,
+        "nodes": infos,
+        "cost": cost,
+        "optimized_cost": optimized_cost,
+        "savings": 1 - optimized_cost / cost if cost else 0.0,
+    }
+
+
+# 格式化执行计划
+def format_plan(plan):
+    def fmt_time(cost):
+        return f"{cost * 1e6:.1f}us"
+    lines = ["DataProcessPipeline optimized plan:"]
+    for i, pid in enumerate(plan["order"]):
+        info = plan["nodes"][pid]
+        origin = plan["original"].index(pid)
+        moved = f"(moved from {origin + 1})" if origin != i else ""
+        barrier = "" if info["movable"] else "[barrier]"
+        lines.append(f"  {i + 1:>2}. {pid:<24} cost: {fmt_time(info['cost']):>10} | drop: {info['drop']:>6.1%} {barrier}{moved}")
+    lines.append(
+        f"  expected cost: {fmt_time(plan['cost'])}/record -> {fmt_time(plan['optimized_cost'])}/record "
+        f"(savings: {plan['savings']:.1%})"
+    )
+    return "\n".join(lines)
@@ -38,10 +38,22 @@
 """
 
 
+import os
+import sys
 import json
+import copy
+import pickle
+import hashlib
+import asyncio
 import inspect
 import traceback
 from copy import deepcopy
+from time import perf_counter
+
+from .data_process_executor import MultiProcessExecutor, PartitionExecutor, StageExecutor
+from .data_process_metrics import DataProcessMetrics
+from .data_process_errors import ErrorAggregator, format_error
+from . import data_process_optimizer as optimizer
 
 
 # 数据处理节点
@@ -53,10 +65,14 @@ class DataProcessNode(object):
         用于将完整的数据流程拆解到单个组件，每个组件封装不同的单一处理逻辑。
     @property: 
         * pid(str): 数据节点ID
+        * concurrency(int): 异步模式(aprocess)下节点的并发上限，默认(None)不限制
+        * reads(tuple): 节点读取的数据字段，默认(None)未声明(节点流重排序时视为屏障)
+        * writes(tuple): 节点写入的数据字段，默认(None)未声明
     @method: 
         * build(staticmethod): 基于函数快速构建 DataProcessNode 类
         * init: 数据处理节点初始化
         * process: 核心处理逻辑
+        * process_batch: 批量处理逻辑(可选)
         * exit: 数据处理节点销毁
     @standard:
         process 方法的开发规范如下:
@@ -66,8 +82,16 @@ class DataProcessNode(object):
             @desc: 数据处理逻辑的详细描述(可选)
             @input: 数据输入数据样例(必要)
             @output: 数据输出数据样例(必要)
+        3. 对于 HTTP 请求，数据库查询等 IO 密集型节点，process 可以定义为协程函数(async def)，
+           此时需要通过数据处理管道的异步接口(aprocess)进行调用。
     """
 
+    # 异步模式下的节点并发上限
+    concurrency = None
+    # 节点读写的数据字段(用于节点流重排序 DataProcessPipeline.optimize)
+    reads = None
+    writes = None
+
     # 快速封装装饰器
     @staticmethod
     def build(process_func):
@@ -94,8 +118,8 @@ class DataProcessNode(object):
             process_func.__name__, 
             # 继承基类
             (DataProcessNode, ), 
-            # 构建属性
-            dict(process = process_func, )
+            # 构建属性(绑定函数所在模块，使构建的类可以被 pickle 序列化)
+            dict(process = process_func, __module__ = process_func.__module__, __qualname__ = process_func.__qualname__)
         )
 
     def __init__(self, pid=None):
@@ -123,6 +147,35 @@ class DataProcessNode(object):
         @output: 数据输出数据样例(必要)
         """
         raise NotImplementedError("method(process) must be implemented")
+
+    # 批量处理逻辑
+    def process_batch(self, datas: list) -> list:
+        """
+        @func: 批量处理逻辑(可选)
+        @desc: 
+            在批量模式(batch_size)下，数据处理管道以数据分块为单位调用该方法，
+            对于数据库查询，去重检测等 IO 密集型节点，可以重写该方法将单条查询合并成批量查询。
+            返回值是与 datas 等长且一一对应的结果列表，其中单条结果的约定如下:
+                1. None: 过滤该条数据(FILTER)
+                2. Exception 对象: 该条数据处理异常(ERROR)
+                3. 其他: 处理后的数据
+            当该方法抛出异常时，该数据分块中的所有数据都被标记为异常(ERROR)。
+            默认实现逐条调用 process 方法，并将单条数据的异常转换成 Exception 对象。
+        @params:
+            * datas(list): 数据分块
+        @return(list): 处理结果列表
+        @exp:
+            def process_batch(self, datas: list) -> list:
+                exists = self.db.find_ids([data["id"] for data in datas])
+                return [None if data["id"] in exists else data for data in datas]
+        """
+        results = []
+        for data in datas:
+            try:
+                results.append(self.process(data))
+            except Exception as e:
+                results.append(e)
+        return results
     
     # 销毁
     def exit(self):
@@ -133,6 +186,377 @@ class DataProcessNode(object):
         pass
 
 
+# 路由分支终止信号
+class RouteTerminated(Exception):
+    """
+    @class: RouteTerminated | 路由分支终止信号
+    @desc: 
+        在数据处理管道中，路由节点的分支内部节点过滤(FILTER)或处理异常(ERROR)时抛出，
+        用于将处理状态归属到分支内部的节点，而不是路由节点本身。
+    """
+
+    def __init__(self, state, pid, data, error=None):
+        super().__init__(state, pid)
+        self.state = state
+        self.pid = pid
+        self.data = data
+        self.error = error
+
+
+# 合并扇出分支的输出数据(dict)
+def _merge_dicts(data, outputs):
+    merged = dict(data)
+    [merged.update(output) for output in outputs]
+    return merged
+
+
+# 路由节点
+class DataProcessRouter(DataProcessNode):
+    """
+    @class: DataProcessRouter | 路由节点
+    @desc: 
+        将线性的节点流扩展为有向无环图(DAG)，按照路由键将数据分发到不同的分支(节点流)，
+        分支处理完成后汇合(fan-in)到路由节点之后的节点，因此数据只会流过与其相关的节点。
+        * 键路由: key(data) 返回路由名，数据进入对应的分支，未匹配的数据进入 default 分支，
+          未设置 default 时数据不经处理直接流向下游节点。
+        * 扇出(fanout): key(data) 返回路由名列表(key 为 None 时分发到所有分支)，
+          每个分支处理数据的浅拷贝，分支输出通过 merge(data, outputs) 合并，
+          分支过滤的数据不参与合并，所有分支均过滤时该数据被过滤，任意分支异常时该数据异常。
+        分支中可以嵌套路由节点。在数据处理管道中，分支内部节点的 FILTER/ERROR 状态归属到该节点。
+    @property: 
+        * routes(dict): 分支 -> {路由名: [DataProcessNode, ...]}
+    @exp:
+        DataProcessPipeline([
+            DataIdFilter(),
+            DataProcessRouter(key="type", routes={
+                "article": [ArticleCleaner(), ArticleTagger()],
+                "comment": [CommentCleaner()],
+            }),
+            DataWriter(),
+        ])
+    """
+
+    def __init__(self, routes, key=None, default=None, fanout=False, merge=None, pid=None):
+        """
+        @func: 构建器
+        @params: 
+            * routes(dict): 分支 -> {路由名: [DataProcessNode, ...]}
+            * key(str|callable): 路由键，字段名或者可调用对象 key(data) -> 路由名(扇出模式下为路由名列表)
+            * default(str): 未匹配的数据进入的分支
+            * fanout(bool): 扇出模式
+            * merge(callable): (扇出模式)分支输出合并函数 merge(data, outputs) -> data，默认合并 dict
+            * pid(str): 数据节点ID
+        """
+        super().__init__(pid)
+        if not fanout and key is None:
+            raise ValueError("key is required when fanout is disabled")
+        if default is not None and default not in routes:
+            raise ValueError(f"default route({default}) is not in routes")
+        self.routes = {name: list(nodes) for name, nodes in routes.items()}
+        self.key = key
+        self.default = default
+        self.fanout = fanout
+        self.merge = merge or _merge_dicts
+        # 路由执行函数(独立调用时构建)
+        self.__route = None
+
+    def init(self):
+        [node.init() for nodes in self.routes.values() for node in nodes]
+
+    def exit(self):
+        [node.exit() for nodes in self.routes.values() for node in nodes]
+
+    # 路由名
+    def _route_names(self, data):
+        key = self.key
+        if key is None:
+            return list(self.routes)
+        return key(data) if callable(key) else data.get(key)
+
+    def process(self, data):
+        """
+        @func: 按照路由键将数据分发到分支节点流
+        @desc: 独立调用时，分支内部节点过滤数据返回 None，节点异常直接抛出
+        """
+        if self.__route is None:
+            self.__route = self._compile()
+        try:
+            return self.__route(data)
+        except RouteTerminated as e:
+            if e.state == "FILTER":
+                return None
+            raise e.error
+
+    # 构建路由执行函数
+    def _compile(self, register=None):
+        """
+        @func: 构建路由执行函数(供数据处理管道调用)
+        @desc: 分支内部节点过滤(FILTER)或处理异常(ERROR)时抛出 RouteTerminated
+        @params:
+            * register(callable): 节点指标注册函数 register(pid) -> NodeMetrics，用于统计分支内部节点的调用次数
+        @return(function): route(data) -> data
+        """
+        routes = {
+            name: tuple(
+                (node.pid, node._compile(register) if isinstance(node, DataProcessRouter) else node.process, register and register(node.pid))
+                for node in nodes
+            )
+            for name, nodes in self.routes.items()
+        }
+        route_names, default, merge, pid = self._route_names, self.default, self.merge, self.pid
+
+        # 分支执行
+        def run_branch(plan, data):
+            for node_pid, process, node_metrics in plan:
+                if node_metrics:
+                    node_metrics.calls += 1
+                try:
+                    _data = process(data)
+                except RouteTerminated:
+                    raise
+                except Exception as e:
+                    if node_metrics:
+                        node_metrics.error += 1
+                    raise RouteTerminated("ERROR", node_pid, data, e)
+                if _data is None:
+                    if node_metrics:
+                        node_metrics.filter += 1
+                    raise RouteTerminated("FILTER", node_pid, data)
+                data = _data
+            return data
+
+        # 键路由
+        def route(data):
+            plan = routes.get(route_names(data), routes.get(default))
+            return data if plan is None else run_branch(plan, data)
+
+        # 扇出
+        def route_fanout(data):
+            outputs = []
+            for name in route_names(data):
+                try:
+                    outputs.append(run_branch(routes[name], copy.copy(data)))
+                except RouteTerminated as e:
+                    if e.state != "FILTER":
+                        raise
+            if not outputs:
+                raise RouteTerminated("FILTER", pid, data)
+            return merge(data, outputs)
+
+        return route_fanout if self.fanout else route
+
+    # 构建异步路由执行函数
+    def _compile_async(self, register=None):
+        """
+        @func: 构建异步路由执行函数(供数据处理管道的异步接口调用)
+        @desc: 与 _compile 一致，区别在于对分支内部的协程节点进行 await 调用，并通过信号量限制设置了 concurrency 属性的节点的并发数
+        @params:
+            * register(callable): 节点指标注册函数，参考 _compile
+        @return(coroutine function): route(data) -> data
+        """
+        def compile_node(node):
+            if isinstance(node, DataProcessRouter):
+                return node.pid, node._compile_async(register), register and register(node.pid), True, None
+            return (
+                node.pid, node.process, register and register(node.pid), inspect.iscoroutinefunction(node.process),
+                getattr(node, "concurrency", None) and asyncio.Semaphore(node.concurrency)
+            )
+        routes = {name: tuple(compile_node(node) for node in nodes) for name, nodes in self.routes.items()}
+        route_names, default, merge, pid = self._route_names, self.default, self.merge, self.pid
+
+        # 分支执行
+        async def run_branch(plan, data):
+            for node_pid, process, node_metrics, is_coroutine, semaphore in plan:
+                if node_metrics:
+                    node_metrics.calls += 1
+                try:
+                    if not is_coroutine:
+                        _data = process(data)
+                    elif semaphore is None:
+                        _data = await process(data)
+                    else:
+                        async with semaphore:
+                            _data = await process(data)
+                except (RouteTerminated, asyncio.CancelledError):
+                    raise
+                except Exception as e:
+                    if node_metrics:
+                        node_metrics.error += 1
+                    raise RouteTerminated("ERROR", node_pid, data, e)
+                if _data is None:
+                    if node_metrics:
+                        node_metrics.filter += 1
+                    raise RouteTerminated("FILTER", node_pid, data)
+                data = _data
+            return data
+
+        # 键路由
+        async def route(data):
+            plan = routes.get(route_names(data), routes.get(default))
+            return data if plan is None else await run_branch(plan, data)
+
+        # 扇出
+        async def route_fanout(data):
+            outputs = []
+            for name in route_names(data):
+                try:
+                    outputs.append(await run_branch(routes[name], copy.copy(data)))
+                except RouteTerminated as e:
+                    if e.state != "FILTER":
+                        raise
+            if not outputs:
+                raise RouteTerminated("FILTER", pid, data)
+            return merge(data, outputs)
+
+        return route_fanout if self.fanout else route
+
+    # 序列化协议(路由执行函数由闭包构成，无法被 pickle 序列化)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_DataProcessRouter__route"] = None
+        return state
+
+
+# 格式化异常信息(异常记录函数的默认实现)
+def _format_error(pid, exception, data):
+    return format_error(exception)
+
+
+# 按处理状态调用回调函数(回调函数的异常记录到 errors 中，节点ID为 "callback:状态"，不中断迭代)
+def _apply_callbacks(results, callbacks, errors):
+    if not callbacks:
+        yield from results
+        return
+    for result in results:
+        callback = callbacks.get(result["state"])
+        try:
+            callback and callback(result)
+        except Exception:
+            errors.record(f"callback:{result['state']}", sys.exc_info()[1], result)
+        yield result
+
+
+# 记录路由分支终止状态
+def _route_terminated(processed_result, e, node_metrics=None, error=_format_error):
+    """
+    @func: 将路由分支内部节点的终止状态记录到处理结果容器
+    @params:
+        * processed_result(dict): 处理结果容器
+        * e(RouteTerminated): 路由分支终止信号(ERROR 状态下 error 为异常对象)
+        * node_metrics(NodeMetrics): 路由节点指标
+        * error(callable): 异常记录函数 error(pid, exception, data) -> 异常信息
+    @return(any): 终止时的数据
+    """
+    processed_result["state"], processed_result["node"] = e.state, e.pid
+    if e.state == "ERROR":
+        processed_result["error"] = error(e.pid, e.error, e.data)
+        if node_metrics:
+            node_metrics.error += 1
+    elif node_metrics:
+        node_metrics.filter += 1
+    return e.data
+
+
+# 紧凑的单条处理结果
+class ProcessResult(object):
+    """
+    @class: ProcessResult | 单条处理结果
+    @desc: 
+        基于 __slots__ 的处理结果(process(result_format="compact"))，内存占用约为字典的 1/3，
+        支持字典形式的只读访问(result["data"], result.get("error"))，兼容按字典读取处理结果的代码。
+    @property:
+        * state(str): 处理结果状态
+        * source(any): 原始数据
+        * data(any): 处理后的数据
+        * node(str): 数据处理节点ID(("FILTER", "ERROR")状态下具有该字段，否则为 None)
+        * error(str|ProcessError): 异常信息(("ERROR")状态下具有该字段，否则为 None)
+    """
+
+    __slots__ = ("state", "source", "data", "node", "error")
+
+    def __init__(self, state, source=None, data=None, node=None, error=None):
+        self.state, self.source, self.data, self.node, self.error = state, source, data, node, error
+
+    # 从处理结果字典构建
+    @classmethod
+    def from_dict(cls, result, state=None):
+        return cls(state or result["state"], result.get("source"), result.get("data"), result.get("node"), result.get("error"))
+
+    def __getitem__(self, key):
+        if key not in self.__slots__ or (key in ("node", "error") and getattr(self, key) is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None or key in ("state", "source", "data")
+
+    # 转换成字典格式(与 result_format="dict" 一致，不包含 state 字段)
+    def to_dict(self):
+        result = {"data": self.data, "source": self.source}
+        self.node is not None and result.update(node=self.node)
+        self.error is not None and result.update(error=self.error)
+        return result
+
+    def __repr__(self):
+        return f"<ProcessResult state={self.state} node={self.node}>"
+
+
+# 处理结果收集器
+def _result_collector(result_format):
+    """
+    @func: 构建处理结果收集器
+    @params:
+        * result_format(str): 结果格式，参考 DataProcessPipeline.process
+    @return(tuple): (add(result): 收集单条处理结果, collected: 结果集)
+    """
+    if result_format == "counts":
+        counts = {"SUCCES": 0, "FILTER": 0, "ERROR": 0}
+        outputs = []
+        def add(result):
+            state = result["state"]
+            counts[state] += 1
+            state == "SUCCES" and outputs.append(result["data"])
+        return add, {"counts": counts, "outputs": outputs}
+    collected = {}
+    def add(result):
+        state = result.pop("state")
+        if state in collected:
+            collected[state].append(result)
+        else:
+            collected[state] = [result]
+    if result_format == "compact":
+        def add_compact(result):
+            state, get = result["state"], result.get
+            compact = ProcessResult(state, get("source"), get("data"), get("node"), get("error"))
+            if state in collected:
+                collected[state].append(compact)
+            else:
+                collected[state] = [compact]
+        return add_compact, collected
+    if result_format != "dict":
+        raise ValueError(f"result_format({result_format}) must be one of ['dict', 'compact', 'counts']")
+    return add, collected
+
+
+# 原始数据快照(序列化)
+def _snapshot(data):
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+# 原始数据不保留
+def _discard(data):
+    return None
+
+# 仅在异常(ERROR)状态下还原原始数据快照
+def _restore_on_error(source, state):
+    return pickle.loads(source) if state == "ERROR" else None
+
+
 # 数据处理管道
 class DataProcessPipeline(object):
     """
@@ -142,27 +566,90 @@ class DataProcessPipeline(object):
         以构建一个完整的数据处理流程，通过组装不同的数据处理节点来
         覆盖不同的数据处理需求。
     @property
+        * nodes(list): 数据处理节点流
+        * metrics(DataProcessMetrics): 节点运行指标(未启用时为 None)
+        * errors(ErrorAggregator): 节点异常聚合(按照 节点ID, 异常类型, 异常位置 聚合异常次数与样本数据)
+        * tracer(DataProcessTracer): 数据流追踪器(未启用时为 None)
+        * timeline(DataProcessTimeline): 时间线追踪器(未启用时为 None)
+        * version(str): 管道版本(由节点流结构生成，用于增量处理索引)
+        * executor: 最近一次使用的执行器(并行/分区/流水线模式)，用于查看执行器的运行状态(stats)
     @method: 
         * init: 初始化数据处理管道
         * process: 数据处理接口
+        * process_iter: 数据处理流式接口
+        * aprocess: 数据处理异步接口
+        * aprocess_iter: 数据处理异步流式接口
         * exit: 销毁数据处理管道
         * check: 检测数据处理节点规范，数据类型兼容性校验
+        * stats: 导出节点运行指标
         * test: 测试完整数据处理流程，并输出完整的数据流
         * doc: 提取和构建数据处理节点文档
+        * optimize: 基于节点耗时与过滤率重排序节点流
     @exp: 
 
     """
 
-    def __init__(self, data_process_nodes=[]):
+    # 原始数据(source)保留策略 -> (采集函数(data), 还原函数(source, state))
+    SOURCE_POLICIES = {
+        # 不保留原始数据(source 字段为 None)
+        "none": (_discard, None),
+        # 浅拷贝: 只复制外层容器，适用于节点只修改外层字段的场景
+        "shallow": (copy.copy, None),
+        # 深拷贝(默认)
+        "deep": (deepcopy, None),
+        # 序列化快照: source 字段为 pickle 序列化后的 bytes，需要时通过 pickle.loads 还原
+        "snapshot": (_snapshot, None),
+        # 仅在异常(ERROR)状态下保留: 处理前生成序列化快照，仅在 ERROR 状态下还原
+        "error": (_snapshot, _restore_on_error),
+    }
+
+    def __init__(self, data_process_nodes=[], source_policy="deep", metrics=True, errors="format", trace=None, timeline=None):
         """
         @func: 构建器
         @params: 
             * data_process_nodes(list: DataProcessNode): 数据处理节点流 
+            * source_policy(str): 原始数据(source)保留策略，参考 SOURCE_POLICIES
+                ("none", "shallow", "deep", "snapshot", "error")
+            * metrics(bool|DataProcessMetrics): 
+                是否统计节点运行指标(调用次数，耗时分布，FILTER/ERROR 次数)，
+                可以传入 DataProcessMetrics 对象来指定计时采样间隔，比如 DataProcessMetrics(sample_interval=1)
+            * errors(str): 
+                异常信息(error 字段)的记录方式，异常同时按照 (节点ID, 异常类型, 异常位置) 聚合到 errors 属性中
+                "format": 格式化后的异常堆栈(str)
+                "lazy": 延迟格式化的 ProcessError 对象(str(error) 时格式化)，适用于大面积异常的场景
+            * trace(DataProcessTracer): 数据流追踪器，对采样的数据记录每个节点处理的数据副本与耗时，默认(None)不追踪
+            * timeline(DataProcessTimeline): 时间线追踪器，记录每条数据与每个节点调用的时间区间(Chrome trace-event 格式)以及慢速数据，
+                默认(None)不追踪，不能与 trace 同时使用
         """
+        if source_policy not in self.SOURCE_POLICIES:
+            raise ValueError(f"source_policy({source_policy}) must be one of {list(self.SOURCE_POLICIES)}")
+        if errors not in ("format", "lazy"):
+            raise ValueError(f"errors({errors}) must be one of ['format', 'lazy']")
+        if trace is not None and timeline is not None:
+            raise ValueError("trace and timeline cannot be used together")
         # 数据处理节点流
         self.__data_process_nodes = data_process_nodes
+        # 数据处理节点与节点指标 -> [(node, NodeMetrics), ...](在 init 中注册节点指标)
+        self.__nodes = [(node, None) for node in data_process_nodes]
+        # 原始数据保留策略
+        self.__source_capture, self.__source_restore = self.SOURCE_POLICIES[source_policy]
+        # 节点运行指标
+        self.__metrics = metrics if isinstance(metrics, DataProcessMetrics) else (DataProcessMetrics() if metrics else None)
+        # 异常记录方式与异常聚合器
+        self.__error_mode = errors
+        self.__errors = ErrorAggregator()
+        # 数据流追踪器与时间线追踪器
+        self.__tracer = trace
+        self.__timeline = timeline
+        # 执行计划(在 init 中构建)
+        self.__run = self.__run_flow = None
+        self.__routes = None
+        # 最近一次使用的执行器(并行/分区/流水线模式)
+        self.__executor = None
         # 初始化状态标记
         self.__isInit = False
+        # 数据处理节点是否由增量处理的重新处理初始化(增量处理结束时销毁)
+        self.__reprocess_init = False
 
     # 初始化数据处理管道
     def init(self):
@@ -172,18 +659,31 @@ class DataProcessPipeline(object):
         self.check()
         # 初始化所有数据处理节点
         [node.init() for node in self.__data_process_nodes]
+        # 注册节点指标(保持统计结果与节点流顺序一致，重复的节点ID追加序号)
+        self.__nodes = [(node, self.__metrics and self.__metrics.register(node.pid, unique=True)) for node in self.__data_process_nodes]
+        # 构建执行计划
+        self.__compile()
+        # 时间线追踪器校准时钟并注册 GC 回调
+        self.__timeline is not None and self.__timeline._attach()
         # 更新初始化状态标记
         self.__isInit = True
         return self
 
     # 数据处理(调用接口)
-    def process(self, datas: list) -> dict:
+    def process(self, datas: list, result_format="dict", result_store=None, **kwargs) -> dict:
         """
         @func: 数据处理(调用接口)
         @desc: 通过数据处理节点流处理数据，并将结果集按照处理状态分类
         @params: 
             * datas(list): 待处理的数据
-        @return(dict): 
+            * result_format(str): 结果格式
+                "dict": (默认)单条处理结果为字典
+                "compact": 单条处理结果为 ProcessResult 对象(__slots__)，适用于大量数据的结果集
+                "counts": 只统计各处理状态的数据条数，并保留处理成功的数据 -> {"counts": {"SUCCES": n, "FILTER": n, "ERROR": n}, "outputs": [data1, data2, ...]}
+            * result_store(DataProcessResultStore): 处理结果溢写存储，设置时处理结果写入该存储并返回该存储(忽略 result_format)，
+                通过 result_store.iter(state) 迭代结果，或通过 result_store.to_dict() 构建以下结构的结果集
+            * kwargs: 执行模式参数(workers, chunksize, ordered, batch_size, stages, queue_size, checkpoint, partition_by, incremental)，参考 process_iter
+        @return(dict|DataProcessResultStore): 
             数据处理结果，其结构如下:
             {
                 "SUCCES": [data1, data2, ...],
@@ -195,63 +695,708 @@ class DataProcessPipeline(object):
                 "data": "处理后的数据",
                 "source": "原始数据",
                 "node": "数据处理节点ID，("FILTER", "ERROR")状态下具有该字段",
-                "error": "异常信息，("ERROR")状态下具有该字段"
+                "error": "异常信息，("ERROR")状态下具有该字段(errors="lazy" 时为 ProcessError 对象)"
             }
         """
-        (not self.__isInit) and self.init()
         # 处理数据(结果按照处理状态分类)
-        processed_result = {}
-        for data in datas:
-            result = self.__process(data)
-            state = result.pop("state")
-            processed_result.setdefault(state, []).append(result)
+        add, processed_result = (result_store.add, result_store) if result_store is not None else _result_collector(result_format)
+        for result in self.process_iter(datas, **kwargs):
+            add(result)
         return processed_result
-    
-    # 数据处理(核心逻辑)
-    def __process(self, data, SAVE_DATA_FLOW=False):
+
+    # 数据处理(流式接口)
+    def process_iter(self, datas, callbacks=None, workers=None, chunksize=100, ordered=True, batch_size=None, stages=None, queue_size=100, checkpoint=None, partition_by=None, incremental=None):
         """
-        @func: 对单条数据进行处理
+        @func: 数据处理(流式接口)
+        @desc: 
+            以生成器的形式逐条输出数据处理结果，数据处理完成后立即输出，不在内存中累积结果集，
+            适用于处理大规模的数据源(文件迭代器，数据库游标等)，并在处理的同时将结果写入下游。
+            执行模式:
+            * 串行模式(默认): 在当前进程中逐条处理数据
+            * 批量模式(batch_size): 以数据分块为单位调用数据处理节点的 process_batch 方法
+            * 多进程并行模式(workers): 将数据按 chunksize 拆分成数据分块，分发到多个工作进程中处理，
+              每个工作进程在自身的数据处理节点副本上调用 init()/exit()，可以与批量模式组合使用
+            * 分区并行模式(partition_by): 按照分区键将数据哈希到固定的工作进程，相同键的数据由同一个工作进程按照输入顺序处理，
+              适用于维护单个实体状态的数据处理节点，参考 PartitionExecutor
+            * 流水线模式(stages): 每个阶段(一个或多个连续的数据处理节点)由独立的工作线程处理，
+              阶段之间通过有界队列连接，参考 StageExecutor
         @params: 
-            * data(any): 待处理的数据
-            * SAVE_DATA_FLOW(bool): 用于记录节点的数据副本
-        @return(type): 
-        {
-            "state": 处理结果状态("SUCCES", "FILTER", "ERROR"),
-            "source": 原始数据,
-            "data": 处理后的数据,
-            "node": ("FILTER", "ERROR")状态下记录的节点id,
-            "error": ("ERROR")状态下的异常信息
-            "flow": 节点处理的数据副本(可选字段), -> [{"node": "节点ID", "data": "数据副本"}]
-        }
+            * datas(iterable): 待处理的数据(任意可迭代对象)
+            * callbacks(dict): 按处理状态注册的回调函数 -> {"SUCCES": func, "FILTER": func, "ERROR": func}
+                在结果输出之前调用 -> func(result: dict)，回调函数抛出的异常记录到 pipeline.errors 中(节点ID为 "callback:状态")，不中断迭代
+            * workers(int): 工作进程数，默认(None)在当前进程中处理
+            * chunksize(int): (并行模式)数据分块大小
+            * ordered(bool): (并行/流水线模式)是否按照输入顺序输出结果，为 False 时按处理完成顺序输出
+            * batch_size(int): 批量模式下的数据分块大小，默认(None)逐条处理
+            * stages(list|bool): (流水线模式)阶段划分，True 表示每个节点一个阶段，参考 StageExecutor
+            * queue_size(int): (流水线模式)阶段之间的队列容量
+            * partition_by(str|callable): (分区并行模式)分区键，字段名或者可调用对象 key(data) -> 键，
+                工作进程数默认为 CPU 核数，通过 executor.stats() 查看分区倾斜度与热点键
+            * checkpoint(DataProcessCheckpoint): 断点续跑日志，跳过已提交的数据并定期记录处理进度(要求 ordered=True)
+            * incremental(DataProcessIncremental): 增量处理索引，跳过(或回放)内容与管道版本均未变化的数据(要求 ordered=True，不能与 checkpoint 同时使用)
+        @return(generator): 
+            单条数据的处理结果，在 process 结果字段的基础上包含 "state" 字段(处理结果状态)
+        @exp:
+            for result in pipeline.process_iter(open("data.jsonl"), callbacks={"ERROR": logger}):
+                ...
         """
-        # 处理结果容器
-        processed_result = {"state": "SUCCES", "source": deepcopy(data)}
-        # 保留数据流
-        SAVE_DATA_FLOW and processed_result.update({"flow": []})
-        # 调用数据处理节点
-        for node in self.__data_process_nodes:
+        if checkpoint is not None:
+            if not ordered:
+                raise ValueError("checkpoint requires ordered=True")
+            if incremental is not None:
+                raise ValueError("checkpoint and incremental cannot be used together")
+            yield from checkpoint.track(self.process_iter(checkpoint.skip(datas), callbacks, workers, chunksize, ordered, batch_size, stages, queue_size, None, partition_by))
+            return
+        if incremental is not None:
+            if not ordered:
+                raise ValueError("incremental requires ordered=True")
+            # 回调函数作用于合并之后的处理结果(包括回放的处理结果)
+            results = incremental.track(self.process_iter(incremental.skip(datas, self.version), None, workers, chunksize, ordered, batch_size, stages, queue_size, None, partition_by), self.__reprocess)
             try:
-                _data = node.process(data)
-                # FILTER: 节点过滤数据
-                if _data is None:
-                    processed_result.update({"state": "FILTER", "node": node.pid})
+                yield from _apply_callbacks(results, callbacks, self.__errors)
+            finally:
+                results.close()
+                self.__reprocess_exit()
+            return
+        if partition_by is not None:
+            self.check()
+            self.__executor = PartitionExecutor(self, workers or os.cpu_count(), partition_by, chunksize, ordered, batch_size)
+            results = self.__executor.execute(datas)
+        elif workers is not None:
+            # 并行模式下由工作进程初始化数据处理节点，主进程仅做规范校验
+            self.check()
+            self.__executor = MultiProcessExecutor(self, workers, chunksize, ordered, batch_size)
+            results = self.__executor.execute(datas)
+        elif stages:
+            (not self.__isInit) and self.init()
+            self.__executor = StageExecutor(self, None if stages is True else stages, queue_size, ordered)
+            results = self.__executor.execute(datas)
+        elif batch_size:
+            (not self.__isInit) and self.init()
+            results = (result for batch in MultiProcessExecutor.chunks(datas, batch_size) for result in self.__process_batch(batch))
+        else:
+            (not self.__isInit) and self.init()
+            results = map(self.__run, datas)
+        yield from _apply_callbacks(results, callbacks, self.__errors)
+
+    # 数据处理(异步接口)
+    async def aprocess(self, datas, concurrency=100, result_format="dict", result_store=None) -> dict:
+        """
+        @func: 数据处理(异步接口)
+        @desc: 
+            在事件循环中并发处理数据，数据处理节点的 process 方法可以是协程函数(async def)，
+            也可以是普通函数(在事件循环中直接调用，因此不应该包含阻塞操作)。
+        @params: 
+            * datas(iterable|async iterable): 待处理的数据
+            * concurrency(int): 同时处理(在途)的数据条数上限
+            * result_format(str): 结果格式("dict", "compact", "counts")，参考 process
+            * result_store(DataProcessResultStore): 处理结果溢写存储，参考 process
+        @return(dict): 数据处理结果(按照输入顺序)，结构参考 process
+        @exp:
+            result = await pipeline.aprocess(datas, concurrency=200)
+        """
+        add, processed_result = (result_store.add, result_store) if result_store is not None else _result_collector(result_format)
+        async for result in self.aprocess_iter(datas, concurrency=concurrency, ordered=True):
+            add(result)
+        return processed_result
+
+    # 数据处理(异步流式接口)
+    async def aprocess_iter(self, datas, concurrency=100, callbacks=None, ordered=False):
+        """
+        @func: 数据处理(异步流式接口)
+        @desc: 
+            以异步生成器的形式输出数据处理结果，同时处理的数据条数不超过 concurrency，
+            单个节点的并发数不超过节点的 concurrency 属性。
+        @params: 
+            * datas(iterable|async iterable): 待处理的数据
+            * concurrency(int): 同时处理(在途)的数据条数上限，有序模式下包含重排缓冲区中等待输出的结果
+            * callbacks(dict): 按处理状态注册的回调函数(支持协程函数)，参考 process_iter
+            * ordered(bool): 是否按照输入顺序输出结果，默认(False)按处理完成顺序输出
+        @return(async generator): 单条数据的处理结果(包含 state 字段)
+        @exp:
+            async for result in pipeline.aprocess_iter(datas, concurrency=200):
+                ...
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        (not self.__isInit) and self.init()
+        run = self.__compile_async()
+        callbacks = callbacks or {}
+        # 数据迭代器(兼容同步/异步可迭代对象)
+        is_aiter = hasattr(datas, "__aiter__")
+        datas = datas.__aiter__() if is_aiter else iter(datas)
+        # 在途任务 -> {task: index}
+        pending, index, exhausted = {}, 0, False
+        # 有序模式下的重排缓冲区(已完成但未输出的结果与在途任务共同计入 concurrency，内存占用有上限)
+        buffer, next_index = {}, 0
+        try:
+            while True:
+                # 补充在途任务
+                while not exhausted and len(pending) + len(buffer) < concurrency:
+                    try:
+                        data = (await datas.__anext__()) if is_aiter else next(datas)
+                    except (StopIteration, StopAsyncIteration):
+                        exhausted = True
+                        break
+                    pending[asyncio.ensure_future(run(data))] = index
+                    index += 1
+                if not pending:
                     break
-                # 记录节点处理数据副本
-                SAVE_DATA_FLOW and processed_result["flow"].append({"node": node.pid, "data": deepcopy(_data)})
-                data = _data
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                results = sorted((pending.pop(task), task.result()) for task in done)
+                if ordered:
+                    buffer.update(results)
+                    results = []
+                    while next_index in buffer:
+                        results.append((next_index, buffer.pop(next_index)))
+                        next_index += 1
+                for _, result in results:
+                    callback = callbacks.get(result["state"])
+                    try:
+                        returned = callback and callback(result)
+                        if inspect.isawaitable(returned):
+                            await returned
+                    except Exception:
+                        self.__errors.record(f"callback:{result['state']}", sys.exc_info()[1], result)
+                    yield result
+        finally:
+            [task.cancel() for task in pending]
+
+    # 数据分块处理
+    def _process_chunk(self, datas, batch_size=None):
+        """
+        @func: 处理数据分块，返回单条数据的处理结果列表(供并行执行器调用)
+        """
+        if batch_size:
+            return [result for batch in MultiProcessExecutor.chunks(datas, batch_size) for result in self.__process_batch(batch)]
+        return [self.__run(data) for data in datas]
+
+    # 构建副本
+    def _replicate(self):
+        """
+        @func: 构建未初始化的数据处理管道副本(供并行执行器的工作进程调用)
+        """
+        replica = copy.copy(self)
+        replica.__data_process_nodes = list(self.__data_process_nodes)
+        replica.__isInit = False
+        replica.__run = replica.__run_flow = None
+        replica.__routes = None
+        replica.__executor = None
+        replica.__reprocess_init = False
+        replica.__metrics = self.__metrics and DataProcessMetrics(self.__metrics.sample_interval)
+        replica.__errors = ErrorAggregator(self.__errors.max_samples)
+        replica.__tracer = self.__tracer if self.__tracer is None else self.__tracer._replicate()
+        replica.__timeline = self.__timeline if self.__timeline is None else self.__timeline._replicate()
+        return replica
+
+    @property
+    def metrics(self):
+        return self.__metrics
+
+    @property
+    def nodes(self):
+        return list(self.__data_process_nodes)
+
+    @property
+    def executor(self):
+        return self.__executor
+
+    @property
+    def errors(self):
+        return self.__errors
+
+    @property
+    def tracer(self):
+        return self.__tracer
+
+    @property
+    def timeline(self):
+        return self.__timeline
+
+    # 管道版本(由节点流结构生成: 节点类型与节点ID)
+    @property
+    def version(self):
+        structure = "|".join(f"{type(node).__module__}.{type(node).__qualname__}:{node.pid}" for node in self.__data_process_nodes)
+        return hashlib.blake2b(structure.encode("utf-8"), digest_size=8).hexdigest()
+
+    # 构建节点片段执行函数
+    def _segment(self, start=0, stop=None, local=False):
+        """
+        @func: 构建节点片段执行函数(供执行器按片段调度数据处理节点)
+        @desc: 
+            执行函数依次调用节点片段 [start:stop] 中的数据处理节点，并将处理状态记录在处理结果容器中，
+            启用指标统计时对每次节点调用计时(执行器面向的是 IO 密集型节点，计时开销可以忽略)。
+            local=True 时执行函数将节点指标与异常记录到独立的指标对象与异常聚合器中(供单个工作线程使用，无需加锁)，
+            通过 merge() 汇总到数据处理管道。
+            与 _open/_close 组合使用:
+                processed_result = pipeline._open(data)
+                data = run(processed_result, data)   # processed_result["state"] != "SUCCES" 时终止
+                pipeline._close(processed_result, data)
+        @params:
+            * start(int): 起始节点索引
+            * stop(int): 结束节点索引
+            * local(bool): 是否使用独立的节点指标与异常聚合器
+        @return(tuple): (run(processed_result, data) -> data, merge() -> 汇总独立的节点指标与异常聚合器)
+        """
+        metrics, errors, nodes = self.__metrics, self.__errors, self.__nodes[start:stop]
+        if local:
+            errors = ErrorAggregator(errors.max_samples)
+            if metrics is not None:
+                metrics = DataProcessMetrics(metrics.sample_interval)
+                # 按节点流顺序注册主节点流的所有节点(与数据处理管道的指标结构一致，沿用节点指标的注册ID)
+                [metrics.register(node_metrics.pid) for _, node_metrics in self.__nodes]
+                nodes = [(node, metrics.register(node_metrics.pid)) for node, node_metrics in nodes]
+        plan = tuple((node.pid, self.__process_func(node, metrics=metrics), node_metrics) for node, node_metrics in nodes)
+        error = self.__error_handler(errors)
+
+        def merge():
+            if local:
+                metrics is not None and self.__metrics.merge(metrics)
+                self.__errors.merge(errors)
+
+        def run(processed_result, data):
+            try:
+                for pid, process, node_metrics in plan:
+                    start = perf_counter()
+                    _data = process(data)
+                    metrics and node_metrics.record(perf_counter() - start)
+                    # FILTER: 节点过滤数据
+                    if _data is None:
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        if metrics:
+                            node_metrics.filter += 1
+                        break
+                    data = _data
+            except RouteTerminated as e:
+                # 路由分支内部节点终止
+                metrics and node_metrics.record(perf_counter() - start)
+                data = _route_terminated(processed_result, e, node_metrics, error)
             except:
                 # ERROR: 节点处理异常
-                processed_result.update({"state": "ERROR", "node": node.pid, "error": traceback.format_exc()})
-                break
+                metrics and node_metrics.record(perf_counter() - start)
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, error(pid, sys.exc_info()[1], data)
+                if metrics:
+                    node_metrics.error += 1
+            return data
+
+        return run, merge
+
+    # 构建处理结果容器
+    def _open(self, data):
+        self.__metrics and self.__metrics.tick()
+        return {"state": "SUCCES", "source": self.__source_capture(data)}
+
+    # 完成处理结果
+    def _close(self, processed_result, data):
         processed_result["data"] = data
+        if self.__source_restore:
+            processed_result["source"] = self.__source_restore(processed_result["source"], processed_result["state"])
         return processed_result
     
+    # 构建异常记录函数
+    def __error_handler(self, errors=None):
+        """
+        @func: 构建异常记录函数
+        @desc: 将异常聚合到异常聚合器，并按照异常记录方式返回 error 字段的值
+        @params:
+            * errors(ErrorAggregator): 异常聚合器，默认(None)为数据处理管道的异常聚合器
+        @return(function): error(pid, exception, data) -> str | ProcessError
+        """
+        record, lazy = (self.__errors if errors is None else errors).record, self.__error_mode == "lazy"
+        def error(pid, exception, data):
+            process_error = record(pid, exception, data)
+            return process_error if lazy else process_error.traceback
+        return error
+
+    # 节点处理函数(路由节点构建路由执行函数，异步模式下构建异步路由执行函数)
+    def __process_func(self, node, asynchronous=False, metrics=None):
+        if not isinstance(node, DataProcessRouter):
+            return node.process
+        metrics = self.__metrics if metrics is None else metrics
+        # 分支内部节点显式计数(节点ID与主节点流重复时不计数)
+        def register(pid):
+            node_metrics = metrics.register(pid, counted=True)
+            return node_metrics if node_metrics.calls is not None else None
+        return (node._compile_async if asynchronous else node._compile)(metrics and register)
+
+    # 重新处理增量处理索引回放时记录缺失的数据
+    def __reprocess(self, data):
+        # 并行模式下主进程的数据处理节点未初始化，初始化后在增量处理结束时销毁(__reprocess_exit)
+        if not self.__isInit:
+            self.init()
+            self.__reprocess_init = True
+        return map(self.__run, (data, ))
+
+    def __reprocess_exit(self):
+        if self.__reprocess_init:
+            self.exit()
+            self.__isInit = self.__reprocess_init = False
+
+    # 构建执行计划
+    def __compile(self):
+        """
+        @func: 构建执行计划(数据处理核心逻辑)
+        @desc: 
+            将数据处理节点流“编译”成专用的单条数据处理函数，在初始化时构建一次，
+            避免在处理每条数据时重复进行模式判断(数据流记录，指标计时)和属性查找(node.process, node.pid):
+            * __run: 生产模式，启用指标统计时按采样间隔分派到计时版本
+            * __run_flow: 数据测试模式，记录每个节点处理的数据副本
+            启用数据流追踪时，__run 在生产模式的基础上按采样结果分派到追踪版本(run_traced)，
+            启用时间线追踪时，__run 为时间线版本(run_timeline)。
+            单条数据的处理结果结构如下:
+            {
+                "state": 处理结果状态("SUCCES", "FILTER", "ERROR"),
+                "source": 原始数据,
+                "data": 处理后的数据,
+                "node": ("FILTER", "ERROR")状态下记录的节点id,
+                "error": ("ERROR")状态下的异常信息(str，延迟格式化模式下为 ProcessError)
+                "flow": 节点处理的数据副本(数据测试模式), -> [{"node": "节点ID", "data": "数据副本"}]
+            }
+        """
+        # 执行计划 -> ((节点ID, 处理函数, 节点指标), ...)
+        plan = tuple((node.pid, self.__process_func(node), node_metrics) for node, node_metrics in self.__nodes)
+        # 批量模式下路由节点的路由执行函数(其他节点为 None)
+        self.__routes = tuple(process if isinstance(node, DataProcessRouter) else None for (node, _), (_, process, _) in zip(self.__nodes, plan))
+        capture, restore = self.__source_capture, self.__source_restore
+        metrics = self.__metrics
+        error = self.__error_handler()
+        format_exc = traceback.format_exc
+
+        # 生产模式
+        def run(data):
+            processed_result = {"state": "SUCCES", "source": capture(data)}
+            try:
+                for pid, process, node_metrics in plan:
+                    _data = process(data)
+                    # FILTER: 节点过滤数据
+                    if _data is None:
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        if metrics:
+                            node_metrics.filter += 1
+                        break
+                    data = _data
+            except RouteTerminated as e:
+                # 路由分支内部节点终止(状态归属到分支内部节点)
+                data = _route_terminated(processed_result, e, node_metrics, error)
+            except:
+                # ERROR: 节点处理异常(异常信息由异常记录函数生成)
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, error(pid, sys.exc_info()[1], data)
+                if metrics:
+                    node_metrics.error += 1
+            processed_result["data"] = data
+            if restore:
+                processed_result["source"] = restore(processed_result["source"], processed_result["state"])
+            return processed_result
+
+        # 生产模式(采样计时)
+        def run_timed(data):
+            processed_result = {"state": "SUCCES", "source": capture(data)}
+            try:
+                for pid, process, node_metrics in plan:
+                    start = perf_counter()
+                    _data = process(data)
+                    node_metrics.record(perf_counter() - start)
+                    if _data is None:
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        node_metrics.filter += 1
+                        break
+                    data = _data
+            except RouteTerminated as e:
+                node_metrics.record(perf_counter() - start)
+                data = _route_terminated(processed_result, e, node_metrics, error)
+            except:
+                node_metrics.record(perf_counter() - start)
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, error(pid, sys.exc_info()[1], data)
+                node_metrics.error += 1
+            processed_result["data"] = data
+            if restore:
+                processed_result["source"] = restore(processed_result["source"], processed_result["state"])
+            return processed_result
+
+        # 生产模式(指标统计分派: 按采样间隔对数据计时)
+        def run_sampled(data):
+            metrics.records += 1
+            return run(data) if metrics.records % interval else run_timed(data)
+        interval = metrics and metrics.sample_interval
+
+        # 数据测试模式(始终保留原始数据的深拷贝，不统计指标)
+        def run_flow(data):
+            processed_result = {"state": "SUCCES", "source": deepcopy(data), "flow": []}
+            flow = processed_result["flow"]
+            try:
+                for pid, process, _ in plan:
+                    _data = process(data)
+                    if _data is None:
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        break
+                    # 记录节点处理数据副本
+                    flow.append({"node": pid, "data": deepcopy(_data)})
+                    data = _data
+            except RouteTerminated as e:
+                data = _route_terminated(processed_result, e)
+            except:
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, format_exc()
+            processed_result["data"] = data
+            return processed_result
+
+        # 生产模式(数据流追踪: 记录节点处理的数据副本与耗时，处理结果与生产模式一致)
+        def run_traced(data):
+            if metrics:
+                metrics.records += 1
+            processed_result = {"state": "SUCCES", "source": capture(data)}
+            trace = {"source": tcopy(data), "flow": []}
+            flow = trace["flow"]
+            try:
+                for pid, process, node_metrics in plan:
+                    start = perf_counter()
+                    _data = process(data)
+                    cost = perf_counter() - start
+                    # 追踪的数据对所有节点调用计时，耗时同时计入节点指标
+                    metrics and node_metrics.record(cost)
+                    if _data is None:
+                        flow.append({"node": pid, "data": None, "time": cost})
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        if metrics:
+                            node_metrics.filter += 1
+                        break
+                    flow.append({"node": pid, "data": tcopy(_data), "time": cost})
+                    data = _data
+            except RouteTerminated as e:
+                metrics and node_metrics.record(perf_counter() - start)
+                data = _route_terminated(processed_result, e, node_metrics, error)
+            except:
+                metrics and node_metrics.record(perf_counter() - start)
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, error(pid, sys.exc_info()[1], data)
+                if metrics:
+                    node_metrics.error += 1
+            processed_result["data"] = data
+            if restore:
+                processed_result["source"] = restore(processed_result["source"], processed_result["state"])
+            tracer.record(processed_result, trace)
+            return processed_result
+
+        # 生产模式(数据流追踪分派)
+        def run_sampled_traced(data):
+            return run_traced(data) if sample(data) else _run(data)
+        tracer = self.__tracer
+
+        # 生产模式(时间线追踪: 记录单条数据与每个节点调用的时间区间)
+        def run_timeline(data):
+            if metrics:
+                metrics.records += 1
+            start = perf_counter()
+            processed_result = {"state": "SUCCES", "source": capture(data)}
+            spans = []
+            try:
+                for pid, process, node_metrics in plan:
+                    t0 = perf_counter()
+                    _data = process(data)
+                    t1 = perf_counter()
+                    spans.append((pid, t0, t1))
+                    # 时间区间同时计入节点指标
+                    metrics and node_metrics.record(t1 - t0)
+                    if _data is None:
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        if metrics:
+                            node_metrics.filter += 1
+                        break
+                    data = _data
+            except RouteTerminated as e:
+                t1 = perf_counter()
+                spans.append((pid, t0, t1))
+                metrics and node_metrics.record(t1 - t0)
+                data = _route_terminated(processed_result, e, node_metrics, error)
+            except:
+                t1 = perf_counter()
+                spans.append((pid, t0, t1))
+                metrics and node_metrics.record(t1 - t0)
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, error(pid, sys.exc_info()[1], data)
+                if metrics:
+                    node_metrics.error += 1
+            processed_result["data"] = data
+            if restore:
+                processed_result["source"] = restore(processed_result["source"], processed_result["state"])
+            timeline.record(processed_result, start, perf_counter(), spans)
+            return processed_result
+        timeline = self.__timeline
+
+        _run = run_sampled if metrics else run
+        if timeline is not None:
+            self.__run = run_timeline
+        elif tracer is None:
+            self.__run = _run
+        else:
+            tcopy, sample = tracer.copy, tracer.sample
+            self.__run = run_sampled_traced
+        self.__run_flow = run_flow
+
+    # 构建异步执行计划
+    def __compile_async(self):
+        """
+        @func: 构建异步执行计划
+        @desc: 
+            与 __compile 的生产模式一致，区别在于对协程节点进行 await 调用，
+            并通过信号量限制设置了 concurrency 属性的节点的并发数。
+            信号量需要在事件循环中使用，因此在每次调用异步接口时构建。
+        @return(coroutine function): 单条数据处理函数
+        """
+        # 执行计划 -> ((节点ID, 处理函数, 节点指标, 是否协程函数, 并发信号量), ...)
+        # 路由节点构建异步路由执行函数(分支内部的协程节点同样进行 await 调用)
+        plan = tuple(
+            (
+                node.pid, self.__process_func(node, asynchronous=True), node_metrics,
+                isinstance(node, DataProcessRouter) or inspect.iscoroutinefunction(node.process),
+                None if isinstance(node, DataProcessRouter) else getattr(node, "concurrency", None) and asyncio.Semaphore(node.concurrency)
+            )
+            for node, node_metrics in self.__nodes
+        )
+        capture, restore = self.__source_capture, self.__source_restore
+        metrics = self.__metrics
+        error = self.__error_handler()
+
+        async def arun(data):
+            timed = metrics and metrics.tick()
+            processed_result = {"state": "SUCCES", "source": capture(data)}
+            try:
+                for pid, process, node_metrics, is_coroutine, semaphore in plan:
+                    # 节点耗时不包含等待并发信号量的时间
+                    if not is_coroutine:
+                        start = timed and perf_counter()
+                        _data = process(data)
+                    elif semaphore is None:
+                        start = timed and perf_counter()
+                        _data = await process(data)
+                    else:
+                        async with semaphore:
+                            start = timed and perf_counter()
+                            _data = await process(data)
+                    timed and node_metrics.record(perf_counter() - start)
+                    # FILTER: 节点过滤数据
+                    if _data is None:
+                        processed_result["state"], processed_result["node"] = "FILTER", pid
+                        if metrics:
+                            node_metrics.filter += 1
+                        break
+                    data = _data
+            except asyncio.CancelledError:
+                raise
+            except RouteTerminated as e:
+                data = _route_terminated(processed_result, e, node_metrics, error)
+            except:
+                # ERROR: 节点处理异常
+                processed_result["state"], processed_result["node"], processed_result["error"] = "ERROR", pid, error(pid, sys.exc_info()[1], data)
+                if metrics:
+                    node_metrics.error += 1
+            processed_result["data"] = data
+            if restore:
+                processed_result["source"] = restore(processed_result["source"], processed_result["state"])
+            return processed_result
+
+        return arun
+
+    # 序列化协议(执行计划由闭包构成，无法被 pickle 序列化，在反序列化时重新构建)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_DataProcessPipeline__run"] = state["_DataProcessPipeline__run_flow"] = state["_DataProcessPipeline__routes"] = None
+        state["_DataProcessPipeline__executor"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__isInit and self.__compile()
+    
+    # 数据处理(批量模式核心逻辑)
+    def __process_batch(self, datas):
+        """
+        @func: 以数据分块为单位进行处理
+        @desc: 
+            依次调用数据处理节点的 process_batch 方法，每个节点只处理上游节点处理成功的数据，
+            并按照 process_batch 的返回值约定对单条数据的处理状态进行记录。
+        @params: 
+            * datas(list): 数据分块
+        @return(list): 单条数据的处理结果列表，结构参考 __compile
+        """
+        # 处理结果容器
+        processed_results = [{"state": "SUCCES", "source": self.__source_capture(data)} for data in datas]
+        datas = list(datas)
+        # 处理成功的数据索引
+        alive = list(range(len(datas)))
+        metrics = self.__metrics
+        metrics and metrics.tick(len(datas))
+        error, lazy = self.__error_handler(), self.__error_mode == "lazy"
+        for (node, node_metrics), route in zip(self.__nodes, self.__routes):
+            if not alive:
+                break
+            if route is not None:
+                alive = self.__route_batch(route, node, node_metrics, alive, datas, processed_results, error)
+                continue
+            start = metrics and perf_counter()
+            try:
+                _datas = node.process_batch([datas[i] for i in alive])
+                if len(_datas) != len(alive):
+                    raise ValueError(f"node({node.pid}).process_batch returned {len(_datas)} results for {len(alive)} datas")
+            except:
+                if metrics:
+                    node_metrics.record(perf_counter() - start, len(alive))
+                    node_metrics.error += len(alive)
+                # ERROR: 节点批量处理异常(整个分块，异常只记录一次)
+                _error = self.__errors.record(node.pid, sys.exc_info()[1], datas[alive[0]], len(alive))
+                _error = _error if lazy else _error.traceback
+                [processed_results[i].update({"state": "ERROR", "node": node.pid, "error": _error}) for i in alive]
+                break
+            metrics and node_metrics.record(perf_counter() - start, len(alive))
+            _alive = []
+            for i, _data in zip(alive, _datas):
+                # FILTER: 节点过滤数据
+                if _data is None:
+                    processed_results[i].update({"state": "FILTER", "node": node.pid})
+                # ERROR: 单条数据处理异常
+                elif isinstance(_data, Exception):
+                    processed_results[i].update({"state": "ERROR", "node": node.pid, "error": error(node.pid, _data, datas[i])})
+                else:
+                    datas[i] = _data
+                    _alive.append(i)
+            if metrics:
+                failed = sum(isinstance(_data, Exception) for _data in _datas)
+                node_metrics.filter += len(alive) - len(_alive) - failed
+                node_metrics.error += failed
+            alive = _alive
+        for processed_result, data in zip(processed_results, datas):
+            processed_result["data"] = data
+            if self.__source_restore:
+                processed_result["source"] = self.__source_restore(processed_result["source"], processed_result["state"])
+        return processed_results
+
+    # 路由节点的批量处理
+    def __route_batch(self, route, node, node_metrics, alive, datas, processed_results, error):
+        """
+        @func: 批量模式下逐条调用路由执行函数，FILTER/ERROR 状态归属到分支内部节点(与串行模式一致)
+        @return(list): 处理成功的数据索引
+        """
+        metrics = self.__metrics
+        start = metrics and perf_counter()
+        _alive = []
+        for i in alive:
+            try:
+                datas[i] = route(datas[i])
+                _alive.append(i)
+            except RouteTerminated as e:
+                datas[i] = _route_terminated(processed_results[i], e, node_metrics, error)
+            except Exception as e:
+                # 路由节点自身异常(比如路由键提取异常)
+                processed_results[i].update({"state": "ERROR", "node": node.pid, "error": error(node.pid, e, datas[i])})
+                if metrics:
+                    node_metrics.error += 1
+        metrics and node_metrics.record(perf_counter() - start, len(alive))
+        return _alive
+
     # 销毁数据处理管道
     def exit(self):
         if not self.__isInit:
             raise Exception("DataProcessPipeline is not init")
         # 销毁所有数据处理节点
         [node.exit() for node in self.__data_process_nodes]
+        self.__timeline is not None and self.__timeline.close()
 
     # 校验数据处理节点规范
     def check(self):
@@ -265,6 +1410,8 @@ class DataProcessPipeline(object):
             False: node(A) -> list:dict -> node(B)
             当 process 方法未包含类型注解时，视作任意数据类型。
             需要注意的是，该方法只能校验数据的“外层”数据类型，无法检测内部字段的数据类型。
+            对于路由节点(DataProcessRouter)，校验数据处理图中的每条边:
+            上游节点 -> 分支首节点，分支末端节点 -> 下游节点，以及未匹配数据的直通边(上游节点 -> 下游节点)。
         @algo: 
             对于两个类型 A，B 数据类型是兼容性定义如下:
                 1. A，B 中包含一个任意类型(inspect._empty) 
@@ -276,23 +1423,111 @@ class DataProcessPipeline(object):
             if (dataTypeA is inspect._empty) or (dataTypeB is inspect._empty):
                 return True
             return bool(set(dataTypeA.__mro__[:-1]) & set(dataTypeB.__mro__[:-1]))
-        # 验证整个数据处理链路输入输出的数据类型兼容性
-        for i in range(len(self.__data_process_nodes)-1):
-            # 当前处理节点输出数据类型
-            node = self.__data_process_nodes[i]
-            if not isinstance(node, DataProcessNode):
-                raise TypeError(f'{node} is not DataProcessNode object')
-            node_output_datatype = inspect.signature(node.process).return_annotation
-            # 下一个处理节点输入数据类型
-            next_node = self.__data_process_nodes[i+1]
-            if not isinstance(next_node, DataProcessNode):
-                raise TypeError(f'{next_node} is not DataProcessNode object')
-            next_node_input_datatype = inspect.signature(next_node.process).parameters["data"].annotation
-            # 比较两个节点之间的数据兼容性
+        # 节点输入输出数据类型
+        def input_datatype(node):
+            if isinstance(node, DataProcessRouter):
+                return inspect._empty
+            return inspect.signature(node.process).parameters["data"].annotation
+        def output_datatype(node):
+            if isinstance(node, DataProcessRouter):
+                return inspect._empty
+            return inspect.signature(node.process).return_annotation
+        # 验证数据处理边(node -> next_node)的数据类型兼容性
+        def check_edge(node, next_node):
+            node_output_datatype = output_datatype(node)
+            next_node_input_datatype = input_datatype(next_node)
             if not compatibility(node_output_datatype, next_node_input_datatype):
                 raise TypeError(f"node({node.pid}) -> {node_output_datatype}|{next_node_input_datatype} -> node({next_node.pid})")
+        # 验证节点流，返回节点流的出口节点(路由节点的分支末端节点)
+        def check_flow(nodes, entries):
+            for node in nodes:
+                if not isinstance(node, DataProcessNode):
+                    raise TypeError(f'{node} is not DataProcessNode object')
+                [check_edge(entry, node) for entry in entries]
+                if not isinstance(node, DataProcessRouter):
+                    entries = [node]
+                    continue
+                # 路由节点: 分别验证每个分支，分支出口作为下游节点的入口
+                exits = []
+                for branch in node.routes.values():
+                    exits.extend(check_flow(branch, entries) if branch else entries)
+                # 扇出模式下输出的是合并数据(视作任意类型)，键路由未设置默认分支时数据直接流向下游
+                if node.fanout:
+                    exits = [node]
+                elif node.default is None:
+                    exits.extend(entries)
+                entries = exits
+            return entries
+        # 验证整个数据处理图(DAG)中每条边输入输出的数据类型兼容性
+        check_flow(self.__data_process_nodes, [])
         return True
-    
+
+    # 导出节点运行指标
+    def stats(self, format="dict"):
+        """
+        @func: 导出节点运行指标
+        @desc: 
+            并行模式下，各工作进程的指标在工作进程退出时汇总到当前数据处理管道，
+            主节点流中重复的节点ID(同一个节点类的多个实例)按节点流顺序追加序号统计(Mod, Mod#2, ...)。
+        @params:
+            * format(str): 导出格式 -> "dict" | "json" | "prometheus"
+        @return(dict|str): 节点运行指标，结构参考 DataProcessMetrics.stats，未启用指标统计时返回 None
+        """
+        if self.__metrics is None:
+            return None
+        exporters = {"dict": self.__metrics.stats, "json": self.__metrics.to_json, "prometheus": self.__metrics.to_prometheus}
+        if format not in exporters:
+            raise ValueError(f"format({format}) must be one of {list(exporters)}")
+        return exporters[format]()
+
+    # 节点流重排序
+    def optimize(self, datas=None, apply=True, verbose=True):
+        """
+        @func: 基于节点耗时与终止率(FILTER + ERROR)重排序节点流
+        @desc: 
+            在满足节点读写字段依赖(reads/writes)的前提下，将廉价且过滤率高的节点尽可能提前执行，
+            减少被过滤的数据在昂贵节点上的处理开销，算法参考 data_process_optimizer。
+            应用重排序后，节点运行指标会被重置(节点调用次数按节点流顺序推导)。
+            通过数据样本测量时只执行首个屏障节点(未声明 reads/writes，比如输出节点，缓存节点，路由节点)之前的节点，
+            数据样本不会写入输出节点或填充缓存，屏障之后的节点需要基于生产运行的节点指标(datas=None)重排序。
+        @params:
+            * datas(iterable): 数据样本，默认(None)使用已有的节点运行指标(需要启用指标统计并已处理过数据)
+            * apply(bool): 是否应用重排序后的节点流
+            * verbose(bool): 是否打印执行计划
+        @return(dict): 执行计划，结构参考 data_process_optimizer.plan
+        @exp:
+            class ParseNode(DataProcessNode):
+                reads, writes = ("html", ), ("fields", )
+            class LangFilter(DataProcessNode):
+                reads, writes = ("lang", ), ()
+            pipeline = DataProcessPipeline([ParseNode(), LangFilter()]).init()
+            pipeline.optimize(samples)
+        """
+        (not self.__isInit) and self.init()
+        nodes = self.__data_process_nodes
+        if datas is not None:
+            profile = optimizer.profile_nodes(nodes, datas)
+        elif self.__metrics is not None and self.__metrics.records:
+            profile = optimizer.profile_metrics(self.__metrics.stats())
+        else:
+            raise ValueError("optimize requires data samples or collected metrics")
+        plan = optimizer.plan(nodes, profile)
+        verbose and print(optimizer.format_plan(plan))
+        if apply and plan["order"] != plan["original"]:
+            index = {node.pid: (node, node_metrics) for node, node_metrics in self.__nodes}
+            self.__data_process_nodes = [index[pid][0] for pid in plan["order"]]
+            self.__nodes = [index[pid] for pid in plan["order"]]
+            if self.__metrics is not None:
+                # 主节点流指标按新的节点流顺序注册(路由分支内部节点的指标保持在后)
+                metrics_nodes = self.__metrics.nodes
+                self.__metrics.nodes = dict(
+                    [(pid, metrics_nodes[pid]) for pid in plan["order"]] +
+                    [(pid, node_metrics) for pid, node_metrics in metrics_nodes.items() if pid not in index]
+                )
+                self.__metrics.reset()
+            self.__compile()
+        return plan
+
     # 数据测试
     def test(self, data, export_filepath=None):
         """
@@ -310,7 +1545,8 @@ class DataProcessPipeline(object):
             "data": 处理后的数据
         }
         """
-        test_data = self.__process(data, SAVE_DATA_FLOW=True)
+        (self.__run_flow is None) and self.__compile()
+        test_data = self.__run_flow(data)
         if export_filepath:
             with open(export_filepath, "w", encoding="utf-8") as f:
                 f.write(json.dumps(test_data, ensure_ascii=False))
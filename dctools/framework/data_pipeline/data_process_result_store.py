@@ -0,0 +1,205 @@
+# Name: data process result store
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理结果的溢写存储
+"""
+# 场景描述
+DataProcessPipeline.process 会将所有的处理结果保留在内存中直到调用返回，
+当一次处理数百万条数据时(尤其是保留了原始数据副本 source 的情况下)，结果集会占满内存。
+
+# 设计思想
+1. 按处理状态分别缓存处理结果，某个状态缓存的结果条数达到阈值(memory_limit)时，
+   将其作为一个分段(segment)序列化后追加写入该状态的溢写文件，并清空内存缓存，内存占用由阈值决定。
+2. 分段以 [长度(4字节) + pickle 序列化数据(可选 zlib 压缩)] 的形式顺序追加，
+   读取时按写入顺序依次反序列化分段，最后输出内存中尚未溢写的结果，保持处理结果的输出顺序。
+3. 通过 iter(state) 按状态流式读取处理结果，通过 to_dict() 构建与 process 相同结构的结果集(全部加载到内存)。
+
+# 注意事项
+溢写时处理结果需要能够被 pickle 序列化(与多进程并行模式的要求相同)，
+从溢写文件读取的处理结果是反序列化后的副本。
+"""
+
+
+import os
+import zlib
+import shutil
+import pickle
+import struct
+import tempfile
+import weakref
+
+
+# 处理结果溢写存储
+class DataProcessResultStore(object):
+    """
+    @class: DataProcessResultStore | 处理结果溢写存储
+    @desc: 按处理状态缓存处理结果，超过内存阈值时溢写到磁盘分段，通过 process(result_store=...) 使用
+    @property:
+        * counts(dict): 各处理状态的结果条数
+        * spilled(dict): 各处理状态溢写到磁盘的结果条数
+    @method:
+        * add: 添加处理结果
+        * iter: 按处理状态迭代处理结果
+        * to_dict: 构建与 process 相同结构的结果集
+        * stats: 存储统计
+        * close: 关闭并删除溢写文件
+    @exp:
+        with DataProcessResultStore(memory_limit=50000) as store:
+            pipeline.process(datas, result_store=store)
+            for result in store.iter("SUCCES"):
+                ...
+    """
+
+    # 分段头部(分段数据长度)
+    HEADER = struct.Struct("<I")
+
+    def __init__(self, memory_limit=100000, directory=None, compress=False):
+        """
+        @func: 构建器
+        @params:
+            * memory_limit(int): 每个处理状态在内存中缓存的最大结果条数
+            * directory(str): 溢写文件目录，默认(None)在首次溢写时创建临时目录(close 时删除)
+            * compress(bool|int): 是否使用 zlib 压缩分段(int 为压缩等级)
+        """
+        if memory_limit < 1:
+            raise ValueError("memory_limit must be greater than 0")
+        self.memory_limit = int(memory_limit)
+        self.directory = directory
+        self.compress = 1 if compress is True else int(compress)
+        self.counts = {}
+        self.spilled = {}
+        # 处理状态 -> 内存缓存的处理结果
+        self.__buffers = {}
+        # 处理状态 -> 溢写文件(追加写入)
+        self.__files = {}
+        self.__segments = 0
+        self.__bytes = 0
+        self.__tempdir = None
+        self.__finalizer = None
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def __contains__(self, state):
+        return state in self.counts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # 处理状态
+    def states(self):
+        return list(self.counts)
+
+    # 添加处理结果
+    def add(self, result):
+        """
+        @func: 添加处理结果
+        @params:
+            * result(dict): 单条处理结果(包含 state 字段，添加时移除)
+        """
+        state = result.pop("state")
+        buffer = self.__buffers.get(state)
+        if buffer is None:
+            buffer = self.__buffers[state] = []
+            self.counts[state] = self.spilled[state] = 0
+        buffer.append(result)
+        self.counts[state] += 1
+        len(buffer) >= self.memory_limit and self.__spill(state)
+
+    # 溢写
+    def __spill(self, state):
+        buffer = self.__buffers[state]
+        payload = pickle.dumps(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.compress:
+            payload = zlib.compress(payload, self.compress)
+        f = self.__files.get(state) or self.__open(state)
+        f.write(self.HEADER.pack(len(payload)))
+        f.write(payload)
+        f.flush()
+        self.spilled[state] += len(buffer)
+        self.__segments += 1
+        self.__bytes += self.HEADER.size + len(payload)
+        self.__buffers[state] = []
+
+    def __open(self, state):
+        if self.directory is None:
+            self.__tempdir = self.directory = tempfile.mkdtemp(prefix="dctools_results_")
+            # 存储对象被回收时删除临时目录
+            self.__finalizer = weakref.finalize(self, shutil.rmtree, self.__tempdir, True)
+        os.makedirs(self.directory, exist_ok=True)
+        f = self.__files[state] = open(self.__filepath(state), "wb+")
+        return f
+
+    def __filepath(self, state):
+        return os.path.join(self.directory, f"{id(self):x}.{state}.seg")
+
+    # 迭代处理结果
+    def iter(self, state):
+        """
+        @func: 按写入顺序迭代指定处理状态的结果(先读取溢写分段，再输出内存缓存)
+        @params:
+            * state(str): 处理状态("SUCCES", "FILTER", "ERROR")
+        @return(generator): 处理结果
+        """
+        if state in self.__files:
+            # 独立的读取句柄，迭代过程中仍然可以继续写入
+            with open(self.__filepath(state), "rb") as reader:
+                size = self.HEADER.size
+                while True:
+                    header = reader.read(size)
+                    if len(header) < size:
+                        break
+                    payload = reader.read(self.HEADER.unpack(header)[0])
+                    yield from pickle.loads(zlib.decompress(payload) if self.compress else payload)
+        yield from list(self.__buffers.get(state, ()))
+
+    def __iter__(self):
+        return iter(self.counts)
+
+    def __getitem__(self, state):
+        if state not in self.counts:
+            raise KeyError(state)
+        return self.iter(state)
+
+    def items(self):
+        return ((state, self.iter(state)) for state in self.counts)
+
+    # 构建结果集
+    def to_dict(self):
+        """
+        @func: 构建与 process 相同结构的结果集(全部处理结果加载到内存)
+        @return(dict): {"SUCCES": [...], "FILTER": [...], "ERROR": [...]}
+        """
+        return {state: list(self.iter(state)) for state in self.counts}
+
+    # 存储统计
+    def stats(self):
+        """
+        @func: 存储统计
+        @return(dict): {"counts": 各状态结果条数, "spilled": 各状态溢写条数, "in_memory": 内存中的结果条数, "segments": 分段数, "disk_bytes": 溢写字节数}
+        """
+        return {
+            "counts": dict(self.counts),
+            "spilled": dict(self.spilled),
+            "in_memory": sum(len(buffer) for buffer in self.__buffers.values()),
+            "segments": self.__segments,
+            "disk_bytes": self.__bytes,
+        }
+
+    # 关闭
+    def close(self):
+        """
+        @func: 关闭并删除溢写文件，清空存储
+        """
+        for state, f in self.__files.items():
+            f.close()
+            os.path.exists(self.__filepath(state)) and os.remove(self.__filepath(state))
+        self.__finalizer and self.__finalizer()
+        if self.__tempdir is not None:
+            self.directory = self.__tempdir = None
+        self.__files, self.__buffers = {}, {}
+        self.counts, self.spilled = {}, {}
+        self.__segments = self.__bytes = 0
@@ -0,0 +1,354 @@
+# Name: data process trace
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理管道的采样数据流追踪与时间线追踪
+"""
+# 场景描述
+DataProcessPipeline.test 只能对单条数据记录完整的数据流(每个节点处理的数据副本)，
+并且在每个节点都会对数据进行深拷贝，无法在生产环境中使用。
+当线上数据出现问题时，需要一种低成本的方式观察真实流量中数据在每个节点的变化。
+
+# 设计思想
+1. 在生产模式的执行计划中按比例(rate)采样，或者对满足条件(predicate)的数据进行追踪，
+   只有被追踪的数据才会记录每个节点处理的数据副本与节点耗时，其余数据的处理开销只增加一次采样判断。
+2. 追踪记录保存在有界的环形缓冲区(deque)中，只保留最近的 capacity 条记录，内存占用有上限。
+3. 通过 dump 按需导出追踪记录(多进程并行模式下，各工作进程的追踪记录在工作进程退出时汇总)。
+
+# 时间线追踪(DataProcessTimeline)
+聚合的运行指标(调用次数，耗时分布)无法反映处理过程中的停顿，GC 暂停与个别慢速数据。
+时间线追踪记录每条数据以及每个节点调用的时间区间(墙上时钟)，导出为 Chrome trace-event JSON 格式，
+可以通过 chrome://tracing 或 Perfetto(https://ui.perfetto.dev) 查看:
+1. 每条数据记录一个 "record" 区间，其中嵌套每个节点调用的区间，GC 暂停(gc.callbacks)记录为 "gc" 区间。
+2. 区间按 (进程, 线程) 分轨道显示，多进程并行模式下每个工作进程拥有独立的轨道，工作进程退出时回传时间线。
+3. 区间保存在有界的环形缓冲区中(保留最近的 capacity 个区间)，
+   同时通过小顶堆记录耗时最长的 slow_records 条数据(慢速数据日志)，包括处理结果与原始数据的副本。
+4. GC 回调通过弱引用持有时间线追踪器，数据处理管道未调用 exit() 时，追踪器被回收后 GC 回调自动注销，
+   不会因为 gc.callbacks 的引用常驻内存。
+
+# 注意事项
+追踪只作用于逐条数据的执行计划(串行模式与多进程并行模式)，批量模式(batch_size)，流水线模式与异步接口不进行追踪。
+"""
+
+
+import gc
+import os
+import json
+import time
+import heapq
+import random
+import weakref
+import threading
+from copy import deepcopy
+from collections import deque
+
+
+# GC 回调(通过弱引用持有时间线追踪器，追踪器被回收时从 gc.callbacks 中注销)
+class _GCHook(object):
+
+    __slots__ = ("timeline", "__weakref__")
+
+    def __init__(self, timeline):
+        self.timeline = weakref.ref(timeline, lambda _, hook=weakref.ref(self): _GCHook._detach(hook()))
+
+    @staticmethod
+    def _detach(hook):
+        hook is not None and hook in gc.callbacks and gc.callbacks.remove(hook)
+
+    def __call__(self, phase, info):
+        timeline = self.timeline()
+        timeline is not None and timeline._on_gc(phase, info)
+
+
+# 数据流追踪器
+class DataProcessTracer(object):
+    """
+    @class: DataProcessTracer | 数据流追踪器
+    @desc: 按比例采样或按条件筛选数据，记录其完整的数据流到有界的环形缓冲区中
+    @method:
+        * sample: 判断数据是否需要追踪
+        * record: 记录追踪结果
+        * dump: 导出追踪记录
+        * clear: 清空追踪记录
+    @exp:
+        tracer = DataProcessTracer(rate=0.001, predicate=lambda data: data.get("site") == "news", capacity=500)
+        pipeline = DataProcessPipeline([...], trace=tracer)
+        ...
+        tracer.dump("./trace.json")
+    """
+
+    def __init__(self, rate=0.0, predicate=None, capacity=1000, copy=deepcopy, seed=None):
+        """
+        @func: 构建器
+        @params:
+            * rate(float): 采样比例(0~1)
+            * predicate(callable): 追踪条件 predicate(data) -> bool，满足条件的数据总是被追踪
+            * capacity(int): 环形缓冲区容量(保留最近的追踪记录数)
+            * copy(callable): 数据副本函数，默认为深拷贝
+            * seed(int): 采样随机数种子
+        """
+        if not 0 <= rate <= 1:
+            raise ValueError("rate must be between 0 and 1")
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+        self.rate = rate
+        self.predicate = predicate
+        self.capacity = int(capacity)
+        self.copy = copy
+        self.seed = seed
+        # 追踪记录环形缓冲区
+        self.traces = deque(maxlen=self.capacity)
+        # 追踪的数据条数
+        self.traced = 0
+        self.__random = random.Random(seed).random
+
+    def __len__(self):
+        return len(self.traces)
+
+    # 采样判断
+    def sample(self, data):
+        if self.predicate is not None and self.predicate(data):
+            return True
+        return self.rate > 0 and self.__random() < self.rate
+
+    # 记录追踪结果
+    def record(self, processed_result, trace):
+        """
+        @func: 记录追踪结果
+        @params:
+            * processed_result(dict): 数据处理结果
+            * trace(dict): 数据流 -> {"source": 原始数据副本, "flow": [{"node": 节点ID, "data": 数据副本, "time": 耗时}, ...]}
+        """
+        trace["time"] = time.time()
+        trace["state"] = processed_result["state"]
+        if "node" in processed_result:
+            trace["node"] = processed_result["node"]
+        if "error" in processed_result:
+            trace["error"] = str(processed_result["error"])
+        self.traced += 1
+        self.traces.append(trace)
+
+    # 合并其他追踪器的追踪记录(多进程并行模式)
+    def merge(self, other):
+        self.traced += other.traced
+        self.traces.extend(other.traces)
+        return self
+
+    # 构建空的追踪器副本(供并行执行器的工作进程使用)
+    def _replicate(self):
+        return DataProcessTracer(self.rate, self.predicate, self.capacity, self.copy, self.seed)
+
+    # 导出追踪记录
+    def dump(self, filepath=None):
+        """
+        @func: 导出追踪记录
+        @params:
+            * filepath(str): 导出文件路径(JSON)，默认(None)只返回追踪记录
+        @return(list):
+        [
+            {
+                "time": 追踪时间, "state": 处理结果状态, "node": ("FILTER", "ERROR")状态下的节点ID, "error": 异常信息,
+                "source": 原始数据副本, "flow": [{"node": 节点ID, "data": 数据副本(FILTER 时为 None), "time": 节点耗时}, ...]
+            },
+            ...
+        ]
+        """
+        traces = list(self.traces)
+        if filepath:
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(json.dumps(traces, ensure_ascii=False, default=str))
+        return traces
+
+    def clear(self):
+        self.traces.clear()
+        self.traced = 0
+
+    # 序列化协议(随机数生成器在反序列化时重新构建)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_DataProcessTracer__random"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__random = random.Random(self.seed).random
+
+
+# 时间线追踪器
+class DataProcessTimeline(object):
+    """
+    @class: DataProcessTimeline | 时间线追踪器
+    @desc: 记录每条数据与每个节点调用的时间区间，导出为 Chrome trace-event JSON 格式，并记录耗时最长的慢速数据
+    @method:
+        * record: 记录单条数据的处理区间
+        * to_chrome: 构建 Chrome trace-event 格式的追踪数据
+        * dump: 导出 Chrome trace-event JSON 文件
+        * slow_log: 慢速数据日志
+        * clear: 清空追踪记录
+    @exp:
+        timeline = DataProcessTimeline(capacity=200000, slow_records=20)
+        pipeline = DataProcessPipeline([...], timeline=timeline)
+        pipeline.process(datas, workers=4)
+        timeline.dump("./timeline.json")  # chrome://tracing 或 https://ui.perfetto.dev
+    """
+
+    def __init__(self, capacity=100000, slow_records=10, copy=deepcopy, gc_events=True):
+        """
+        @func: 构建器
+        @params:
+            * capacity(int): 区间环形缓冲区容量(保留最近的区间数量)
+            * slow_records(int): 慢速数据日志保留的数据条数
+            * copy(callable): 慢速数据副本函数，默认为深拷贝(只在数据进入慢速数据日志时复制)
+            * gc_events(bool): 是否记录 GC 暂停区间
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+        self.capacity = int(capacity)
+        self.slow_records = int(slow_records)
+        self.copy = copy
+        self.gc_events = gc_events
+        # 区间 -> (名称, 类别, 起始时间(us), 持续时间(us), 进程ID, 线程ID, 参数)
+        self.events = deque(maxlen=self.capacity)
+        # 慢速数据小顶堆 -> [(耗时, 进程ID, 序号, 慢速数据), ...]
+        self.slow = []
+        self.records = 0
+        # 主进程ID(用于区分主进程与工作进程轨道)
+        self.main_pid = os.getpid()
+        self.__pid = self.main_pid
+        self.__epoch = (time.time(), time.perf_counter())
+        self.__gc_start = None
+        # GC 回调(挂载时注册)
+        self.__hook = None
+
+    def __len__(self):
+        return len(self.events)
+
+    # perf_counter 时间 -> 墙上时钟(us)
+    def __timestamp(self, t):
+        wall, perf = self.__epoch
+        return (wall + t - perf) * 1e6
+
+    # 挂载(数据处理管道初始化时调用: 校准时钟并注册 GC 回调)
+    def _attach(self):
+        self.__pid = os.getpid()
+        self.__epoch = (time.time(), time.perf_counter())
+        if self.gc_events and self.__hook is None:
+            self.__hook = _GCHook(self)
+            gc.callbacks.append(self.__hook)
+        return self
+
+    # 卸载(数据处理管道销毁时调用)
+    def close(self):
+        if self.__hook is not None:
+            _GCHook._detach(self.__hook)
+            self.__hook = None
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self.__gc_start = time.perf_counter()
+        elif self.__gc_start is not None:
+            end = time.perf_counter()
+            self.events.append((
+                "gc", "gc", self.__timestamp(self.__gc_start), (end - self.__gc_start) * 1e6, self.__pid, threading.get_ident(),
+                {"generation": info["generation"], "collected": info["collected"]},
+            ))
+            self.__gc_start = None
+
+    # 记录单条数据的处理区间
+    def record(self, processed_result, start, end, spans):
+        """
+        @func: 记录单条数据的处理区间
+        @params:
+            * processed_result(dict): 数据处理结果
+            * start(float): 数据处理开始时间(perf_counter)
+            * end(float): 数据处理结束时间(perf_counter)
+            * spans(list): 节点调用区间 -> [(节点ID, 开始时间, 结束时间), ...]
+        """
+        pid, tid, timestamp, events = self.__pid, threading.get_ident(), self.__timestamp, self.events
+        state = processed_result["state"]
+        args = {"state": state}
+        state != "SUCCES" and args.update(node=processed_result["node"])
+        events.append(("record", "record", timestamp(start), (end - start) * 1e6, pid, tid, args))
+        events.extend((node, "node", timestamp(t0), (t1 - t0) * 1e6, pid, tid, None) for node, t0, t1 in spans)
+        self.records += 1
+        # 慢速数据日志
+        latency = end - start
+        if self.slow_records and (len(self.slow) < self.slow_records or latency > self.slow[0][0]):
+            entry = {
+                "latency": latency, "time": self.__timestamp(start) / 1e6, "pid": pid, "state": state,
+                "node": processed_result.get("node"), "error": processed_result.get("error") and str(processed_result["error"]),
+                "spans": {node: t1 - t0 for node, t0, t1 in spans},
+                "source": self.copy(processed_result["source"]), "data": self.copy(processed_result["data"]),
+            }
+            item = (latency, pid, self.records, entry)
+            heapq.heappush(self.slow, item) if len(self.slow) < self.slow_records else heapq.heapreplace(self.slow, item)
+
+    # 合并其他时间线追踪器(多进程并行模式)
+    def merge(self, other):
+        self.events.extend(other.events)
+        self.records += other.records
+        for item in other.slow:
+            if len(self.slow) < self.slow_records:
+                heapq.heappush(self.slow, item)
+            elif item[0] > self.slow[0][0]:
+                heapq.heapreplace(self.slow, item)
+        return self
+
+    # 构建空的追踪器副本(供并行执行器的工作进程使用)
+    def _replicate(self):
+        replica = DataProcessTimeline(self.capacity, self.slow_records, self.copy, self.gc_events)
+        replica.main_pid = self.main_pid
+        return replica
+
+    # 慢速数据日志
+    def slow_log(self):
+        """
+        @func: 慢速数据日志(按耗时降序)
+        @return(list): [{"latency": 耗时, "time": 开始时间, "pid": 进程ID, "state": 处理状态, "node": 节点ID, "error": 异常信息, "spans": {节点ID: 耗时}, "source": 原始数据, "data": 处理后的数据}, ...]
+        """
+        return [item[-1] for item in sorted(self.slow, key=lambda item: item[0], reverse=True)]
+
+    # 构建 Chrome trace-event 格式的追踪数据
+    def to_chrome(self):
+        """
+        @func: 构建 Chrome trace-event 格式的追踪数据(完整区间事件 "ph": "X"，以及进程/线程名称元数据事件 "ph": "M")
+        @return(dict): {"traceEvents": [...], "displayTimeUnit": "ms", "otherData": {"records": 数据条数, "slow_records": 慢速数据日志}}
+        """
+        trace_events, tracks = [], {}
+        for name, cat, ts, dur, pid, tid, args in self.events:
+            event = {"name": name, "cat": cat, "ph": "X", "ts": round(ts, 3), "dur": round(dur, 3), "pid": pid, "tid": tid}
+            args and event.update(args=args)
+            trace_events.append(event)
+            tracks.setdefault(pid, set()).add(tid)
+        metadata = []
+        for pid, tids in tracks.items():
+            name = "DataProcessPipeline(main)" if pid == self.main_pid else f"worker({pid})"
+            metadata.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+            metadata.append({"name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0, "args": {"sort_index": 0 if pid == self.main_pid else pid}})
+            metadata.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": f"thread({tid})"}} for tid in tids)
+        return {
+            "traceEvents": metadata + trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"records": self.records, "slow_records": self.slow_log()},
+        }
+
+    # 导出 Chrome trace-event JSON 文件
+    def dump(self, filepath):
+        """
+        @func: 导出 Chrome trace-event JSON 文件(chrome://tracing 或 https://ui.perfetto.dev 中打开)
+        @params:
+            * filepath(str): 导出文件路径
+        """
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_chrome(), ensure_ascii=False, default=str))
+
+    def clear(self):
+        self.events.clear()
+        self.slow = []
+        self.records = 0
+
+    # 序列化协议(GC 回调只在当前进程中有效)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_DataProcessTimeline__hook"] = None
+        state["_DataProcessTimeline__gc_start"] = None
+        return state
@@ -0,0 +1,323 @@
+# Name: 时间失效去重器
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 基于时间失效的URL去重器
+
+# 场景描述
+"""
+在增量采集框架中，去重器需要记录所有已采集的URL，随着采集时间的增加，去重集合持续增长，
+最终占满服务器内存。而在增量采集的场景下，通常只需要在一个时间窗口(比如最近7天)内对URL去重，
+超过时间窗口的URL允许重新采集。因此考虑设计一种基于时间失效的去重器，使内存占用由时间窗口决定，而不是由历史总量决定。
+"""
+# 模型抽象
+"""
+将时间窗口(window)划分为 g 个“代”(generation)，每一代对应 window/g 的时间片段，
+新的URL写入当前代，查询时检测所有存活的代。当前代的时长超过 window/g 时进行轮转:
+丢弃最老的一代，并创建新的一代作为当前代。
+设 g=3, window=3
+[t0]: gens(G0)           | add(a)    -> G0{a}
+[t1]: gens(G0, G1)       | add(b)    -> G1{b}
+[t2]: gens(G0, G1, G2)   | seen(a)   -> True
+[t3]: gens(G1, G2, G3)   | seen(a)   -> False(G0 已丢弃)
+因此URL的存活时间在 window*(g-1)/g ~ window 之间，g 越大，失效时间越精确，查询时需要检测的代也越多。
+"""
+# 注意事项
+"""
+1. 为了降低内存占用，URL 不会被直接存储，而是存储其 64 位指纹(blake2b)，因此存在极低的误判概率(指纹碰撞)，
+   指纹在每次检测时只计算一次，并在所有代中复用。
+2. 存储后端:
+    * set: 指纹集合，精确去重(不考虑指纹碰撞)，每个URL约占用 100 字节(集合哈希表 + int 对象)。
+    * bloom: 布隆过滤器，每一代按 capacity/g 条数据与 error_rate 误判率分配固定大小的位数组，
+      内存占用固定且远小于 set，但存在 error_rate 的误判率(未出现过的URL被判定为已出现)。
+3. 设置 capacity 时，当前代的数据量超过 capacity/g 时提前轮转，以保证内存占用(以及布隆过滤器的误判率)有上限，
+   代价是在写入量超出预期时，实际的去重时间窗口会缩短。
+"""
+
+
+import os
+import sys
+import math
+import time
+import pickle
+import hashlib
+from array import array
+
+
+# URL 摘要(128位)
+def _digest(url):
+    if isinstance(url, str):
+        url = url.encode("utf-8")
+    return hashlib.blake2b(url, digest_size=16).digest()
+
+
+# 布隆过滤器
+class BloomFilter(object):
+    """
+    基于 bytearray 位数组的布隆过滤器，通过双重哈希(h1 + i*h2)由一个 128 位摘要生成 k 个哈希位置。
+    key(url) 计算哈希位置列表，相同参数的布隆过滤器之间可以复用，因此在多代检测时只需要计算一次。
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        # 位数组大小 m = -n*ln(p)/ln(2)^2, 哈希函数个数 k = m/n*ln(2)
+        self.capacity = int(capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # 哈希位置
+    def key(self, url):
+        digest = _digest(url)
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def __contains__(self, key):
+        bits = self.bits
+        for pos in key:
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    # 添加元素，返回元素是否已存在
+    def add(self, key):
+        bits, exists = self.bits, True
+        for pos in key:
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                exists = False
+        if not exists:
+            self.count += 1
+        return exists
+
+    def memory(self):
+        return len(self.bits)
+
+
+# 指纹集合
+class FingerprintSet(object):
+    """
+    存储 URL 64 位指纹的集合(精确去重)，key(url) 计算指纹
+    """
+
+    def __init__(self, capacity=None, error_rate=None):
+        self.fingerprints = set()
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    # 指纹(64位)
+    @staticmethod
+    def key(url):
+        return int.from_bytes(_digest(url)[:8], "little")
+
+    def __contains__(self, key):
+        return key in self.fingerprints
+
+    def add(self, key):
+        if key in self.fingerprints:
+            return True
+        self.fingerprints.add(key)
+        return False
+
+    def memory(self):
+        # 集合的哈希表 + int 对象(64位整数约 36 字节)
+        return sys.getsizeof(self.fingerprints) + len(self.fingerprints) * 36
+
+    # 序列化协议(以 array 形式紧凑存储)
+    def __getstate__(self):
+        return array("Q", self.fingerprints).tobytes()
+
+    def __setstate__(self, state):
+        fingerprints = array("Q")
+        fingerprints.frombytes(state)
+        self.fingerprints = set(fingerprints)
+
+
+# 时间失效去重器
+class ExpiringDeduplicator(object):
+    """
+    @class: ExpiringDeduplicator | 时间失效去重器
+    @desc:
+        将去重时间窗口划分为多个轮转的“代”，内存占用由时间窗口内的数据量决定。
+    @method:
+        * seen_or_add: 检测URL是否已出现(时间窗口内)，未出现时添加，O(1)
+        * seen_or_add_many: 批量检测并添加
+        * contains / contains_many: 只检测不添加
+        * snapshot: 将去重器状态保存到磁盘
+        * restore(classmethod): 从磁盘恢复去重器
+        * stats: 运行统计
+    @exp:
+        dedup = ExpiringDeduplicator(window=7*24*3600, generations=7, backend="bloom", capacity=50_000_000)
+        if not dedup.seen_or_add(url):
+            crawl(url)
+        dedup.snapshot("./dedup.snapshot")
+    """
+
+    BACKENDS = {"set": FingerprintSet, "bloom": BloomFilter}
+
+    def __init__(self, window, generations=4, backend="set", capacity=None, error_rate=0.001, refresh=False, clock=time.time):
+        """
+        @func: 构建器
+        @params:
+            * window(float): 去重时间窗口(秒)
+            * generations(int): 代的数量
+            * backend(str): 存储后端 -> "set" | "bloom"
+            * capacity(int): 时间窗口内的最大数据量，bloom 后端必须设置
+            * error_rate(float): (bloom)误判率
+            * refresh(bool): 已出现的URL再次出现时是否刷新其失效时间(写入当前代)
+            * clock(callable): 时钟函数，默认为 time.time(快照恢复后仍然可以按照真实时间失效)
+        """
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        if generations < 1:
+            raise ValueError("generations must be greater than 0")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"backend({backend}) must be one of {list(self.BACKENDS)}")
+        if backend == "bloom" and not capacity:
+            raise ValueError("capacity is required by bloom backend")
+        self.window = window
+        self.generations = int(generations)
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh = refresh
+        self.clock = clock
+        # 每一代的时长与容量
+        self.__span = window / self.generations
+        self.__generation_capacity = capacity and max(1, math.ceil(capacity / self.generations))
+        # 代 -> [(创建时间, 存储对象), ...](按时间从老到新)
+        self.__gens = []
+        self.__stats = {"added": 0, "seen": 0, "rotations": 0, "expired": 0}
+        self.__new_generation(self.clock())
+
+    def __new_generation(self, now):
+        self.__gens.append((now, self.BACKENDS[self.backend](self.__generation_capacity, self.error_rate)))
+        while len(self.__gens) > self.generations:
+            self.__stats["expired"] += len(self.__gens.pop(0)[1])
+
+    # 轮转
+    def __rotate(self):
+        now = self.clock()
+        start, current = self.__gens[-1]
+        if now - start < self.__span and not (self.__generation_capacity and len(current) >= self.__generation_capacity):
+            return
+        # 长时间无写入时可能跨越多代，丢弃所有过期的代
+        self.__stats["expired"] += sum(len(gen) for gen_start, gen in self.__gens if now - gen_start >= self.window)
+        self.__gens = [(gen_start, gen) for gen_start, gen in self.__gens if now - gen_start < self.window]
+        self.__stats["rotations"] += 1
+        self.__new_generation(now)
+
+    def __len__(self):
+        return sum(len(gen) for _, gen in self.__gens)
+
+    def __contains__(self, url):
+        return self.contains(url)
+
+    # 检测
+    def contains(self, url):
+        self.__rotate()
+        key = self.__gens[-1][1].key(url)
+        return any(key in gen for _, gen in self.__gens)
+
+    def contains_many(self, urls):
+        return [self.contains(url) for url in urls]
+
+    # 检测并添加
+    def seen_or_add(self, url):
+        """
+        @func: 检测URL在时间窗口内是否已出现，未出现时添加
+        @params:
+            * url(str|bytes): URL
+        @return(bool): 是否已出现
+        """
+        self.__rotate()
+        gens = self.__gens
+        current = gens[-1][1]
+        # 指纹(哈希位置)只计算一次，在所有代中复用
+        key = current.key(url)
+        # 从新到老检测(重复的URL通常集中在最近的时间段)
+        for i in range(len(gens) - 2, -1, -1):
+            if key in gens[i][1]:
+                self.refresh and current.add(key)
+                self.__stats["seen"] += 1
+                return True
+        if current.add(key):
+            self.__stats["seen"] += 1
+            return True
+        self.__stats["added"] += 1
+        return False
+
+    def seen_or_add_many(self, urls):
+        """
+        @func: 批量检测并添加
+        @params:
+            * urls(iterable): URL 列表
+        @return(list): 与 urls 一一对应的检测结果
+        """
+        seen_or_add = self.seen_or_add
+        return [seen_or_add(url) for url in urls]
+
+    # 运行统计
+    def stats(self):
+        """
+        @func: 运行统计
+        @return(dict):
+        {
+            "size": 时间窗口内的数据量, "memory": 估算内存占用(字节), "generations": [每一代的数据量, ...],
+            "added": 添加次数, "seen": 重复次数, "rotations": 轮转次数, "expired": 失效的数据量
+        }
+        """
+        return dict(
+            self.__stats,
+            size=len(self),
+            memory=sum(gen.memory() for _, gen in self.__gens),
+            generations=[len(gen) for _, gen in self.__gens],
+        )
+
+    # 保存快照
+    def snapshot(self, filepath):
+        """
+        @func: 将去重器状态保存到磁盘(写入临时文件后原子替换)
+        @params:
+            * filepath(str): 快照文件路径
+        """
+        state = {
+            "config": {
+                "window": self.window, "generations": self.generations, "backend": self.backend,
+                "capacity": self.capacity, "error_rate": self.error_rate, "refresh": self.refresh,
+            },
+            "gens": self.__gens,
+            "stats": self.__stats,
+        }
+        with open(filepath + ".tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(filepath + ".tmp", filepath)
+
+    # 恢复快照
+    @classmethod
+    def restore(cls, filepath, clock=time.time):
+        """
+        @func: 从快照文件恢复去重器(恢复时丢弃已过期的代)
+        @params:
+            * filepath(str): 快照文件路径
+            * clock(callable): 时钟函数
+        @return(ExpiringDeduplicator): 去重器
+        """
+        with open(filepath, "rb") as f:
+            state = pickle.load(f)
+        dedup = cls(clock=clock, **state["config"])
+        dedup.__gens = state["gens"]
+        dedup.__stats = state["stats"]
+        dedup.__rotate()
+        return dedup
@@ -4,65 +4,713 @@
 # Desc: None
 
 # 场景描述
-"""  
+"""
 在数据采集流程中，原始数据解析后需要推送到数据库做持久化存储。对于scrapy框架，这个
 IO读写过程发生在 pipline(数据管道) 中，每当框架产生item后，就需要向数据库推送。
 为了减少这个频繁读写数据库的过程，需要构建一种“缓存读写”机制来进行优化。
 """
 # 模型抽象
-"""  
+"""
 设 in 为入队操作，q 为队列元素状态， out 为出队操作。
 设“分片大小” n=3
 则有以下队列状态
 [1]: in(1) | q(1) | out([])
 [2]: in(2) | q(1, 2) | out([])
-[3]: in(3) | q(1, 2, 3) | out(1, 2, 3) 
+[3]: in(3) | q(1, 2, 3) | out(1, 2, 3)
 [4]: in(4) | q(4) | out([])
 [5]: in(5) | q(4, 5) | out([])
-[6]: in(6) | q(4, 5, 6) | out(4, 5, 6) 
+[6]: in(6) | q(4, 5, 6) | out(4, 5, 6)
 ...
 """
+# 输出条件
+"""
+分片在以下任一条件满足时输出(pop):
+1. 数量: 队列数据长度达到分片大小(slice_size)，输出一个分片长度的数据序列。
+2. 时间: 队列中最早的数据已缓存超过 max_age 秒，输出队列中的所有数据(不超过分片大小)，
+   避免在数据量较少的时段数据一直无法达到分片大小而长期滞留在队列中。
+3. 容量: 队列数据的估算字节数达到 max_bytes，输出累计字节数达到 max_bytes 的数据序列(不超过分片大小)。
+时间条件只在调用 pop 时检测，因此在空闲时段需要由调用方定时调用 pop。
+"""
+# 实现
+"""
+数据容器为列表 + 头部索引: 出队时通过切片(C 层面的内存复制)取出分片并后移头部索引，
+已出队的部分在超过容器长度的一半时统一压缩(del)，入队与出队的均摊时间复杂度为 O(1)。
+(原实现通过 list.pop(0) 逐条出队，每次出队都需要移动剩余的所有元素，分片出队的复杂度为 O(n^2))
+最早数据的缓存时间通过时间标记队列估算: 入队时每隔 max_age/8 记录一个 (数据序号, 时间) 标记，
+队首数据的入队时间取不晚于其序号的最近标记，估算误差不超过 max_age/8(偏向提前输出)。
+"""
 # 注意事项
-"""  
+"""
 在实际的项目中，对于分片大小的选取要根据场景而定，分片过大会导致内存占用过多，
 同时如果服务器宕机会导致缓存的分片队列中的数据丢失(未推送到数据库)。
+需要避免数据丢失时使用持久化模式(DurableSliceQueue)，参考“预写日志”。
+"""
+# 预写日志
+"""
+DurableSliceQueue 在入队时将数据追加写入磁盘上的分段日志(wal-{起始序号}.log)，
+每个日志记录对应一次入队: [长度(4字节) + crc32(4字节) + pickle 序列化的数据序列]，数据按入队顺序编号(序号)。
+分片输出并成功推送到下游后通过 ack(分片) 确认，确认位置(连续确认的最大序号)原子写入 ack 文件，
+所有数据均已确认的日志分段被删除。重启时从确认位置开始回放日志中尚未确认的数据，
+日志尾部不完整(写入中断)的记录被截断。
+fsync 策略:
+    * always: 每次入队后 fsync
+    * count: 每入队 fsync_count 条数据后 fsync
+    * interval: 距离上一次 fsync 超过 fsync_interval 秒后的首次入队时 fsync
+    * never: 不主动 fsync(由操作系统回写)
+每次入队都会将日志记录写入操作系统(进程崩溃不会丢失数据)，fsync 策略决定操作系统崩溃/断电时的数据丢失窗口。
 """
 
 
+import os
+import sys
+import time
+import zlib
+import pickle
+import struct
+import threading
+from queue import Full
+from collections import deque
+
+
 # 分片队列
 class SliceQueue(object):
-    """  
+    """
     队列实现
     队列内部的 slice_size 属性用于控制分片大小。当队列数据长度小于该分片大小时，
     pop()操作弹出空数据([]), 当队列数据大于该值时，pop()弹出一个分片长度的数据序列(list)
+    设置 max_age/max_bytes 时，最早的数据缓存超时或者数据估算字节数超过上限时同样弹出分片，参考“输出条件”。
     """
 
-    def __init__(self, slice_size):
+    def __init__(self, slice_size, max_age=None, max_bytes=None, sizeof=sys.getsizeof, clock=time.monotonic, age_resolution=None):
+        """
+        @func: 构建器
+        @params:
+            * slice_size(int): 分片大小
+            * max_age(float): 最早数据的最大缓存时间(秒)，默认(None)不按时间输出
+            * max_bytes(int): 分片的最大估算字节数，默认(None)不按容量输出
+            * sizeof(callable): 数据字节数估算函数，默认为 sys.getsizeof(浅层大小)
+            * clock(callable): 时钟函数
+            * age_resolution(float): 时间标记间隔(秒)，默认为 max_age/8，未设置 max_age 时不记录时间标记(age 为 None)
+        """
         if slice_size <= 0:
             raise ValueError("slice_size must be greater than 0")
+        if max_age is not None and max_age <= 0:
+            raise ValueError("max_age must be greater than 0")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
         # 分片大小
         self.__slice_size = int(slice_size)
-        # 数据容器
+        self.__max_age = max_age
+        self.__max_bytes = max_bytes
+        self.__sizeof = sizeof
+        self.__clock = clock
+        # 数据容器(head 之前为已出队的数据)
         self.__data = []
+        self.__head = 0
+        # 数据估算字节数(与数据容器一一对应)与队列中数据的总字节数
+        self.__sizes = []
+        self.__bytes = 0
+        # 时间标记 -> [(数据序号, 入队时间), ...]
+        self.__marks = deque()
+        self.__granularity = age_resolution or (max_age and max_age / 8)
+        # 入队/出队的数据总数(数据序号)
+        self.__pushed = 0
+        self.__popped = 0
+        # 各输出条件触发的次数
+        self.__stats = {"count": 0, "age": 0, "bytes": 0, "all": 0}
 
     def __len__(self):
-        return len(self.__data)
+        return len(self.__data) - self.__head
+
+    @property
+    def slice_size(self):
+        return self.__slice_size
 
     # 入队
     def push(self, datas):
-        [self.__data.append(data) for data in datas] if isinstance(datas, (list, tuple)) else self.__data.append(datas)
+        datas = datas if isinstance(datas, (list, tuple)) else (datas, )
+        if not datas:
+            return
+        if self.__granularity:
+            now, marks = self.__clock(), self.__marks
+            if not marks or now - marks[-1][1] >= self.__granularity:
+                marks.append((self.__pushed, now))
+        if self.__max_bytes is not None:
+            sizes = list(map(self.__sizeof, datas))
+            self.__sizes.extend(sizes)
+            self.__bytes += sum(sizes)
+        self.__data.extend(datas)
+        self.__pushed += len(datas)
+
+    # 最早数据的缓存时间(估算值，队列为空时为 None)
+    def age(self):
+        if not len(self) or not self.__marks:
+            return None
+        marks = self.__marks
+        while len(marks) > 1 and marks[1][0] <= self.__popped:
+            marks.popleft()
+        return self.__clock() - marks[0][1]
+
+    # 队列中数据的估算字节数
+    def nbytes(self):
+        return self.__bytes
 
     # 出队
     def pop(self, all=False):
-        if not all and len(self) < self.__slice_size:
+        """
+        @func: 出队
+        @params:
+            * all(bool): 是否弹出所有数据(不受分片大小限制)
+        @return(list): 分片数据，不满足输出条件时为 []
+        """
+        size = len(self)
+        if not size:
             return []
+        if all:
+            return self.__take(size, "all")
+        slice_size = self.__slice_size
+        if self.__max_bytes is not None and self.__bytes >= self.__max_bytes:
+            # 取出累计字节数达到 max_bytes 的数据(至少一条，不超过分片大小)
+            sizes, head, limit, total, n = self.__sizes, self.__head, self.__max_bytes, 0, 0
+            while n < slice_size and n < size and total < limit:
+                total += sizes[head + n]
+                n += 1
+            return self.__take(n, "count" if n == slice_size else "bytes")
+        if size >= slice_size:
+            return self.__take(slice_size, "count")
+        if self.__max_age is not None and self.age() >= self.__max_age:
+            return self.__take(size, "age")
+        return []
+
+    # 取出队首的 n 条数据
+    def __take(self, n, reason):
+        data, head = self.__data, self.__head
+        out = data[head:head + n]
+        head += n
+        if self.__max_bytes is not None:
+            self.__bytes -= sum(self.__sizes[self.__head:head])
+        self.__popped += n
+        self.__stats[reason] += 1
+        if head == len(data):
+            # 队列为空: 直接重置容器
+            self.__data, self.__sizes, self.__head = [], [], 0
+            self.__marks.clear()
+        elif head > len(data) >> 1:
+            # 已出队的部分超过容器长度的一半: 压缩
+            del data[:head]
+            del self.__sizes[:head if self.__max_bytes is not None else 0]
+            self.__head = 0
+        else:
+            self.__head = head
+        return out
+
+    # 输出统计
+    def stats(self):
+        """
+        @func: 输出统计
+        @return(dict): {"pending": 队列数据长度, "bytes": 估算字节数, "age": 最早数据的缓存时间, "pushed": 入队总数, "popped": 出队总数, "slices": {输出条件: 次数}}
+        """
+        return {
+            "pending": len(self), "bytes": self.__bytes, "age": self.age(),
+            "pushed": self.__pushed, "popped": self.__popped, "slices": dict(self.__stats),
+        }
+
+
+# 持久化分片队列
+class DurableSliceQueue(SliceQueue):
+    """
+    @class: DurableSliceQueue | 持久化分片队列
+    @desc:
+        入队的数据追加写入预写日志，分片推送到下游后通过 ack 确认，重启时回放尚未确认的数据(参考“预写日志”)，
+        可以在使用较大分片提升写入效率的同时避免进程或服务器宕机导致的数据丢失(至少一次语义，下游需要支持幂等写入)。
+        数据需要能够被 pickle 序列化。
+    @exp:
+        sq = DurableSliceQueue("./queue.wal", 5000, max_age=10, fsync="interval")
+        sq.push(item)
+        datas = sq.pop()
+        if datas:
+            db.insert_many(datas)
+            sq.ack(datas)
+    """
+
+    # 日志记录头部(数据长度, crc32)
+    HEADER = struct.Struct("<II")
+    FSYNC = ("always", "count", "interval", "never")
+
+    def __init__(self, directory, slice_size, max_age=None, max_bytes=None, sizeof=sys.getsizeof, clock=time.monotonic, age_resolution=None,
+        fsync="interval", fsync_count=1000, fsync_interval=1.0, segment_bytes=64 * 1024 * 1024):
+        """
+        @func: 构建器(目录中存在日志时回放尚未确认的数据)
+        @params:
+            * directory(str): 日志目录
+            * slice_size, max_age, max_bytes, sizeof, clock, age_resolution: 参考 SliceQueue
+            * fsync(str): fsync 策略 -> "always" | "count" | "interval" | "never"
+            * fsync_count(int): count 策略的 fsync 间隔(数据条数)
+            * fsync_interval(float): interval 策略的 fsync 间隔(秒)
+            * segment_bytes(int): 日志分段的最大字节数(超过时滚动到新的分段)
+        """
+        if fsync not in self.FSYNC:
+            raise ValueError(f"fsync({fsync}) must be one of {list(self.FSYNC)}")
+        super().__init__(slice_size, max_age, max_bytes, sizeof, clock, age_resolution)
+        self.directory = directory
+        self.fsync = fsync
+        self.fsync_count = max(1, int(fsync_count))
+        self.fsync_interval = fsync_interval
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        # 日志分段 -> [(起始序号, 文件路径), ...]
+        self.__segments = []
+        self.__file = None
+        # 下一条入队/出队数据的序号，连续确认的最大序号(不含)
+        self.__seq = self.__next = self.__acked = 0
+        # 已出队未确认的分片 -> {id(分片): [起始序号, 结束序号, 分片, 是否已确认]}
+        self.__inflight = {}
+        self.__unsynced, self.__synced_at = 0, time.monotonic()
+        self.__stats = {"fsyncs": 0, "replayed": 0, "truncated": 0}
+        self.__recover()
+
+    # 回放日志
+    def __recover(self):
+        path = os.path.join(self.directory, "ack")
+        if os.path.exists(path):
+            with open(path) as f:
+                self.__acked = int(f.read().strip() or 0)
+        names = sorted(name for name in os.listdir(self.directory) if name.startswith("wal-") and name.endswith(".log"))
+        seq = self.__acked
+        for name in names:
+            seq, filepath = int(name[4:-4]), os.path.join(self.directory, name)
+            self.__segments.append((seq, filepath))
+            for datas in self.__read(filepath):
+                # 跳过已确认的数据
+                skip = self.__acked - seq
+                seq += len(datas)
+                datas = datas[skip:] if skip > 0 else datas
+                if datas:
+                    SliceQueue.push(self, datas)
+                    self.__stats["replayed"] += len(datas)
+        # 回放的数据从确认位置开始出队
+        self.__seq, self.__next = max(seq, self.__acked), self.__acked
+        self.__compact()
+
+    # 读取日志分段(截断尾部不完整或损坏的记录)
+    def __read(self, filepath):
+        size, offset = self.HEADER.size, 0
+        with open(filepath, "rb") as f:
+            while True:
+                header = f.read(size)
+                if len(header) < size:
+                    break
+                length, crc = self.HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                offset += size + length
+                yield pickle.loads(payload)
+            truncated = f.seek(0, os.SEEK_END) != offset
+        if truncated:
+            self.__stats["truncated"] += 1
+            os.truncate(filepath, offset)
+
+    # 入队(先写入日志)
+    def push(self, datas):
+        datas = datas if isinstance(datas, (list, tuple)) else (datas, )
+        if not datas:
+            return
+        payload = pickle.dumps(list(datas), protocol=pickle.HIGHEST_PROTOCOL)
+        f = self.__file or self.__open()
+        f.write(self.HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.__seq += len(datas)
+        self.__unsynced += len(datas)
+        fsync = self.fsync
+        if fsync == "always" or (fsync == "count" and self.__unsynced >= self.fsync_count) or \
+            (fsync == "interval" and time.monotonic() - self.__synced_at >= self.fsync_interval):
+            self.sync()
+        # 滚动日志分段
+        if f.tell() >= self.segment_bytes:
+            self.sync()
+            f.close()
+            self.__file = None
+        super().push(datas)
+
+    # 打开新的日志分段(写入位置为下一条数据的序号)
+    def __open(self):
+        if self.__segments and self.__segments[-1][0] == self.__seq:
+            filepath = self.__segments[-1][1]
         else:
-            return [self.__data.pop(0) for i in range(len(self) if all else self.__slice_size)]
-        
+            filepath = os.path.join(self.directory, f"wal-{self.__seq:016d}.log")
+            self.__segments.append((self.__seq, filepath))
+        # 无缓冲写入: 每次入队的日志记录直接写入操作系统
+        self.__file = open(filepath, "ab", buffering=0)
+        return self.__file
+
+    # 出队(记录分片的序号范围，等待确认)
+    def pop(self, all=False):
+        datas = super().pop(all)
+        if datas:
+            self.__inflight[id(datas)] = [self.__next, self.__next + len(datas), datas, False]
+            self.__next += len(datas)
+        return datas
+
+    # 确认分片
+    def ack(self, datas):
+        """
+        @func: 确认分片已成功推送到下游(分片可以按任意顺序确认，确认位置只在连续确认时前移)
+        @params:
+            * datas(list): pop 返回的分片对象
+        @return(int): 确认的数据条数
+        """
+        entry = self.__inflight.get(id(datas))
+        if entry is None or entry[2] is not datas:
+            raise ValueError("slice is not in flight(ack must be called with the list returned by pop)")
+        entry[3] = True
+        acked, inflight = self.__acked, self.__inflight
+        # 已出队的分片按出队顺序排列
+        while inflight:
+            key, (start, end, _, done) = next(iter(inflight.items()))
+            if not done:
+                break
+            self.__acked = end
+            del inflight[key]
+        if self.__acked != acked:
+            self.__write_ack()
+            self.__compact()
+        return len(datas)
+
+    # 原子写入确认位置
+    def __write_ack(self):
+        path = os.path.join(self.directory, "ack")
+        with open(path + ".tmp", "w") as f:
+            f.write(str(self.__acked))
+            f.flush()
+            self.fsync != "never" and os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    # 删除所有数据均已确认的日志分段(当前写入的分段除外)
+    def __compact(self):
+        segments = self.__segments
+        while len(segments) > 1 and segments[1][0] <= self.__acked:
+            os.path.exists(segments[0][1]) and os.remove(segments[0][1])
+            segments.pop(0)
+
+    # 同步日志到磁盘
+    def sync(self):
+        if self.__file is not None:
+            os.fsync(self.__file.fileno())
+            self.__stats["fsyncs"] += 1
+        self.__unsynced, self.__synced_at = 0, time.monotonic()
+
+    # 未确认的数据条数(队列中的数据 + 已出队未确认的数据)
+    def unacked(self):
+        return self.__seq - self.__acked
+
+    # 关闭日志(未确认的数据在下次构建时回放)
+    def close(self):
+        if self.__file is not None:
+            self.sync()
+            self.__file.close()
+            self.__file = None
+        self.__write_ack()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # 输出统计
+    def stats(self):
+        """
+        @func: 输出统计
+        @return(dict): 参考 SliceQueue.stats，增加 "wal": {"segments": 日志分段数, "bytes": 日志字节数, "acked": 确认位置, "unacked": 未确认的数据条数, "inflight": 已出队未确认的分片数, "fsyncs": fsync 次数, "replayed": 回放的数据条数, "truncated": 截断的日志分段数}
+        """
+        stats = super().stats()
+        stats["wal"] = {
+            "segments": len(self.__segments),
+            "bytes": sum(os.path.getsize(path) for _, path in self.__segments if os.path.exists(path)),
+            "acked": self.__acked, "unacked": self.unacked(), "inflight": len(self.__inflight),
+            **self.__stats,
+        }
+        return stats
+
+
+# 线程安全的分片队列
+class ConcurrentSliceQueue(object):
+    """
+    @class: ConcurrentSliceQueue | 线程安全的分片队列
+    @desc:
+        多生产者线程通过 push 入队，消费者线程通过 pop_slice 阻塞等待分片(输出条件参考 SliceQueue)，
+        分片由 SliceQueue 在锁内维护，通过条件变量在分片就绪(或队列由空变为非空以开始计时)时唤醒消费者。
+        通常与后台输出线程(SliceFlusher)配合使用。
+    @exp:
+        queue = ConcurrentSliceQueue(1000, max_age=5)
+        flusher = SliceFlusher(queue, sink=lambda datas: db.insert_many(datas)).start()
+        queue.push(item)     # 多个生产者线程
+        ...
+        flusher.stop()       # 关闭队列并输出剩余的数据
+    """
+
+    def __init__(self, slice_size, max_age=None, max_bytes=None, sizeof=sys.getsizeof, maxsize=None, wal=None):
+        """
+        @func: 构建器
+        @params:
+            * slice_size(int): 分片大小
+            * max_age(float): 最早数据的最大缓存时间(秒)
+            * max_bytes(int): 分片的最大估算字节数
+            * sizeof(callable): 数据字节数估算函数
+            * maxsize(int): 队列数据长度上限，达到上限时 push 阻塞(背压)，默认(None)不限制
+            * wal(str|dict): 持久化模式的日志目录(或 DurableSliceQueue 的参数字典，包含 directory)，默认(None)不持久化
+        """
+        # 始终记录时间标记(用于统计输出延迟)
+        age_resolution = max_age / 8 if max_age else 0.01
+        if wal is None:
+            self.__queue = SliceQueue(slice_size, max_age, max_bytes, sizeof, age_resolution=age_resolution)
+        else:
+            options = {"directory": wal} if isinstance(wal, str) else dict(wal)
+            self.__queue = DurableSliceQueue(slice_size=slice_size, max_age=max_age, max_bytes=max_bytes, sizeof=sizeof, age_resolution=age_resolution, **options)
+        self.__max_age = max_age
+        self.__max_bytes = max_bytes
+        self.__maxsize = maxsize
+        self.__cond = threading.Condition(threading.Lock())
+        self.__closed = False
+        self.__depth_max = 0
+
+    def __len__(self):
+        return len(self.__queue)
+
+    @property
+    def closed(self):
+        return self.__closed
+
+    # 入队(线程安全)
+    def push(self, datas, block=True, timeout=None):
+        """
+        @func: 入队
+        @params:
+            * datas(any|list|tuple): 数据(list/tuple 作为多条数据入队)
+            * block(bool): 达到队列长度上限(maxsize)时是否阻塞
+            * timeout(float): 阻塞超时时间(秒)，超时抛出 queue.Full
+        """
+        with self.__cond:
+            if self.__closed:
+                raise RuntimeError("push to a closed ConcurrentSliceQueue")
+            queue = self.__queue
+            if self.__maxsize is not None and len(queue) >= self.__maxsize:
+                if not block or not self.__cond.wait_for(lambda: len(queue) < self.__maxsize or self.__closed, timeout):
+                    raise Full
+                if self.__closed:
+                    raise RuntimeError("push to a closed ConcurrentSliceQueue")
+            empty = not len(queue)
+            queue.push(datas)
+            size = len(queue)
+            if size > self.__depth_max:
+                self.__depth_max = size
+            # 分片就绪，或者队列由空变为非空(消费者开始按 max_age 计时)时唤醒消费者
+            if empty or size >= queue.slice_size or (self.__max_bytes is not None and queue.nbytes() >= self.__max_bytes):
+                self.__cond.notify_all()
+
+    # 阻塞等待分片
+    def pop_slice(self, timeout=None):
+        """
+        @func: 阻塞等待分片
+        @params:
+            * timeout(float): 等待超时时间(秒)，默认(None)一直等待
+        @return(list): 分片数据，超时返回 []，队列关闭后按分片大小返回剩余的数据(队列为空时返回 [])
+        """
+        return self._pop_slice(timeout)[0]
+
+    def _pop_slice(self, timeout=None):
+        """
+        @func: 阻塞等待分片，同时返回分片中最早数据的缓存时间(供 SliceFlusher 统计输出延迟)
+        @return(tuple): (分片数据, 最早数据的缓存时间)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        queue, cond = self.__queue, self.__cond
+        with cond:
+            while True:
+                age = queue.age()
+                datas = queue.pop()
+                if not datas and self.__closed:
+                    # 队列关闭后按分片大小输出剩余的数据(不足一个分片时全部输出)
+                    datas = queue.pop(True)
+                if datas or self.__closed:
+                    datas and self.__maxsize is not None and cond.notify_all()
+                    return datas, age
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.monotonic()
+                    if wait <= 0:
+                        return [], None
+                # 按最早数据的缓存时间计算唤醒时间
+                if self.__max_age is not None and age is not None:
+                    wait = max(self.__max_age - age, 0.001) if wait is None else min(wait, max(self.__max_age - age, 0.001))
+                cond.wait(wait)
+
+    # 关闭队列
+    def close(self):
+        """
+        @func: 关闭队列(不再接受入队，唤醒所有等待的消费者与生产者，pop_slice 按分片大小返回剩余的数据)
+        """
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+
+    @property
+    def durable(self):
+        return isinstance(self.__queue, DurableSliceQueue)
+
+    # 确认分片(持久化模式)
+    def ack(self, datas):
+        """
+        @func: 确认分片已成功推送到下游，非持久化模式时忽略
+        @params:
+            * datas(list): pop_slice 返回的分片对象
+        """
+        if self.durable:
+            with self.__cond:
+                self.__queue.ack(datas)
+
+    # 关闭日志(持久化模式，在所有消费者退出后调用)
+    def close_wal(self):
+        if self.durable:
+            with self.__cond:
+                self.__queue.close()
+
+    # 队列统计
+    def stats(self):
+        """
+        @func: 队列统计
+        @return(dict): {"depth": 队列数据长度, "depth_max": 最大队列数据长度, "bytes": 估算字节数, "age": 最早数据的缓存时间, "pushed": 入队总数, "popped": 出队总数, "slices": {输出条件: 次数}, "wal": 持久化模式的日志统计}
+        """
+        with self.__cond:
+            stats = self.__queue.stats()
+        stats["depth"], stats["depth_max"] = stats.pop("pending"), self.__depth_max
+        return stats
+
+
+# 分片后台输出线程
+class SliceFlusher(object):
+    """
+    @class: SliceFlusher | 分片后台输出线程
+    @desc:
+        在后台线程中循环等待 ConcurrentSliceQueue 的分片并调用 sink(datas) 输出(比如批量写入数据库)，
+        生产者线程只需要入队，不会被输出 IO 阻塞。
+        输出失败时按 retry_interval 指数退避重试 retries 次，仍然失败时调用 on_error(datas, exception)，
+        未设置 on_error 时将分片保存到 failed 列表中。
+        持久化模式下，分片在输出成功(或者交由 on_error/failed 处理)后确认，未确认的分片在重启时回放。
+    @method:
+        * start: 启动后台输出线程
+        * stop: 关闭队列，输出剩余的数据并等待后台线程退出
+        * stats: 输出统计(队列深度，输出延迟，重试次数等)
+    """
+
+    def __init__(self, queue, sink, retries=3, retry_interval=0.5, on_error=None, name="SliceFlusher"):
+        """
+        @func: 构建器
+        @params:
+            * queue(ConcurrentSliceQueue): 线程安全的分片队列
+            * sink(callable): 输出函数 sink(datas: list)
+            * retries(int): 输出失败的重试次数
+            * retry_interval(float): 首次重试的等待时间(秒)，之后每次加倍
+            * on_error(callable): 重试后仍然失败时的回调 on_error(datas, exception)
+            * name(str): 线程名称
+        """
+        self.queue = queue
+        self.sink = sink
+        self.retries = int(retries)
+        self.retry_interval = retry_interval
+        self.on_error = on_error
+        # 重试后仍然输出失败的分片(未设置 on_error 时)
+        self.failed = []
+        self.__thread = threading.Thread(target=self.__run, name=name, daemon=True)
+        self.__stats = {
+            "flushes": 0, "records": 0, "retries": 0, "failures": 0, "failed_records": 0,
+            "lag_last": None, "lag_max": 0.0, "lag_total": 0.0, "time_total": 0.0,
+        }
+
+    def start(self):
+        self.__thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self.__thread.is_alive()
+
+    def __run(self):
+        while True:
+            datas, age = self.queue._pop_slice()
+            if not datas:
+                # 队列已关闭且为空
+                return
+            self.__flush(datas, age)
+
+    def __flush(self, datas, age):
+        stats = self.__stats
+        start = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                self.sink(datas)
+                break
+            except Exception as e:
+                error = e
+                if attempt < self.retries:
+                    stats["retries"] += 1
+                    time.sleep(self.retry_interval * 2 ** attempt)
+        else:
+            stats["failures"] += 1
+            stats["failed_records"] += len(datas)
+            self.on_error(datas, error) if self.on_error else self.failed.append(datas)
+            self.queue.ack(datas)
+            return
+        self.queue.ack(datas)
+        end = time.monotonic()
+        # 输出延迟: 分片中最早的数据从入队到输出完成的时间
+        lag = (age or 0.0) + end - start
+        stats["flushes"] += 1
+        stats["records"] += len(datas)
+        stats["time_total"] += end - start
+        stats["lag_last"] = lag
+        stats["lag_total"] += lag
+        stats["lag_max"] = max(stats["lag_max"], lag)
+
+    # 停止
+    def stop(self, timeout=None):
+        """
+        @func: 关闭队列，等待后台线程输出剩余的数据并退出(持久化模式下同时关闭日志)
+        @params:
+            * timeout(float): 等待超时时间(秒)
+        @return(bool): 后台线程是否已退出
+        """
+        self.queue.close()
+        self.__thread.join(timeout)
+        if self.__thread.is_alive():
+            return False
+        self.queue.close_wal()
+        return True
+
+    # 输出统计
+    def stats(self):
+        """
+        @func: 输出统计
+        @return(dict):
+        {
+            "flushes": 输出次数, "records": 输出数据条数, "retries": 重试次数, "failures": 重试后仍然失败的分片数, "failed_records": 失败的数据条数,
+            "lag_last": 最近一次输出延迟, "lag_max": 最大输出延迟, "lag_avg": 平均输出延迟, "time_avg": 平均输出耗时,
+            "depth": 队列数据长度, "depth_max": 最大队列数据长度, "running": 后台线程是否运行中
+        }
+        """
+        stats = dict(self.__stats)
+        flushes = stats["flushes"]
+        lag_total, time_total = stats.pop("lag_total"), stats.pop("time_total")
+        stats["lag_avg"] = lag_total / flushes if flushes else 0.0
+        stats["time_avg"] = time_total / flushes if flushes else 0.0
+        queue_stats = self.queue.stats()
+        stats["depth"], stats["depth_max"], stats["running"] = queue_stats["depth"], queue_stats["depth_max"], self.running
+        return stats
+
 
 # Test
 if __name__ ==  "__main__":
-    
+
     # 构建分片队列
     sq = SliceQueue(3)
     [sq.push(i) or print(f"[{i}]: in({i}) | out({sq.pop()})") for i in range(1, 11)]
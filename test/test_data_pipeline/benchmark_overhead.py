@@ -0,0 +1,51 @@
+# Name: Benchmark DataProcessPipeline(overhead)
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 测试数据处理管道的框架开销(单次节点调用)
+
+import time
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# 空节点
+@DataProcessNode.build
+def NoopNode(self, data: dict) -> dict:
+    """
+    @func: 直接返回数据
+    @input: {...}
+    @output: {...}
+    """
+    return data
+
+
+# 计时(取多次运行的最小值)
+def timeit(func, repeat=5):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        costs.append(time.perf_counter() - start)
+    return min(costs)
+
+
+# 基准: 直接调用节点处理函数
+def baseline(processes, datas):
+    for data in datas:
+        for process in processes:
+            data = process(data)
+
+
+if __name__ == "__main__":
+
+    n = 50000
+    datas = [{"id": i} for i in range(n)]
+    print(f"records: {n}")
+    for depth in (1, 5, 10, 20):
+        nodes = [NoopNode(f"NoopNode_{i}") for i in range(depth)]
+        processes = [node.process for node in nodes]
+        base = timeit(lambda: baseline(processes, datas))
+        for metrics in (False, True):
+            pipeline = DataProcessPipeline(nodes, source_policy="none", metrics=metrics).init()
+            cost = timeit(lambda: pipeline.process(datas))
+            overhead = (cost - base) / (n * depth) * 1e9
+            print(f"depth({depth:>2}) metrics({metrics!s:<5}): {cost / (n * depth) * 1e9:>7.1f} ns/node-call | overhead: {overhead:>7.1f} ns/node-call")
@@ -0,0 +1,52 @@
+# Name: Benchmark DataProcessPipeline(source_policy)
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 测试不同原始数据保留策略(source_policy)在嵌套 JSON 数据上的单条数据处理开销
+
+import time
+import random
+import tracemalloc
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# 构建模拟 API 回传数据(嵌套 JSON)
+def build_payload(i):
+    return {
+        "id": i,
+        "title": f"title-{i}" * 4,
+        "author": {"uid": random.randint(1, 10**8), "name": f"user-{i}", "tags": ["a", "b", "c"], "stats": {"fans": i, "follows": i * 2}},
+        "content": {"text": "x" * 512, "images": [{"url": f"https://img.com/{i}/{k}.jpg", "w": 640, "h": 480} for k in range(4)]},
+        "comments": [{"cid": k, "text": "c" * 64, "likes": k, "user": {"uid": k, "name": f"u{k}"}} for k in range(10)],
+        "meta": {"time": 1677661655 + i, "source": "api", "flags": [True, False, None]},
+    }
+
+
+# 字段提取节点(修改外层字段)
+class FieldExtractor(DataProcessNode):
+
+    def process(self, data: dict) -> dict:
+        """
+        @func: 提取作者名与评论数
+        @input: {"author": {"name": "..."}, "comments": [...], ...}
+        @output: {"author_name": "...", "comment_count": 10, ...}
+        """
+        data["author_name"] = data["author"]["name"]
+        data["comment_count"] = len(data["comments"])
+        return data
+
+
+if __name__ == "__main__":
+
+    n = 20000
+    datas = [build_payload(i) for i in range(n)]
+    print(f"records: {n}")
+    for policy in DataProcessPipeline.SOURCE_POLICIES:
+        pipeline = DataProcessPipeline([FieldExtractor()], source_policy=policy)
+        _datas = [dict(data) for data in datas]
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = pipeline.process(_datas)
+        cost = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{policy:<10} {cost / n * 1e6:>8.2f} us/record | retained: {current / n:>8.0f} B/record | peak: {peak / 2**20:>7.1f} MB")
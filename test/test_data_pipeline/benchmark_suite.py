@@ -0,0 +1,253 @@
+# Name: Benchmark DataProcessPipeline(suite)
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 数据处理管道吞吐量基准测试套件(JSON 报告与基线对比)
+"""
+# 测试矩阵
+数据(generator) x 管道深度(depth) x 异常比例(mix)
+    * generator: flat(扁平字典) | nested(嵌套 JSON) | text(大文本字段)
+    * depth: 数据处理节点数量
+    * mix: FILTER/ERROR 数据比例
+# 测试指标
+    * records_per_sec: 吞吐量(多次运行取最优)
+    * overhead_ns: 单次节点调用的框架开销(相对于直接调用节点处理函数的基准)
+    * peak_memory: 处理过程中的内存峰值(tracemalloc, 字节)
+    * blocks: 处理结束后仍存活的内存块数量(tracemalloc, 主要为处理结果)
+    * gc_collections: 处理过程中触发的分代垃圾回收次数(反映容器对象的分配量)
+# 使用方式
+    * 运行并保存基线: python benchmark_suite.py -o baseline.json
+    * 与基线对比: python benchmark_suite.py --compare baseline.json [--threshold 0.1]
+      指标劣化超过阈值时标记为回归(regression)，存在回归时以退出码 1 退出。
+    * 快速模式(较小的测试矩阵): python benchmark_suite.py --quick
+# 管道配置
+    * 默认使用数据处理管道的默认配置(source_policy="deep", metrics=True, errors="format")，与实际使用时的开销一致。
+    * 精简配置(source_policy="none", metrics=False, errors="lazy"): python benchmark_suite.py --lean
+    * 也可以单独指定: --source-policy none | --no-metrics | --errors lazy
+    * 与基线对比时，管道配置不一致的对比结果没有意义，会输出警告。
+"""
+
+import gc
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# 数据生成器
+def flat_record(i):
+    return {"id": i, "name": f"name-{i}", "score": i * 0.5, "flag": bool(i & 1), "tag": "a"}
+
+
+def nested_record(i):
+    return {
+        "id": i,
+        "author": {"uid": i, "name": f"user-{i}", "stats": {"fans": i, "follows": i * 2}},
+        "content": {"images": [{"url": f"https://img.com/{i}/{k}.jpg", "w": 640, "h": 480} for k in range(3)]},
+        "comments": [{"cid": k, "likes": k, "user": {"uid": k}} for k in range(5)],
+    }
+
+
+def text_record(i):
+    return {"id": i, "title": f"title-{i}", "text": f"{i}" + "x" * 8192}
+
+
+GENERATORS = {"flat": flat_record, "nested": nested_record, "text": text_record}
+
+# FILTER/ERROR 数据比例
+MIXES = {"clean": (0.0, 0.0), "mixed": (0.1, 0.05), "noisy": (0.3, 0.3)}
+
+
+# 分流节点(按数据ID产生 FILTER/ERROR)
+class GateNode(DataProcessNode):
+
+    def __init__(self, filter_rate=0.0, error_rate=0.0, pid=None):
+        super().__init__(pid)
+        self.filter_bound = int(filter_rate * 100)
+        self.error_bound = self.filter_bound + int(error_rate * 100)
+
+    def process(self, data: dict) -> dict:
+        """
+        @func: 按数据ID过滤数据或抛出异常
+        @input: {"id": 0, ...}
+        @output: {"id": 0, ...}
+        """
+        n = data["id"] % 100
+        if n < self.filter_bound:
+            return None
+        if n < self.error_bound:
+            raise ValueError(f"bad record: {data['id']}")
+        return data
+
+
+# 字段写入节点
+class FieldNode(DataProcessNode):
+
+    def __init__(self, field, pid=None):
+        super().__init__(pid)
+        self.field = field
+
+    def process(self, data: dict) -> dict:
+        """
+        @func: 写入字段
+        @input: {...}
+        @output: {"<field>": 1, ...}
+        """
+        data[self.field] = 1
+        return data
+
+
+# 构建数据处理节点
+def build_nodes(depth, mix):
+    filter_rate, error_rate = MIXES[mix]
+    return [GateNode(filter_rate, error_rate, pid="Gate")] + [FieldNode(f"f{i}", pid=f"Field_{i}") for i in range(depth - 1)]
+
+
+# 基准: 直接调用节点处理函数
+def baseline(processes, datas):
+    for data in datas:
+        try:
+            for process in processes:
+                data = process(data)
+                if data is None:
+                    break
+        except Exception:
+            pass
+
+
+# 计时(取多次运行的最小值)
+def timeit(func, repeat):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        costs.append(time.perf_counter() - start)
+    return min(costs)
+
+
+# 运行单个测试用例
+def run_case(generator, depth, mix, records, repeat, source_policy, metrics, errors):
+    datas = [GENERATORS[generator](i) for i in range(records)]
+    nodes = build_nodes(depth, mix)
+    processes = [node.process for node in nodes]
+    pipeline = DataProcessPipeline(nodes, source_policy=source_policy, metrics=metrics, errors=errors).init()
+    base = timeit(lambda: baseline(processes, datas), repeat)
+    cost = timeit(lambda: pipeline.process(datas), repeat)
+    # 内存与分配统计(单独运行，避免 tracemalloc 影响计时)
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    tracemalloc.start()
+    result = pipeline.process(datas)
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    # 节点调用次数(FILTER/ERROR 数据只调用分流节点)
+    calls = records + len(result.get("SUCCES", [])) * (depth - 1)
+    return {
+        "generator": generator, "depth": depth, "mix": mix, "records": records,
+        "states": {state: len(results) for state, results in result.items()},
+        "records_per_sec": round(records / cost, 1),
+        "overhead_ns": round((cost - base) / calls * 1e9, 1),
+        "peak_memory": peak,
+        "blocks": blocks,
+        "gc_collections": collections,
+    }
+
+
+# 运行测试套件
+def run_suite(records, repeat, depths, generators, mixes, source_policy, metrics, errors):
+    cases = []
+    for generator in generators:
+        for depth in depths:
+            for mix in mixes:
+                case = run_case(generator, depth, mix, records, repeat, source_policy, metrics, errors)
+                cases.append(case)
+                print(
+                    f"{generator:<6} depth({depth:>2}) {mix:<5} | {case['records_per_sec']:>10.1f} records/s | "
+                    f"overhead: {case['overhead_ns']:>7.1f} ns/node-call | peak: {case['peak_memory']/1024/1024:>7.2f} MB | "
+                    f"blocks: {case['blocks']:>8} | gc: {case['gc_collections']:>4}",
+                    file=sys.stderr,
+                )
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(), "platform": platform.platform(),
+            "records": records, "repeat": repeat, "source_policy": source_policy, "metrics": metrics, "errors": errors,
+        },
+        "cases": cases,
+    }
+
+
+# 指标 -> 劣化方向(1: 越大越好, -1: 越小越好)
+COMPARE_METRICS = {"records_per_sec": 1, "overhead_ns": -1, "peak_memory": -1, "blocks": -1}
+
+
+# 基线对比
+def compare(report, baseline_report, threshold):
+    """
+    @func: 将测试报告与基线对比，指标劣化超过阈值(相对变化)时标记为回归
+    @return(list): 对比结果 -> [{"case": 用例, "metric": 指标, "baseline": 基线值, "current": 当前值, "change": 相对变化, "regression": 是否回归}, ...]
+    """
+    key = lambda case: (case["generator"], case["depth"], case["mix"])
+    baseline_cases = {key(case): case for case in baseline_report["cases"]}
+    diffs = []
+    for case in report["cases"]:
+        base = baseline_cases.get(key(case))
+        if base is None:
+            continue
+        for metric, direction in COMPARE_METRICS.items():
+            # overhead_ns 在节点极轻量时接近 0(甚至为负)，以吞吐量为准，不单独判定回归
+            if not base[metric] or (metric == "overhead_ns" and base[metric] < 0):
+                continue
+            change = (case[metric] - base[metric]) / abs(base[metric])
+            diffs.append({
+                "case": "/".join(map(str, key(case))), "metric": metric, "baseline": base[metric], "current": case[metric],
+                "change": round(change, 4), "regression": change * direction < -threshold,
+            })
+    return diffs
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="数据处理管道吞吐量基准测试套件")
+    parser.add_argument("-o", "--out", type=str, default=None, help="JSON 报告输出路径(默认输出到标准输出)")
+    parser.add_argument("-c", "--compare", type=str, default=None, help="基线报告路径")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1, help="回归阈值(指标劣化的相对变化)")
+    parser.add_argument("-n", "--records", type=int, default=20000, help="每个用例的数据条数")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="计时重复次数")
+    parser.add_argument("-q", "--quick", action="store_true", help="快速模式(较小的测试矩阵)")
+    parser.add_argument("--source-policy", type=str, default="deep", choices=DataProcessPipeline.SOURCE_POLICIES, help="原始数据保留策略")
+    parser.add_argument("--metrics", action=argparse.BooleanOptionalAction, default=True, help="节点指标统计(--no-metrics 关闭)")
+    parser.add_argument("--errors", type=str, default="format", choices=("format", "lazy"), help="节点异常信息的记录方式")
+    parser.add_argument("--lean", action="store_true", help="精简配置(source_policy=none, metrics=False, errors=lazy)")
+    args = parser.parse_args()
+    if args.lean:
+        args.source_policy, args.metrics, args.errors = "none", False, "lazy"
+
+    if args.quick:
+        report = run_suite(min(args.records, 5000), min(args.repeat, 3), (1, 5), ("flat", "nested"), ("clean", "noisy"), args.source_policy, args.metrics, args.errors)
+    else:
+        report = run_suite(args.records, args.repeat, (1, 5, 10, 20), tuple(GENERATORS), tuple(MIXES), args.source_policy, args.metrics, args.errors)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline_report = json.load(f)
+        config = lambda report: {key: report["meta"].get(key) for key in ("source_policy", "metrics", "errors")}
+        if config(report) != config(baseline_report):
+            print(f"[warning] pipeline config mismatch: baseline {config(baseline_report)} vs current {config(report)}", file=sys.stderr)
+        report["compare"] = {"baseline": args.compare, "threshold": args.threshold, "diffs": compare(report, baseline_report, args.threshold)}
+        regressions = [diff for diff in report["compare"]["diffs"] if diff["regression"]]
+        for diff in regressions:
+            print(f"[regression] {diff['case']} {diff['metric']}: {diff['baseline']} -> {diff['current']} ({diff['change']:+.1%})", file=sys.stderr)
+        print(f"compare: {len(report['compare']['diffs'])} metrics, {len(regressions)} regressions", file=sys.stderr)
+
+    output = json.dumps(report, ensure_ascii=False, indent=4)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,55 @@
+# Name: Benchmark DataProcessPipeline(workers)
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 测试多进程并行模式(以及分区并行模式)下数据处理管道吞吐量随工作进程数的变化
+
+import os
+import time
+import hashlib
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# CPU 密集型节点
+class HashNode(DataProcessNode):
+
+    def process(self, data: dict) -> dict:
+        """
+        @func: 对 content 字段进行多轮哈希计算
+        @input: {"content": "aaa", ...}
+        @output: {"content": "aaa", "hash": "...", ...}
+        """
+        digest = data["content"].encode()
+        for _ in range(2000):
+            digest = hashlib.sha256(digest).digest()
+        data["hash"] = digest.hex()
+        return data
+
+
+if __name__ == "__main__":
+
+    datas = [{"id": i, "content": f"content-{i}"} for i in range(5000)]
+    print(f"records: {len(datas)} | cpu: {os.cpu_count()}")
+    # 串行基准
+    start = time.perf_counter()
+    result = DataProcessPipeline([HashNode()]).process(datas)
+    baseline = time.perf_counter() - start
+    print(f"workers(None): {len(datas)/baseline:>10.1f} records/s")
+    # 并行模式
+    workers = 1
+    while workers <= max(os.cpu_count(), 2):
+        start = time.perf_counter()
+        result = DataProcessPipeline([HashNode()]).process(datas, workers=workers, chunksize=100)
+        cost = time.perf_counter() - start
+        assert len(result["SUCCES"]) == len(datas)
+        print(f"workers({workers}): {len(datas)/cost:>10.1f} records/s | speedup: {baseline/cost:.2f}x")
+        workers *= 2
+    # 分区并行模式(按 id % 64 分区)
+    workers = 1
+    while workers <= max(os.cpu_count(), 2):
+        pipeline = DataProcessPipeline([HashNode()])
+        start = time.perf_counter()
+        result = pipeline.process(datas, workers=workers, chunksize=100, partition_by=lambda data: data["id"] % 64)
+        cost = time.perf_counter() - start
+        assert len(result["SUCCES"]) == len(datas)
+        print(f"partition({workers}): {len(datas)/cost:>8.1f} records/s | speedup: {baseline/cost:.2f}x | skew: {pipeline.executor.stats()['skew']:.2f}")
+        workers *= 2
@@ -0,0 +1,54 @@
+# Name: Test DataProcessPipeline.aprocess
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import asyncio
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+class Fetch(DataProcessNode):
+    concurrency = 5
+
+    def __init__(self):
+        super().__init__()
+        self.started = 0
+        self.running = self.running_max = 0
+
+    async def process(self, data: dict) -> dict:
+        self.started += 1
+        self.running += 1
+        self.running_max = max(self.running_max, self.running)
+        # 首条数据为慢速数据
+        await asyncio.sleep(0.2 if data["id"] == 0 else 0.001)
+        self.running -= 1
+        if data["id"] % 10 == 9:
+            return None
+        data["fetched"] = True
+        return data
+
+
+# 有序输出，在途数据 + 重排缓冲区中的数据不超过 concurrency
+async def main():
+    fetch = Fetch()
+    pipeline = DataProcessPipeline([fetch]).init()
+    outputs, backlog = [], 0
+    async for result in pipeline.aprocess_iter(({"id": i} for i in range(300)), concurrency=20, ordered=True):
+        backlog = max(backlog, fetch.started - len(outputs))
+        outputs.append(result)
+    return fetch, outputs, backlog
+
+
+fetch, outputs, backlog = asyncio.run(main())
+assert [r["source"]["id"] for r in outputs] == list(range(300))
+assert [r["state"] for r in outputs].count("FILTER") == 30
+assert backlog <= 20 and fetch.running_max <= Fetch.concurrency
+
+# aprocess: 结果按状态分类，按输入顺序排列
+pipeline = DataProcessPipeline([Fetch()]).init()
+result = asyncio.run(pipeline.aprocess([{"id": i} for i in range(50)], concurrency=8))
+assert [r["data"]["id"] for r in result["SUCCES"]] == [i for i in range(50) if i % 10 != 9]
+assert pipeline.stats()["Fetch"]["calls"] == 50 and pipeline.stats()["Fetch"]["filter"] == 5
+
+print("test passed")
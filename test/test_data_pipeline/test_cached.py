@@ -0,0 +1,78 @@
+# Name: Test CachedNode
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import time
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, CachedNode
+
+
+class Resolver(DataProcessNode):
+
+    def __init__(self, pid=None):
+        super().__init__(pid)
+        self.calls = []
+
+    def process(self, data: dict) -> dict:
+        self.calls.append(data["city"])
+        if data["city"] == "unknown":
+            return None
+        data["province"] = data["city"].upper()
+        data["codes"] = [len(data["city"])]
+        return data
+
+
+# LRU 淘汰: 超过 maxsize 时淘汰最久未使用的条目
+resolver = Resolver()
+node = CachedNode(resolver, fields=["city"], outputs=["province", "codes"], maxsize=2)
+for city in ("a", "b", "a", "c", "a", "b"):
+    node.process({"city": city})
+# a, b 未命中; a 命中(b 成为最久未使用); c 未命中并淘汰 b; a 命中; b 未命中并淘汰 c
+assert resolver.calls == ["a", "b", "c", "b"], resolver.calls
+assert list(node._cache) == [("a", ), ("b", )]
+stats = node.stats()
+assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 4, 2, 2) and stats["hit_rate"] == 2 / 6
+
+# 命中时只更新输出字段，其他字段保持不变
+data = node.process({"city": "a", "other": 1})
+assert data == {"city": "a", "other": 1, "province": "A", "codes": [1]}
+
+# 修改返回的输出不会污染缓存(输出字段与完整输出两种模式)
+data["codes"].append(99)
+assert node.process({"city": "a"})["codes"] == [1]
+full = CachedNode(Resolver(), fields=["city"])
+output = full.process({"city": "x"})
+output["codes"].append(99)
+output["province"] = "changed"
+assert full.process({"city": "x"}) == {"city": "x", "province": "X", "codes": [1]}
+assert full.node.calls == ["x"]
+
+# 过滤(FILTER)的结果同样会被缓存
+resolver = Resolver()
+pipeline = DataProcessPipeline([CachedNode(resolver, fields=["city"], outputs=["province"])]).init()
+result = pipeline.process([{"city": "unknown"} for _ in range(5)])
+assert len(result["FILTER"]) == 5 and resolver.calls == ["unknown"]
+assert pipeline.nodes[0].stats()["hits"] == 4
+
+# 缓存有效期(ttl): 过期的条目重新调用被包装的节点
+resolver = Resolver()
+node = CachedNode(resolver, fields=["city"], outputs=["province"], ttl=0.05)
+node.process({"city": "a"})
+node.process({"city": "a"})
+time.sleep(0.08)
+node.process({"city": "a"})
+assert resolver.calls == ["a", "a"]
+stats = node.stats()
+assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+
+# 缓存键不可哈希时直接调用被包装的节点，并计入 uncacheable
+resolver = Resolver()
+node = CachedNode(resolver, fields=["city", "tags"], outputs=["province"])
+for _ in range(3):
+    assert node.process({"city": "a", "tags": ["x"]})["province"] == "A"
+assert resolver.calls == ["a", "a", "a"]
+stats = node.stats()
+assert stats["uncacheable"] == 3 and stats["size"] == 0 and stats["hits"] == stats["misses"] == 0
+
+print("test passed")
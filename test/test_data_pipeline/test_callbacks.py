@@ -0,0 +1,60 @@
+# Name: Test callbacks
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import asyncio
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+class Mod(DataProcessNode):
+
+    def process(self, data: int) -> int:
+        if data % 5 == 0:
+            return None
+        if data % 7 == 0:
+            raise ValueError(data)
+        return data
+
+
+N = 100
+for options in ({}, {"batch_size": 8}, {"stages": True}, {"workers": 2, "chunksize": 16}, {"partition_by": lambda data: data % 3, "workers": 2}):
+    # 回调函数按输入顺序接收每一条结果(与输出的结果为同一对象)
+    seen = {"SUCCES": [], "FILTER": [], "ERROR": []}
+    pipeline = DataProcessPipeline([Mod()])
+    callbacks = {state: results.append for state, results in seen.items()}
+    outputs = list(pipeline.process_iter(range(N), callbacks=callbacks, **options))
+    assert [r["source"] for r in outputs] == list(range(N)), options
+    for state, results in seen.items():
+        assert [id(r) for r in results] == [id(r) for r in outputs if r["state"] == state], (options, state)
+    assert len(seen["FILTER"]) == 20 and len(seen["ERROR"]) == 12
+
+    # 回调函数抛出的异常记录到 pipeline.errors 中，不中断迭代
+    def fail(result):
+        if result["source"] % 2:
+            raise RuntimeError(result["source"])
+    pipeline = DataProcessPipeline([Mod()])
+    outputs = list(pipeline.process_iter(range(N), callbacks={"SUCCES": fail}, **options))
+    assert len(outputs) == N, options
+    report = {entry["node"]: entry for entry in pipeline.errors.report()}
+    odd = [i for i in range(1, N, 2) if i % 5 and i % 7]
+    assert report["callback:SUCCES"]["count"] == len(odd) and report["callback:SUCCES"]["type"] == "RuntimeError", options
+    assert report["callback:SUCCES"]["samples"][0]["data"]["source"] == odd[0]
+
+
+# 异步接口(支持协程回调函数)
+async def main():
+    seen = []
+
+    async def fail(result):
+        seen.append(result["source"])
+        raise RuntimeError(result["source"])
+    pipeline = DataProcessPipeline([Mod()])
+    outputs = [result async for result in pipeline.aprocess_iter(range(N), callbacks={"ERROR": fail}, ordered=True)]
+    assert [r["source"] for r in outputs] == list(range(N))
+    assert seen == [i for i in range(N) if i % 5 and i % 7 == 0]
+    assert {entry["node"]: entry["count"] for entry in pipeline.errors.report()}["callback:ERROR"] == len(seen)
+asyncio.run(main())
+
+print("test passed")
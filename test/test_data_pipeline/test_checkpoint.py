@@ -0,0 +1,73 @@
+# Name: Test DataProcessCheckpoint
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+import tempfile
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, DataProcessCheckpoint
+
+
+class Square(DataProcessNode):
+
+    def __init__(self, pid=None):
+        super().__init__(pid)
+        self.seen = []
+
+    def process(self, data: dict) -> dict:
+        self.seen.append(data["id"])
+        return {"id": data["id"], "square": data["id"] ** 2}
+
+
+N = 30
+datas = [{"id": i} for i in range(N)]
+filepath = os.path.join(tempfile.mkdtemp(), "run.ckpt")
+
+for key in (None, lambda data: data["id"]):
+    # 第一次运行: 提交两个日志帧(20 条)后中断
+    os.path.exists(filepath) and os.remove(filepath)
+    checkpoint = DataProcessCheckpoint(filepath, interval=10, key=key, replay=True, fsync=False)
+    results = DataProcessPipeline([Square()]).process_iter(datas, checkpoint=checkpoint)
+    [next(results) for _ in range(25)]
+    with open(filepath, "rb") as f:
+        journal = f.read()
+    # 下一个日志帧的完整内容
+    checkpoint.commit()
+    with open(filepath, "rb") as f:
+        frame = f.read()[len(journal):]
+    assert frame and DataProcessCheckpoint(filepath, key=key).offset == 24
+
+    # 日志末尾存在任意长度的不完整帧: 截断并从最近一次提交的位置继续
+    for n in range(1, len(frame)):
+        with open(filepath, "wb") as f:
+            f.write(journal + frame[:n])
+        checkpoint = DataProcessCheckpoint(filepath, interval=10, key=key, replay=True, fsync=False)
+        assert checkpoint.resumed and checkpoint.offset == 20, (n, checkpoint.offset)
+        assert os.path.getsize(filepath) == len(journal), n
+
+    # 续跑: 只处理未提交的数据，回放已提交的结果，并且续跑之后的日志可以正常加载
+    node = Square()
+    outputs = list(DataProcessPipeline([node]).process_iter(datas, checkpoint=checkpoint))
+    assert node.seen == list(range(20, N))
+    assert [r["data"]["id"] for r in outputs] == list(range(N)) and {r["state"] for r in outputs} == {"SUCCES"}
+    assert DataProcessCheckpoint(filepath, key=key).offset == N
+
+# 默认只记录输入进度(不保存处理结果)，日志大小与结果集无关
+sizes = {}
+for replay in (False, True):
+    os.path.exists(filepath) and os.remove(filepath)
+    checkpoint = DataProcessCheckpoint(filepath, interval=10, replay=replay, fsync=False)
+    assert checkpoint.save_results is replay
+    list(DataProcessPipeline([Square()]).process_iter(datas, checkpoint=checkpoint))
+    sizes[replay] = os.path.getsize(filepath)
+    resumed = DataProcessCheckpoint(filepath, replay=replay)
+    assert resumed.offset == N and len(list(resumed.track([]))) == (N if replay else 0)
+assert sizes[False] * 5 < sizes[True], sizes
+try:
+    DataProcessCheckpoint(filepath, replay=True, save_results=False)
+    raise AssertionError("replay without save_results accepted")
+except ValueError:
+    pass
+
+print("test passed")
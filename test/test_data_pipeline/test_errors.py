@@ -0,0 +1,56 @@
+# Name: Test ProcessError/ErrorAggregator
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import gc
+import pickle
+import weakref
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, ProcessError
+
+
+class Payload(object):
+    pass
+
+
+payloads = []
+
+
+class Fail(DataProcessNode):
+
+    def process(self, data: int) -> int:
+        payload = Payload()
+        payloads.append(weakref.ref(payload))
+        raise ValueError(f"bad record {data}")
+
+
+# 延迟格式化: 异常对象不持有节点帧(局部变量立即释放，不产生循环引用)
+gc.disable()
+pipeline = DataProcessPipeline([Fail()], errors="lazy").init()
+result = pipeline.process(range(100))
+assert all(ref() is None for ref in payloads)
+error = result["ERROR"][0]["error"]
+assert isinstance(error, ProcessError) and error.exception.__traceback__ is None
+assert error.type == "ValueError" and error.location.endswith("test_errors.py:25")
+assert "raise ValueError" in str(error) and str(error).rstrip().endswith("bad record 0")
+del result, error
+gc.collect()
+gc.set_debug(gc.DEBUG_SAVEALL)
+pipeline.process(range(100))
+assert gc.collect() == 0
+gc.set_debug(0)
+gc.enable()
+
+# 异常聚合与序列化
+report = pipeline.errors.report()
+assert len(report) == 1 and report[0]["count"] == 200 and report[0]["node"] == "Fail"
+sample = pipeline.errors.signatures[("Fail", "ValueError", report[0]["location"])]["samples"][0][1]
+restored = pickle.loads(pickle.dumps(sample))
+assert restored.exception is None and restored.location == sample.location and str(restored) == str(sample)
+
+# 格式化模式: error 字段为异常堆栈文本
+result = DataProcessPipeline([Fail()]).init().process([1])
+assert isinstance(result["ERROR"][0]["error"], str) and "bad record 1" in result["ERROR"][0]["error"]
+
+print("test passed")
@@ -0,0 +1,105 @@
+# Name: Test DataProcessPipeline(workers/partition_by/stages)
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+import time
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# 首条数据为慢速数据，id 为 7 的倍数时过滤，id 为 11 的倍数时异常
+class Check(DataProcessNode):
+
+    def process(self, data: dict) -> dict:
+        data["id"] == 0 and time.sleep(0.3)
+        if data["id"] % 7 == 0:
+            return None
+        if data["id"] % 11 == 0:
+            raise ValueError(data["id"])
+        data["pid"] = os.getpid()
+        return data
+
+
+# 按站点记录处理序号(分区内状态)
+class SiteSeq(DataProcessNode):
+
+    def init(self):
+        self.seqs = {}
+
+    def process(self, data: dict) -> dict:
+        data["seq"] = self.seqs[data["site"]] = self.seqs.get(data["site"], -1) + 1
+        return data
+
+
+class Source(object):
+    """ 记录已读取的数据条数 """
+
+    def __init__(self, n):
+        self.n, self.consumed = n, 0
+
+    def __iter__(self):
+        for i in range(self.n):
+            self.consumed += 1
+            yield {"id": i, "site": f"site-{i % 5}"}
+
+
+def run(source, **kwargs):
+    pipeline = DataProcessPipeline([Check(), SiteSeq()])
+    outputs, backlog = [], 0
+    for result in pipeline.process_iter(source, **kwargs):
+        outputs.append(result)
+        backlog = max(backlog, source.consumed - len(outputs))
+    return pipeline, outputs, backlog
+
+
+N = 400
+expected_filter = [i for i in range(N) if i % 7 == 0]
+expected_error = [i for i in range(N) if i % 7 and i % 11 == 0]
+
+for kwargs in ({"workers": 2, "chunksize": 10}, {"partition_by": "site", "workers": 2, "chunksize": 10}):
+    pipeline, outputs, backlog = run(Source(N), **kwargs)
+    # 有序输出，状态与计数正确
+    assert [r["source"]["id"] for r in outputs] == list(range(N))
+    assert [r["source"]["id"] for r in outputs if r["state"] == "FILTER"] == expected_filter
+    assert [r["source"]["id"] for r in outputs if r["state"] == "ERROR"] == expected_error
+    stats = pipeline.stats()
+    assert stats["Check"]["calls"] == N and stats["Check"]["filter"] == len(expected_filter) and stats["Check"]["error"] == len(expected_error)
+    assert stats["SiteSeq"]["calls"] == N - len(expected_filter) - len(expected_error)
+    assert len(pipeline.errors) == len(expected_error)
+    # 慢速数据阻塞输出时，已读取未输出的数据有上限
+    assert backlog <= 2 * 2 * 2 * 10 + 10, backlog
+    if "partition_by" in kwargs:
+        # 相同站点的数据由同一个工作进程按输入顺序处理
+        sites = {}
+        for r in outputs:
+            if r["state"] == "SUCCES":
+                sites.setdefault(r["data"]["site"], []).append((r["data"]["pid"], r["data"]["seq"]))
+        for values in sites.values():
+            assert len({pid for pid, _ in values}) == 1
+            assert [seq for _, seq in values] == list(range(len(values)))
+        executor_stats = pipeline.executor.stats()
+        assert executor_stats["records"] == N and sum(w["records"] for w in executor_stats["workers"]) == N
+
+# 无序输出: 结果完整
+pipeline, outputs, _ = run(Source(N), workers=2, chunksize=10, ordered=False)
+assert sorted(r["source"]["id"] for r in outputs) == list(range(N))
+
+# 流水线模式: 有序输出，状态与计数正确(多个工作线程的节点指标汇总)
+for stages in (True, [("Check", 4), ("SiteSeq", 1)]):
+    pipeline, outputs, backlog = run(Source(N), stages=stages, queue_size=5)
+    assert [r["source"]["id"] for r in outputs] == list(range(N))
+    assert [r["source"]["id"] for r in outputs if r["state"] == "ERROR"] == expected_error
+    stats = pipeline.stats()
+    assert stats["Check"]["calls"] == stats["Check"]["samples"] == N and stats["Check"]["error"] == len(expected_error)
+    assert stats["SiteSeq"]["calls"] == N - len(expected_filter) - len(expected_error)
+    assert len(pipeline.errors) == len(expected_error)
+    assert [stage["processed"] for stage in pipeline.executor.stats()] == [N, N - len(expected_filter) - len(expected_error)]
+    assert backlog <= 5 * 3 + 5, backlog
+
+# 流水线模式: 空节点流
+outputs = list(DataProcessPipeline([]).process_iter(range(3), stages=True))
+assert [r["data"] for r in outputs] == [0, 1, 2] and {r["state"] for r in outputs} == {"SUCCES"}
+
+print("test passed")
@@ -0,0 +1,113 @@
+# Name: Test DataProcessIncremental
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+import sqlite3
+import tempfile
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, DataProcessIncremental
+
+
+class Score(DataProcessNode):
+
+    def __init__(self, pid=None):
+        super().__init__(pid)
+        self.seen = []
+        self.on_process = None
+        self.opened = 0
+
+    def init(self):
+        self.opened += 1
+
+    def exit(self):
+        self.opened -= 1
+
+    def process(self, data: dict) -> dict:
+        self.seen.append(data["id"])
+        self.on_process and self.on_process(data)
+        if data["value"] < 0:
+            raise ValueError(data["id"])
+        if data["value"] == 0:
+            return None
+        return {"id": data["id"], "score": data["value"] * 2}
+
+
+def records(values):
+    return [{"id": i, "value": value} for i, value in enumerate(values)]
+
+
+directory = tempfile.mkdtemp()
+values = [1, 2, 0, -1, 3, 4]
+
+# skip: 第二次运行只处理新增/变化/异常的数据
+filepath = os.path.join(directory, "skip.index")
+node = Score()
+pipeline = DataProcessPipeline([node])
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="skip", lookup_size=2) as incremental:
+    outputs = list(pipeline.process_iter(records(values), incremental=incremental))
+    assert [r["state"] for r in outputs] == ["SUCCES", "SUCCES", "FILTER", "ERROR", "SUCCES", "SUCCES"]
+    assert incremental.stats()["new"] == 6 and incremental.stats()["index_size"] == 5
+node.seen.clear()
+changed = values[:1] + [5] + values[2:] + [6]
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="skip", lookup_size=2) as incremental:
+    outputs = list(pipeline.process_iter(records(changed), incremental=incremental))
+    # 1: 内容变化，3: 上次异常，6: 新增
+    assert node.seen == [1, 3, 6] and [r["source"]["id"] for r in outputs] == [1, 3, 6]
+    stats = incremental.stats()
+    assert (stats["hits"], stats["changed"], stats["new"], stats["errors"]) == (4, 1, 2, 1), stats
+
+# replay: 命中的数据按输入顺序回放上一次的处理结果
+filepath = os.path.join(directory, "replay.index")
+node = Score()
+pipeline = DataProcessPipeline([node])
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="replay", lookup_size=2) as incremental:
+    first = list(pipeline.process_iter(records(values), incremental=incremental))
+node.seen.clear()
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="replay", lookup_size=2) as incremental:
+    outputs = list(pipeline.process_iter(records(changed), incremental=incremental))
+    assert node.seen == [1, 3, 6]
+    assert [r.get("cached", False) for r in outputs] == [True, False, True, False, True, True, False]
+    assert [r["data"] for r in outputs if r.get("cached")] == [first[i]["data"] for i in (0, 2, 4, 5)]
+    assert [r["state"] for r in outputs] == ["SUCCES", "SUCCES", "FILTER", "ERROR", "SUCCES", "SUCCES", "SUCCES"]
+
+# replay: 回调函数同样作用于回放的处理结果
+seen = []
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="replay") as incremental:
+    callbacks = dict.fromkeys(("SUCCES", "FILTER", "ERROR"), seen.append)
+    outputs = list(pipeline.process_iter(records(changed), callbacks=callbacks, incremental=incremental))
+    assert len(outputs) == 7 and [id(r) for r in seen] == [id(r) for r in outputs]
+    assert sum(r.get("cached", False) for r in seen) == 6
+
+
+# replay: 回放时索引记录已被删除的数据重新处理(而不是中断处理)
+def purge(data):
+    if data["id"] == 3:
+        with sqlite3.connect(filepath) as conn:
+            conn.execute("DELETE FROM records WHERE id IN ('4', '5')")
+
+node.seen.clear()
+node.on_process = purge
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="replay", lookup_size=10) as incremental:
+    for options in ({}, {"stages": True}):
+        outputs = list(pipeline.process_iter(records(changed), incremental=incremental, **options))
+        if not options:
+            assert node.seen == [3, 4, 5], node.seen
+            assert [r["data"]["id"] for r in outputs if r["state"] == "SUCCES"] == [0, 1, 4, 5, 6]
+            assert [r.get("cached", False) for r in outputs] == [True, True, True, False, False, False, True]
+            assert incremental.stats()["missing"] == 2 and incremental.stats()["hits"] == 4
+    # 重新处理的结果写回索引
+    assert incremental.stats()["index_size"] == 6
+
+# 并行模式: 重新处理在主进程中初始化的数据处理节点在增量处理结束时销毁
+node = Score()
+node.on_process = purge
+pipeline = DataProcessPipeline([node])
+with DataProcessIncremental(filepath, key=lambda data: data["id"], mode="replay", lookup_size=10) as incremental:
+    outputs = list(pipeline.process_iter(records(changed), incremental=incremental, workers=2, chunksize=1))
+    assert incremental.stats()["missing"] == 2 and [r["data"]["id"] for r in outputs if r["state"] == "SUCCES"] == [0, 1, 4, 5, 6]
+    # 主进程只处理了记录缺失的数据
+    assert node.seen == [4, 5] and node.opened == 0, (node.seen, node.opened)
+
+print("test passed")
@@ -0,0 +1,54 @@
+# Name: Test DataProcessMetrics
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, DataProcessMetrics
+
+
+class Mod(DataProcessNode):
+
+    def __init__(self, filter_mod, error_mod, pid=None):
+        super().__init__(pid)
+        self.filter_mod, self.error_mod = filter_mod, error_mod
+
+    def process(self, data: int) -> int:
+        if data % self.filter_mod == 0:
+            return None
+        if data % self.error_mod == 0:
+            raise ValueError(data)
+        return data
+
+
+def counts(stats):
+    return {pid: (s["calls"], s["succes"], s["filter"], s["error"]) for pid, s in stats.items()}
+
+
+# 节点调用次数按节点流顺序推导
+for options in ({}, {"batch_size": 16}):
+    pipeline = DataProcessPipeline([Mod(2, 3, pid="A"), Mod(5, 7, pid="B")], metrics=DataProcessMetrics(sample_interval=1)).init()
+    result = pipeline.process(range(1, 211), **options)
+    # A: 105 条过滤(偶数)，35 条异常(奇数中 3 的倍数)
+    # B: 剩余 70 条，14 条过滤(5 的倍数)，8 条异常(7 的倍数且不是 5 的倍数)
+    assert counts(pipeline.stats()) == {"A": (210, 70, 105, 35), "B": (70, 48, 14, 8)}, counts(pipeline.stats())
+    assert len(result["SUCCES"]) == 48 and len(result["FILTER"]) == 119 and len(result["ERROR"]) == 43
+    assert pipeline.stats()["A"]["samples"] == 210 and pipeline.metrics.records == 210
+    assert "dctools_pipeline_node_calls_total{node=\"B\"} 70" in pipeline.stats("prometheus")
+
+# 采样计时: 调用次数与采样次数相互独立
+pipeline = DataProcessPipeline([Mod(2, 3, pid="A")], metrics=DataProcessMetrics(sample_interval=10)).init()
+pipeline.process(range(1, 101))
+assert pipeline.stats()["A"]["calls"] == 100 and pipeline.stats()["A"]["samples"] == 10
+
+# 节点ID重复(同一个节点类的多个实例)时按节点流顺序追加序号，各节点独立统计
+for options in ({}, {"batch_size": 16}, {"workers": 2, "chunksize": 30}, {"stages": [("Mod", 2), ("Mod", 1)]}):
+    pipeline = DataProcessPipeline([Mod(2, 3), Mod(5, 7)], metrics=DataProcessMetrics(sample_interval=1))
+    options.get("workers") or pipeline.init()
+    pipeline.process(range(1, 211), **options)
+    assert counts(pipeline.stats()) == {"Mod": (210, 70, 105, 35), "Mod#2": (70, 48, 14, 8)}, (options, counts(pipeline.stats()))
+# 结果中的终止节点仍为节点ID
+result = DataProcessPipeline([Mod(2, 3), Mod(5, 7)]).init().process(range(1, 211))
+assert {r["node"] for r in result["FILTER"]} == {"Mod"}
+
+print("test passed")
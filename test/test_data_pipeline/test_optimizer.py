@@ -0,0 +1,69 @@
+# Name: Test DataProcessPipeline.optimize
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import time
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# 昂贵的解析节点
+class Parse(DataProcessNode):
+    reads, writes = ("html", ), ("title", )
+
+    def process(self, data: dict) -> dict:
+        time.sleep(0.0002)
+        data["title"] = data["html"].upper()
+        return data
+
+
+# 廉价的过滤节点(与 Parse 独立)
+class LangFilter(DataProcessNode):
+    reads, writes = ("lang", ), ()
+
+    def process(self, data: dict) -> dict:
+        return data if data["lang"] == "zh" else None
+
+
+# 读取 Parse 写入的字段(依赖 Parse)
+class TitleFilter(DataProcessNode):
+    reads, writes = ("title", ), ()
+
+    def process(self, data: dict) -> dict:
+        return data if data["title"] else None
+
+
+# 输出节点(屏障)
+class Sink(DataProcessNode):
+
+    def __init__(self):
+        super().__init__()
+        self.written = []
+
+    def process(self, data: dict) -> dict:
+        self.written.append(data)
+        return data
+
+
+def samples():
+    return [{"html": f"<p>{i}</p>" if i % 3 else "", "lang": "zh" if i % 4 == 0 else "en"} for i in range(200)]
+
+
+sink = Sink()
+pipeline = DataProcessPipeline([Parse(), TitleFilter(), LangFilter(), sink]).init()
+plan = pipeline.optimize(samples(), verbose=False)
+# 过滤节点提前到昂贵节点之前，依赖 Parse 的节点保持在其之后，屏障节点保持不动
+assert plan["order"] == ["LangFilter", "Parse", "TitleFilter", "Sink"] and plan["savings"] > 0
+assert [node.pid for node in pipeline.nodes] == plan["order"]
+# 测量不执行屏障节点(数据样本没有写入输出节点)
+assert sink.written == [] and plan["nodes"]["Sink"]["cost"] == 0.0
+
+# 重排序后处理结果与重排序前一致
+result = pipeline.process(samples())
+expected = DataProcessPipeline([Parse(), TitleFilter(), LangFilter(), Sink()]).init().process(samples())
+assert [r["data"] for r in result["SUCCES"]] == [r["data"] for r in expected["SUCCES"]]
+assert len(result["FILTER"]) == len(expected["FILTER"]) and len(sink.written) == len(result["SUCCES"])
+assert list(pipeline.stats()) == plan["order"] and pipeline.stats()["LangFilter"]["calls"] == 200
+
+print("test passed")
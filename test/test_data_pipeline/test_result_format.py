@@ -0,0 +1,71 @@
+# Name: Test result_format
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import pickle
+import asyncio
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, ProcessResult
+
+
+class Mod(DataProcessNode):
+
+    def process(self, data: int) -> dict:
+        if data % 5 == 0:
+            return None
+        if data % 7 == 0:
+            raise ValueError(data)
+        return {"value": data}
+
+
+N = 100
+pipeline = DataProcessPipeline([Mod()])
+expected = pipeline.init().process(range(N))
+filtered, failed = [i for i in range(N) if i % 5 == 0], [i for i in range(N) if i % 5 and i % 7 == 0]
+succeeded = [i for i in range(N) if i not in filtered and i not in failed]
+
+for options in ({}, {"workers": 2, "chunksize": 16}):
+    # counts: 只统计各处理状态的数据条数，并保留处理成功的数据(按输入顺序)
+    result = pipeline.process(range(N), result_format="counts", **options)
+    assert result["counts"] == {"SUCCES": len(succeeded), "FILTER": len(filtered), "ERROR": len(failed)}
+    assert result["outputs"] == [{"value": i} for i in succeeded]
+
+    # compact: ProcessResult 对象，与 dict 格式的结果一致
+    result = pipeline.process(range(N), result_format="compact", **options)
+    assert result.keys() == expected.keys()
+    for state, results in result.items():
+        assert all(isinstance(r, ProcessResult) and r.state == state for r in results)
+        # 异常堆栈与执行位置(工作进程)有关，只比较异常信息
+        strip = lambda result: dict(result, error=result["error"].strip().splitlines()[-1]) if "error" in result else result
+        assert [strip(r.to_dict()) for r in results] == [strip(r) for r in expected[state]], state
+    assert [r.source for r in result["FILTER"]] == filtered and [r["source"] for r in result["ERROR"]] == failed
+
+    # 字典形式的只读访问
+    success, filter_, error = result["SUCCES"][0], result["FILTER"][0], result["ERROR"][0]
+    assert success["data"] == {"value": 1} and success["source"] == 1 and success["state"] == "SUCCES"
+    for key in ("node", "error", "missing"):
+        try:
+            success[key]
+            raise AssertionError(f"{key} accessible on SUCCES")
+        except KeyError:
+            pass
+    assert success.get("node") is None and success.get("error", "-") == "-"
+    assert "data" in success and "source" in success and "node" not in success and "error" not in success
+    assert filter_["node"] == "Mod" and filter_["data"] == filter_["source"] == 0 and "error" not in filter_
+    assert error["node"] == "Mod" and "ValueError: 7" in error["error"] and "error" in error
+    # 可以被 pickle 序列化
+    clone = pickle.loads(pickle.dumps(error))
+    assert (clone.state, clone.source, clone.node, clone.error) == (error.state, error.source, error.node, error.error)
+
+# 异步接口
+result = asyncio.run(DataProcessPipeline([Mod()]).aprocess(range(N), result_format="counts"))
+assert result["counts"]["SUCCES"] == len(succeeded) and sorted(r["value"] for r in result["outputs"]) == succeeded
+
+try:
+    pipeline.process(range(N), result_format="list")
+    raise AssertionError("unknown result_format accepted")
+except ValueError:
+    pass
+
+print("test passed")
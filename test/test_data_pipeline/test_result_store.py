@@ -0,0 +1,60 @@
+# Name: Test DataProcessResultStore
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+import asyncio
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, DataProcessResultStore
+
+
+class Mod(DataProcessNode):
+
+    def process(self, data: int) -> int:
+        if data % 5 == 0:
+            return None
+        if data % 7 == 0:
+            raise ValueError(data)
+        return {"value": data, "text": "x" * 64}
+
+
+N = 1000
+pipeline = DataProcessPipeline([Mod()]).init()
+expected = pipeline.process(range(N))
+
+for compress in (False, True):
+    for options in ({}, {"batch_size": 32}, {"workers": 2, "chunksize": 50}):
+        with DataProcessResultStore(memory_limit=64, compress=compress) as store:
+            assert pipeline.process(range(N), result_store=store, **options) is store
+            # 按写入顺序输出(溢写分段 + 内存缓存)，与 process 的结果集一致
+            assert [r["data"] for r in store.iter("SUCCES")] == [r["data"] for r in expected["SUCCES"]]
+            assert [r["source"] for r in store["FILTER"]] == [r["source"] for r in expected["FILTER"]]
+            assert [r["source"] for r in store["ERROR"]] == [r["source"] for r in expected["ERROR"]]
+            stats = store.stats()
+            assert stats["counts"] == {state: len(results) for state, results in expected.items()} and len(store) == N
+            # 每个状态只保留不足一个分段的结果在内存中
+            assert stats["spilled"] == {state: count - count % 64 for state, count in stats["counts"].items()}, stats
+            assert stats["in_memory"] == sum(count % 64 for count in stats["counts"].values())
+            assert stats["segments"] == sum(count // 64 for count in stats["counts"].values()) and stats["disk_bytes"] > 0
+            directory = store.directory
+            assert os.path.isdir(directory) and store.to_dict().keys() == expected.keys()
+        # close 删除临时目录并清空存储
+        assert not os.path.exists(directory) and len(store) == 0 and store.stats()["segments"] == 0
+
+# 迭代过程中继续写入: 已溢写的分段与新写入的结果都可以读取
+store = DataProcessResultStore(memory_limit=2)
+[store.add({"state": "SUCCES", "data": i}) for i in range(5)]
+reader = store.iter("SUCCES")
+assert [next(reader)["data"] for _ in range(2)] == [0, 1]
+[store.add({"state": "SUCCES", "data": i}) for i in range(5, 8)]
+assert [r["data"] for r in store.iter("SUCCES")] == list(range(8))
+store.close()
+
+# 异步接口
+store = DataProcessResultStore(memory_limit=64)
+asyncio.run(DataProcessPipeline([Mod()]).aprocess(range(N), result_store=store))
+assert sorted(r["data"]["value"] for r in store.iter("SUCCES")) == [r["data"]["value"] for r in expected["SUCCES"]]
+store.close()
+
+print("test passed")
@@ -0,0 +1,77 @@
+# Name: Test DataProcessRouter
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import asyncio
+import warnings
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, DataProcessRouter
+
+
+class AsyncFetch(DataProcessNode):
+
+    async def process(self, data: dict) -> dict:
+        await asyncio.sleep(0)
+        if data["v"] < 0:
+            return None
+        if data["v"] == 0:
+            raise ValueError("zero")
+        data["fetched"] = True
+        return data
+
+
+class Tag(DataProcessNode):
+
+    def process(self, data: dict) -> dict:
+        data["tag"] = data["t"]
+        return data
+
+
+def build():
+    return DataProcessPipeline([DataProcessRouter(key="t", routes={"x": [AsyncFetch(), Tag()], "y": [Tag()]})]).init()
+
+
+DATAS = [{"t": "x", "v": 1}, {"t": "x", "v": -1}, {"t": "x", "v": 0}, {"t": "y", "v": 1}]
+
+
+# 异步模式: 分支内部的协程节点被 await 调用，FILTER/ERROR 归属到分支内部节点
+with warnings.catch_warnings():
+    warnings.simplefilter("error")
+    pipeline = build()
+    result = asyncio.run(pipeline.aprocess([dict(data) for data in DATAS]))
+assert [r["data"] for r in result["SUCCES"]] == [{"t": "x", "v": 1, "fetched": True, "tag": "x"}, {"t": "y", "v": 1, "tag": "y"}]
+assert [r["node"] for r in result["FILTER"]] == ["AsyncFetch"] and [r["node"] for r in result["ERROR"]] == ["AsyncFetch"]
+stats = pipeline.stats()
+assert (stats["AsyncFetch"]["calls"], stats["AsyncFetch"]["filter"], stats["AsyncFetch"]["error"]) == (3, 1, 1)
+assert stats["Tag"]["calls"] == 2
+
+# 异步模式: 扇出
+pipeline = DataProcessPipeline([DataProcessRouter(fanout=True, routes={"fetch": [AsyncFetch()], "tag": [Tag()]})]).init()
+result = asyncio.run(pipeline.aprocess([{"t": "z", "v": 1}]))
+assert result["SUCCES"][0]["data"] == {"t": "z", "v": 1, "fetched": True, "tag": "z"}
+
+# 批量模式: FILTER/ERROR 归属与串行模式一致
+class Check(DataProcessNode):
+
+    def process(self, data: dict) -> dict:
+        if data["v"] < 0:
+            return None
+        if data["v"] == 0:
+            raise ValueError("zero")
+        return data
+
+
+def summary(result):
+    return {state: [(r["data"]["v"], r.get("node")) for r in results] for state, results in result.items()}
+
+
+outputs = []
+for batch_size in (None, 2):
+    pipeline = DataProcessPipeline([Tag(), DataProcessRouter(key="t", routes={"x": [Check(), Tag()]}, default="x")]).init()
+    outputs.append((summary(pipeline.process([dict(data) for data in DATAS], batch_size=batch_size)), pipeline.stats()))
+(serial, serial_stats), (batch, batch_stats) = outputs
+assert serial == batch and batch["FILTER"] == [(-1, "Check")] and batch["ERROR"] == [(0, "Check")]
+assert {pid: (s["filter"], s["error"]) for pid, s in serial_stats.items()} == {pid: (s["filter"], s["error"]) for pid, s in batch_stats.items()}
+
+print("test passed")
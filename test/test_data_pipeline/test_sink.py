@@ -0,0 +1,140 @@
+# Name: Test BulkSinkNode
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+import csv
+import time
+import gzip
+import json
+import pickle
+import sqlite3
+import tempfile
+from dctools.framework.data_pipeline import BulkSinkNode, JsonlSinkNode, CsvSinkNode, SQLiteSinkNode, DataProcessPipeline
+
+
+class MemorySink(BulkSinkNode):
+
+    def __init__(self, batch_size=1000, flush_interval=None, fail=0, pid=None, **kwargs):
+        super().__init__(batch_size, flush_interval, pid, **kwargs)
+        self.batches, self.fail = [], fail
+
+    def write(self, datas):
+        if self.fail:
+            self.fail -= 1
+            raise IOError("sink unavailable")
+        self.batches.append(list(datas))
+
+
+def wait(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+# 按分片大小输出，exit 时输出剩余的数据
+sink = MemorySink(batch_size=4)
+pipeline = DataProcessPipeline([sink]).init()
+pipeline.process([{"id": i} for i in range(10)])
+assert [len(batch) for batch in sink.batches] == [4, 4] and sink._timer is None
+pipeline.exit()
+assert [len(batch) for batch in sink.batches] == [4, 4, 2]
+
+# 数据流中断时由输出定时器在 flush_interval 内输出
+sink = MemorySink(batch_size=100, flush_interval=0.1)
+pipeline = DataProcessPipeline([sink]).init()
+pipeline.process([{"id": i} for i in range(3)])
+assert sink.batches == [] and sink.stats()["pending"] == 3
+assert wait(lambda: sink.batches), "timer did not flush"
+assert sink.batches == [[{"id": 0}, {"id": 1}, {"id": 2}]] and sink.stats()["pending"] == 0
+# 节点可以被 pickle 序列化(多进程并行模式)
+clone = pickle.loads(pickle.dumps(sink))
+assert clone._timer is None and clone.batches == sink.batches
+pipeline.exit()
+assert sink._timer is None
+
+# 定时器输出失败: 计入 errors，数据保留并在下一次输出时重试
+sink = MemorySink(batch_size=100, flush_interval=0.1, fail=1)
+pipeline = DataProcessPipeline([sink]).init()
+pipeline.process([{"id": 0}])
+assert wait(lambda: sink.stats()["errors"] == 1)
+assert wait(lambda: sink.batches == [[{"id": 0}]]), sink.batches
+pipeline.exit()
+assert sink.stats()["records"] == 1 and sink.stats()["pending"] == 0
+
+# 输出失败: 触发输出的数据标记为异常(ERROR)且不会在重试成功时输出，其余数据保留重试
+sink = MemorySink(batch_size=3, fail=1)
+pipeline = DataProcessPipeline([sink]).init()
+result = pipeline.process([{"id": i} for i in range(6)])
+assert [r["source"]["id"] for r in result["ERROR"]] == [2] and sink.stats()["errors"] == 1
+assert sink.batches == [[{"id": 0}, {"id": 1}, {"id": 3}, {"id": 4}, {"id": 5}]], sink.batches
+pipeline.exit()
+
+# 持续输出失败: 重试数据不超过 retry_limit 条，丢弃最早的数据并交给 on_error
+dropped = []
+sink = MemorySink(batch_size=2, fail=100, retry_limit=5, on_error=lambda datas, e: dropped.extend(data["id"] for data in datas))
+pipeline = DataProcessPipeline([sink]).init()
+result = pipeline.process([{"id": i} for i in range(20)])
+assert len(result["ERROR"]) == 10 and sink.stats()["pending"] == 5 and len(sink._retry) == 5
+errors = {r["source"]["id"] for r in result["ERROR"]}
+assert sink.stats()["dropped"] == len(dropped) == 5 and not errors & set(dropped)
+assert sorted(dropped + [data["id"] for data in sink._retry]) == sorted(set(range(20)) - errors)
+sink.fail = 0
+pipeline.exit()
+assert [data["id"] for data in sink.batches[0]] == [data for data in range(20) if data not in errors and data not in dropped]
+
+directory = tempfile.mkdtemp()
+datas = [{"id": i, "title": f"title-{i}", "tags": ["a", "b"]} for i in range(50)]
+
+# JSONL: 按大小滚动(每个文件超过 rotate_size 后切换)，exit 时输出剩余数据
+filepath = os.path.join(directory, "{pid}", "news.jsonl")
+sink = JsonlSinkNode(filepath, batch_size=8, rotate_size=1024)
+pipeline = DataProcessPipeline([sink]).init()
+pipeline.process(datas)
+assert sink.stats()["pending"] == 2
+pipeline.exit()
+assert sink.stats()["records"] == 50 and sink.stats()["pending"] == 0
+assert len(sink.files) > 1 and all(os.path.dirname(f) == os.path.join(directory, str(os.getpid())) for f in sink.files)
+lines = [json.loads(line) for f in sink.files for line in open(f, encoding="utf-8")]
+assert lines == datas
+assert all(os.path.getsize(f) - 1024 < 8 * 64 for f in sink.files)
+
+# JSONL: gzip 压缩输出，路径中的其他花括号保持原样
+filepath = os.path.join(directory, "{date}-{pid}.jsonl")
+sink = JsonlSinkNode(filepath, batch_size=16, compress=True)
+pipeline = DataProcessPipeline([sink]).init()
+pipeline.process(datas)
+pipeline.exit()
+assert sink.files == [os.path.join(directory, f"{{date}}-{os.getpid()}.jsonl.gz")]
+with gzip.open(sink.files[0], "rt", encoding="utf-8") as f:
+    assert [json.loads(line) for line in f] == datas
+
+# CSV: 追加写入已存在的文件时只写入一次表头
+filepath = os.path.join(directory, "news.csv")
+for chunk in (datas[:20], datas[20:]):
+    sink = CsvSinkNode(filepath, fieldnames=["id", "title"], batch_size=7)
+    pipeline = DataProcessPipeline([sink]).init()
+    pipeline.process(chunk)
+    pipeline.exit()
+with open(filepath, newline="", encoding="utf-8") as f:
+    rows = list(csv.reader(f))
+assert rows[0] == ["id", "title"] and rows.count(["id", "title"]) == 1
+assert rows[1:] == [[str(data["id"]), data["title"]] for data in datas]
+
+# SQLite: 键冲突时更新其余字段(upsert)，exit 时输出剩余数据
+database = os.path.join(directory, "news.db")
+for version in (1, 2):
+    sink = SQLiteSinkNode(database, "news", upsert_keys=["id"], batch_size=16)
+    pipeline = DataProcessPipeline([sink]).init()
+    pipeline.process([{"id": i, "title": f"v{version}-{i}", "tags": ["a"]} for i in range(0, 30 * version, version)])
+    pipeline.exit()
+with sqlite3.connect(database) as conn:
+    rows = dict(conn.execute("SELECT id, title FROM news"))
+    assert conn.execute("SELECT tags FROM news WHERE id = 0").fetchone() == ('["a"]', )
+assert len(rows) == 45
+assert all(rows[i] == f"v2-{i}" for i in range(0, 60, 2)) and all(rows[i] == f"v1-{i}" for i in range(1, 30, 2))
+
+print("test passed")
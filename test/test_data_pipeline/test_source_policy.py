@@ -0,0 +1,98 @@
+# Name: Test source_policy
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import pickle
+import asyncio
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline
+
+
+# 统计复制次数的数据
+class Record(dict):
+
+    copies = 0
+
+    def __copy__(self):
+        Record.copies += 1
+        return Record(self)
+
+    def __deepcopy__(self, memo):
+        Record.copies += 1
+        return Record({key: pickle.loads(pickle.dumps(value)) for key, value in self.items()})
+
+    def __reduce_ex__(self, protocol):
+        Record.copies += 1
+        return (Record, (dict(self), ))
+
+
+# 原地修改数据(外层字段与嵌套字段)
+class Mutate(DataProcessNode):
+
+    def process(self, data: dict) -> dict:
+        data["id"] = -data["id"]
+        data["tags"].append("mutated")
+        if data["kind"] == "filter":
+            return None
+        if data["kind"] == "error":
+            raise ValueError(data["kind"])
+        return data
+
+
+# record: 数据类型(统计复制次数时使用 Record)
+def records(record=dict):
+    return [record(id=i, kind=("ok", "filter", "error")[i % 3], tags=["a"]) for i in range(1, 31)]
+
+
+def run(source_policy, record=dict, **options):
+    pipeline = DataProcessPipeline([Mutate()], source_policy=source_policy)
+    options.get("workers") or pipeline.init()
+    return {state: sorted(results, key=lambda r: abs(r["data"]["id"])) for state, results in pipeline.process(records(record), **options).items()}
+
+
+for options in ({}, {"batch_size": 4}, {"stages": True}, {"workers": 2, "chunksize": 4}):
+    # snapshot: source 为处理前的序列化快照，不受节点原地修改的影响
+    result = run("snapshot", **options)
+    for state, results in result.items():
+        for r in results:
+            source = pickle.loads(r["source"])
+            assert source["id"] > 0 and source["tags"] == ["a"] and r["data"]["id"] < 0, (options, state, source)
+
+    # error: 只有 ERROR 状态保留原始数据(处理前的状态)，FILTER/SUCCES 为 None
+    result = run("error", **options)
+    assert len(result["ERROR"]) == len(result["FILTER"]) == len(result["SUCCES"]) == 10
+    assert all(r["source"] is None for state in ("SUCCES", "FILTER") for r in result[state])
+    assert all(r["source"] == {"id": abs(r["data"]["id"]), "kind": "error", "tags": ["a"]} for r in result["ERROR"]), options
+
+    # shallow: 外层字段不受影响，嵌套字段与数据共享
+    result = run("shallow", **options)
+    assert all(r["source"]["id"] > 0 and r["source"]["tags"] == ["a", "mutated"] for results in result.values() for r in results)
+
+    # deep(默认): 完全隔离
+    result = run("deep", **options)
+    assert all(r["source"]["id"] > 0 and r["source"]["tags"] == ["a"] for results in result.values() for r in results)
+
+# none: 不保留也不复制原始数据
+for options in ({}, {"batch_size": 4}, {"stages": True}):
+    Record.copies = 0
+    result = run("none", Record, **options)
+    assert Record.copies == 0, (options, Record.copies)
+    assert all(r["source"] is None for results in result.values() for r in results)
+Record.copies = 0
+pipeline = DataProcessPipeline([Mutate()], source_policy="none")
+asyncio.run(pipeline.aprocess(records(Record)))
+assert Record.copies == 0
+# 对比: 其他策略会复制原始数据
+for source_policy in ("shallow", "deep", "snapshot", "error"):
+    Record.copies = 0
+    run(source_policy, Record)
+    assert Record.copies == 30, (source_policy, Record.copies)
+
+try:
+    DataProcessPipeline([Mutate()], source_policy="copy")
+    raise AssertionError("unknown source_policy accepted")
+except ValueError:
+    pass
+
+print("test passed")
@@ -0,0 +1,57 @@
+# Name: Test DataProcessTracer/DataProcessTimeline
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import gc
+import weakref
+from dctools.framework.data_pipeline import DataProcessNode, DataProcessPipeline, DataProcessTracer, DataProcessTimeline
+
+
+class Check(DataProcessNode):
+
+    def process(self, data: int) -> int:
+        if data % 5 == 0:
+            return None
+        if data % 7 == 0:
+            raise ValueError(data)
+        return data
+
+
+# 追踪模式下节点调用耗时同时计入节点指标(耗时直方图)
+for options in ({"trace": DataProcessTracer(rate=1.0)}, {"timeline": DataProcessTimeline()}):
+    pipeline = DataProcessPipeline([Check(), Check("Check2")], **options).init()
+    result = pipeline.process(range(100))
+    stats = pipeline.stats()
+    assert stats["Check"]["calls"] == stats["Check"]["samples"] == 100
+    assert stats["Check2"]["calls"] == stats["Check2"]["samples"] == 100 - len(result["FILTER"]) - len(result["ERROR"])
+    assert stats["Check"]["p50"] is not None and stats["Check"]["time_total"] > 0
+    pipeline.exit()
+
+tracer = DataProcessTracer(rate=1.0)
+pipeline = DataProcessPipeline([Check()], trace=tracer).init()
+pipeline.process(range(10))
+assert len(tracer) == 10
+
+# 时间线追踪器的 GC 回调: exit() 时注销；未调用 exit() 时追踪器可以被回收，回收后 GC 回调自动注销
+callbacks = len(gc.callbacks)
+timeline = DataProcessTimeline()
+pipeline = DataProcessPipeline([Check()], timeline=timeline).init()
+pipeline.process(range(10))
+assert len(gc.callbacks) == callbacks + 1
+gc.collect()
+assert any(event[0] == "gc" for event in timeline.events)
+pipeline.exit()
+assert len(gc.callbacks) == callbacks
+
+timeline = DataProcessTimeline()
+pipeline = DataProcessPipeline([Check()], timeline=timeline).init()
+pipeline.process(range(10))
+ref = weakref.ref(timeline)
+del pipeline, timeline
+gc.collect()
+assert ref() is None and len(gc.callbacks) == callbacks, (ref(), len(gc.callbacks))
+gc.collect()
+
+print("test passed")
@@ -0,0 +1,54 @@
+# Name: Benchmark ExpiringDeduplicator
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 测试时间失效去重器在大规模URL下的吞吐量与内存占用
+"""
+python benchmark.py [URL数量(默认1亿)] [存储后端(默认 bloom set)]
+模拟时钟按照 URL 序号推进，时间窗口覆盖 1/4 的 URL，每条 URL 以 10% 的概率重复出现一次，
+因此去重器的内存占用应该稳定在时间窗口内的数据量，而不是随 URL 总量增长。
+"""
+
+import sys
+import time
+import random
+import resource
+from dctools.utils.expiring_deduplicator import ExpiringDeduplicator
+
+
+# 模拟时钟
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def benchmark(n, backend):
+    clock = Clock()
+    window = n // 4
+    dedup = ExpiringDeduplicator(window=window, generations=8, backend=backend, capacity=window, error_rate=0.001, clock=clock)
+    rand = random.Random(0)
+    report = max(n // 10, 1)
+    start, seen, peak = time.perf_counter(), 0, 0
+    for i in range(n):
+        # 每条 URL 占用一个时间单位，10% 的概率重复最近出现过的 URL
+        clock.now = i
+        url = f"https://www.example.com/item/{rand.randrange(max(i - 1000, 0), i) if i and rand.random() < 0.1 else i}"
+        seen += dedup.seen_or_add(url)
+        if not (i + 1) % report:
+            stats = dedup.stats()
+            peak = max(peak, stats["memory"])
+            cost = time.perf_counter() - start
+            print(f"[{backend}] {i+1:>12,} urls | {(i+1)/cost:>10,.0f} ops/s | window size: {stats['size']:>12,} | memory: {stats['memory']/2**20:>9.1f} MB | seen: {seen:,}")
+    cost = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"[{backend}] total: {n:,} urls | {n/cost:,.0f} ops/s | peak memory(estimated): {peak/2**20:.1f} MB | max rss: {rss:.1f} MB")
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000_000
+    backends = sys.argv[2:] or ["bloom", "set"]
+    [benchmark(n, backend) for backend in backends]
@@ -0,0 +1,44 @@
+# Name: Test ExpiringDeduplicator
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+from dctools.utils.expiring_deduplicator import ExpiringDeduplicator
+
+
+# 模拟时钟
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+for backend in ("set", "bloom"):
+    clock = Clock()
+    dedup = ExpiringDeduplicator(window=3, generations=3, backend=backend, capacity=30000, clock=clock)
+    # [t0]: 添加 a
+    assert dedup.seen_or_add("https://a.com") is False
+    assert dedup.seen_or_add("https://a.com") is True
+    # [t1]: 添加 b
+    clock.now = 1
+    assert dedup.seen_or_add_many(["https://b.com", "https://a.com"]) == [False, True]
+    # [t2]: a 仍然在时间窗口内
+    clock.now = 2
+    assert "https://a.com" in dedup
+    # [t3]: a 所在的代被丢弃
+    clock.now = 3
+    assert dedup.contains_many(["https://a.com", "https://b.com"]) == [False, True]
+    # 快照与恢复
+    dedup.snapshot("./dedup.snapshot")
+    restored = ExpiringDeduplicator.restore("./dedup.snapshot", clock=clock)
+    assert restored.contains("https://b.com") and not restored.contains("https://a.com")
+    # 长时间无写入: 所有代过期
+    clock.now = 10
+    assert restored.seen_or_add("https://b.com") is False
+    print(backend, restored.stats())
+os.remove("./dedup.snapshot")
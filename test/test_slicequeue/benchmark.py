@@ -0,0 +1,66 @@
+# Name: Benchmark SliceQueue
+# Date: 2026-10-18
+# Author: Ais
+# Desc: 对比分片队列(列表 + 头部索引)与原实现(list.pop(0) 逐条出队)在不同分片大小下的吞吐量
+"""
+python benchmark.py [分片大小...(默认 10000 100000 1000000)] [--legacy-max 原实现的最大分片大小(默认 100000)]
+原实现的出队复杂度为 O(n^2)，分片大小超过 --legacy-max 时跳过原实现的测试。
+"""
+
+import sys
+import time
+from dctools.utils.slicequeue import SliceQueue
+
+
+# 原实现
+class LegacySliceQueue(object):
+
+    def __init__(self, slice_size):
+        self.__slice_size = int(slice_size)
+        self.__data = []
+
+    def __len__(self):
+        return len(self.__data)
+
+    def push(self, datas):
+        [self.__data.append(data) for data in datas] if isinstance(datas, (list, tuple)) else self.__data.append(datas)
+
+    def pop(self, all=False):
+        if not all and len(self) < self.__slice_size:
+            return []
+        else:
+            return [self.__data.pop(0) for i in range(len(self) if all else self.__slice_size)]
+
+
+# 逐条入队，每次入队后尝试出队(与批量输出节点的使用方式一致)
+def benchmark(queue, n):
+    start = time.perf_counter()
+    popped = 0
+    for i in range(n):
+        queue.push(i)
+        popped += len(queue.pop())
+    popped += len(queue.pop(True))
+    assert popped == n
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+    args = sys.argv[1:]
+    legacy_max = 100000
+    if "--legacy-max" in args:
+        index = args.index("--legacy-max")
+        legacy_max = int(args[index + 1])
+        del args[index:index + 2]
+    sizes = [int(arg) for arg in args] or [10000, 100000, 1000000]
+    for slice_size in sizes:
+        # 每个分片大小处理 3 个分片的数据
+        n = slice_size * 3
+        cost = benchmark(SliceQueue(slice_size), n)
+        line = f"slice_size({slice_size:>9,}) | SliceQueue: {n/cost:>12,.0f} items/s"
+        if slice_size <= legacy_max:
+            legacy_cost = benchmark(LegacySliceQueue(slice_size), n)
+            line += f" | legacy: {n/legacy_cost:>12,.0f} items/s | speedup: {legacy_cost/cost:>8.1f}x"
+        else:
+            line += " | legacy: skipped(O(n^2))"
+        print(line)
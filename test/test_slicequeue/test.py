@@ -0,0 +1,186 @@
+# Name: Test SliceQueue
+# Date: 2026-10-18
+# Author: Ais
+# Desc: None
+
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+from dctools.utils.slicequeue import SliceQueue, ConcurrentSliceQueue, SliceFlusher, DurableSliceQueue
+
+
+# 模拟时钟
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# 数量: 达到分片大小时输出
+sq = SliceQueue(3)
+assert [sq.push(i) or sq.pop() for i in range(1, 7)] == [[], [], [1, 2, 3], [], [], [4, 5, 6]]
+sq.push([7, 8, 9, 10, 11, 12, 13])
+assert sq.pop() == [7, 8, 9] and sq.pop() == [10, 11, 12] and sq.pop() == []
+assert sq.pop(True) == [13] and len(sq) == 0 and sq.pop(True) == []
+
+# 时间: 最早的数据缓存超过 max_age 时输出所有数据
+clock = Clock()
+sq = SliceQueue(100, max_age=10, clock=clock)
+sq.push([1, 2])
+clock.now = 5
+sq.push(3)
+assert sq.pop() == [] and sq.age() == 5
+clock.now = 10
+assert sq.pop() == [1, 2, 3] and sq.age() is None
+sq.push(4)
+clock.now = 19
+assert sq.pop() == []
+clock.now = 20
+assert sq.pop() == [4]
+
+# 容量: 估算字节数达到 max_bytes 时输出
+sq = SliceQueue(100, max_bytes=10, sizeof=len)
+sq.push(["aaaa", "bbbb"])
+assert sq.pop() == [] and sq.nbytes() == 8
+sq.push(["cccc", "dd"])
+assert sq.pop() == ["aaaa", "bbbb", "cccc"] and sq.nbytes() == 2
+assert sq.stats()["slices"] == {"count": 0, "age": 0, "bytes": 1, "all": 0}
+
+# 大量数据: 出队顺序与入队顺序一致
+sq = SliceQueue(1000)
+out = []
+for i in range(100000):
+    sq.push(i)
+    out.extend(sq.pop())
+out.extend(sq.pop(True))
+assert out == list(range(100000))
+
+# 多生产者 + 后台输出线程: 数据不丢失不重复
+queue = ConcurrentSliceQueue(100, max_age=0.05)
+flushed = []
+flusher = SliceFlusher(queue, sink=flushed.extend).start()
+producers = [threading.Thread(target=lambda k: [queue.push([(k, i)]) for i in range(5000)], args=(k, )) for k in range(4)]
+[t.start() for t in producers]
+[t.join() for t in producers]
+assert flusher.stop(timeout=5)
+assert sorted(flushed) == sorted((k, i) for k in range(4) for i in range(5000))
+stats = flusher.stats()
+assert stats["records"] == 20000 and stats["depth"] == 0 and stats["depth_max"] >= 100 and not stats["running"]
+
+# 阻塞出队: 超时返回 []，按 max_age 唤醒
+queue = ConcurrentSliceQueue(10, max_age=0.05)
+start = time.monotonic()
+assert queue.pop_slice(timeout=0.02) == []
+queue.push([1, 2])
+assert queue.pop_slice(timeout=1) == [1, 2] and time.monotonic() - start < 0.5
+queue.push(3)
+queue.close()
+assert queue.pop_slice() == [3] and queue.pop_slice() == []
+
+# 输出失败重试
+calls = []
+def sink(datas):
+    calls.append(datas)
+    if len(calls) < 3:
+        raise IOError("db unavailable")
+queue = ConcurrentSliceQueue(2)
+flusher = SliceFlusher(queue, sink, retries=3, retry_interval=0.001).start()
+queue.push([1, 2])
+flusher.stop(timeout=5)
+stats = flusher.stats()
+assert stats["retries"] == 2 and stats["flushes"] == 1 and stats["failures"] == 0 and calls[-1] == [1, 2]
+
+# 重试后仍然失败
+queue = ConcurrentSliceQueue(2)
+flusher = SliceFlusher(queue, lambda datas: 1 / 0, retries=1, retry_interval=0.001).start()
+queue.push([1, 2, 3])
+flusher.stop(timeout=5)
+assert flusher.failed == [[1, 2], [3]] and flusher.stats()["failed_records"] == 3
+
+# 持久化: 重启时回放未确认的数据
+directory = tempfile.mkdtemp()
+sq = DurableSliceQueue(directory, 3, fsync="always")
+sq.push(list(range(8)))
+a, b = sq.pop(), sq.pop()
+assert a == [0, 1, 2] and b == [3, 4, 5]
+# 乱序确认: 确认位置只在连续确认时前移
+sq.ack(b)
+assert sq.unacked() == 8
+sq.ack(a)
+assert sq.unacked() == 2 and sq.stats()["wal"]["acked"] == 6
+c = sq.pop()
+assert c == [] and sq.pop(True) == [6, 7]
+sq.close()
+sq = DurableSliceQueue(directory, 3)
+assert sq.stats()["wal"]["replayed"] == 2 and sq.pop(True) == [6, 7]
+sq.push(8)
+sq.close()
+# 模拟写入中断: 日志尾部不完整的记录被截断
+segment = sorted(name for name in os.listdir(directory) if name.startswith("wal-"))[-1]
+with open(os.path.join(directory, segment), "ab") as f:
+    f.write(b"\x10\x00\x00\x00broken")
+sq = DurableSliceQueue(directory, 3)
+assert sq.pop(True) == [6, 7, 8] and sq.stats()["wal"]["truncated"] == 1
+sq.push(9)
+sq.close()
+sq = DurableSliceQueue(directory, 3)
+assert sq.pop(True) == [6, 7, 8, 9]
+sq.close()
+shutil.rmtree(directory)
+
+# 持久化: 回放后继续出队与确认，再次重启时只回放未确认的数据
+directory = tempfile.mkdtemp()
+sq = DurableSliceQueue(directory, 3)
+sq.push(list(range(8)))
+sq.ack(sq.pop())
+sq.ack(sq.pop())
+sq.close()
+sq = DurableSliceQueue(directory, 3)
+sq.push([8, 9, 10, 11])
+datas = sq.pop()
+assert datas == [6, 7, 8]
+sq.ack(datas)
+assert sq.stats()["wal"]["acked"] == 9 and sq.unacked() == 3
+sq.close()
+sq = DurableSliceQueue(directory, 3)
+assert sq.pop(True) == [9, 10, 11]
+sq.close()
+shutil.rmtree(directory)
+
+# 持久化: 日志分段滚动，确认后删除旧的分段
+directory = tempfile.mkdtemp()
+sq = DurableSliceQueue(directory, 100, fsync="count", fsync_count=50, segment_bytes=1024)
+[sq.push({"id": i, "text": "x" * 20}) for i in range(300)]
+assert sq.stats()["wal"]["segments"] > 3
+while len(sq):
+    sq.ack(sq.pop())
+assert sq.stats()["wal"]["segments"] == 1 and sq.unacked() == 0
+sq.close()
+assert DurableSliceQueue(directory, 100).stats()["wal"]["replayed"] == 0
+shutil.rmtree(directory)
+
+# 持久化 + 后台输出线程: 输出失败的分片在重启后回放
+directory = tempfile.mkdtemp()
+queue = ConcurrentSliceQueue(10, wal=directory)
+flushed = []
+flusher = SliceFlusher(queue, flushed.extend).start()
+queue.push(list(range(25)))
+assert flusher.stop(timeout=5)
+assert flushed == list(range(25)) and queue.stats()["wal"]["unacked"] == 0
+queue = ConcurrentSliceQueue(10, wal={"directory": directory, "fsync": "never"})
+queue.push(list(range(25, 30)))
+# 模拟进程退出: 不确认直接关闭日志
+queue.close()
+assert queue.pop_slice() == [25, 26, 27, 28, 29]
+queue.close_wal()
+queue = ConcurrentSliceQueue(10, wal=directory)
+assert queue.stats()["wal"]["replayed"] == 5
+shutil.rmtree(directory)
+
+print("test passed")